@@ -20,5 +20,8 @@ class HomepageConfig(AppConfig):
         # from .import signals
         import Homepage.signals  # Import your signal handler module
 
+        # model_checks is not installed, register its index audit here
+        import model_checks.index_check
+
 
       
@@ -0,0 +1,62 @@
+import logging
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+GOOGLE_REVOKE_URL = "https://oauth2.googleapis.com/revoke"
+
+# (connect, read) timeouts in seconds
+GOOGLE_TIMEOUT = (3.05, 10)
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session shared by all Google calls of a process"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+    session.mount("https://", adapter)
+    return session
+
+
+http_session = _build_session()
+
+
+def exchange_code_for_token(code) -> requests.Response:
+    """Exchange the authorization code for an access and a refresh token"""
+    token_params = {
+        "code": code,
+        "client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
+        "client_secret": settings.GOOGLE_OAUTH_CLIENT_SECRET,
+        "redirect_uri": settings.GOOGLE_OAUTH_REDIRECT_URI,
+        "grant_type": "authorization_code",
+    }
+    return http_session.post(
+        GOOGLE_TOKEN_URL, data=token_params, timeout=GOOGLE_TIMEOUT
+    )
+
+
+def fetch_user_info(access_token) -> requests.Response:
+    headers = {"Authorization": f"Bearer {access_token}"}
+    return http_session.get(
+        GOOGLE_USERINFO_URL, headers=headers, timeout=GOOGLE_TIMEOUT
+    )
+
+
+def revoke_token(access_token) -> requests.Response:
+    return http_session.post(
+        GOOGLE_REVOKE_URL, params={"token": access_token}, timeout=GOOGLE_TIMEOUT
+    )
+
+
+# Awaitable versions for async views. They run in the default thread pool,
+# not the thread shared by sync code, so a slow Google round trip holds
+# neither the event loop nor the ORM thread.
+aexchange_code_for_token = sync_to_async(
+    exchange_code_for_token, thread_sensitive=False
+)
+afetch_user_info = sync_to_async(fetch_user_info, thread_sensitive=False)
@@ -2,12 +2,32 @@ import logging
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Email, Mail, Personalization
 
 logger = logging.getLogger(__name__)
 
 
+# (connect, read) timeouts in seconds
+TWILIO_TIMEOUT = (3.05, 10)
+
+
+def _build_twilio_session() -> requests.Session:
+    """Keep-alive session reused by every OTP SMS of a worker process"""
+    session = requests.Session()
+    session.auth = (settings.ACCOUNT_SID, settings.AUTH_TOKEN)
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+    return session
+
+
+twilio_session = _build_twilio_session()
+
+
+class TwilioTemporaryError(Exception):
+    """Twilio rejected the SMS for now (429 / 5xx), sending it again may succeed"""
+
+
 def helper_function(generated_otp, phone_number) -> bool:
 
     # Twilio API endpoint
@@ -20,12 +40,8 @@ def helper_function(generated_otp, phone_number) -> bool:
         "Body": f"Your OTP is: {generated_otp}",
     }
 
-    # HTTP Basic Authentication credentials
-    auth = (settings.ACCOUNT_SID, settings.AUTH_TOKEN)
-
     # Send HTTP POST request to Twilio
-    # response = requests.post(endpoint, data=payload, auth=auth, verify=False)
-    response = requests.post(endpoint, data=payload, auth=auth)
+    response = twilio_session.post(endpoint, data=payload, timeout=TWILIO_TIMEOUT)
 
     # Check if request was successful
     if response.status_code == 201:
@@ -33,6 +49,8 @@ def helper_function(generated_otp, phone_number) -> bool:
     elif response.status_code == 403:
         logger.warning("Twilio service unavailable: Test plan max usage reached.")
         return False
+    elif response.status_code == 429 or response.status_code >= 500:
+        raise TwilioTemporaryError(f"Twilio API error: {response.status_code}")
     else:
         logger.error(f"Twilio API error: {response.status_code} - {response.text}")
         return False
@@ -0,0 +1,95 @@
+import logging
+import secrets
+
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+logger = logging.getLogger(__name__)
+
+OTP_TIMEOUT = 300  # 5 minutes, same as the temporary_cookie
+OTP_KEY_SALT = "Homepage.otp_store"
+
+# OTP SMS allowed per phone number within OTP_RATE_WINDOW seconds
+OTP_RATE_LIMIT = 3
+OTP_RATE_WINDOW = 60 * 10
+# wrong codes entered before the OTP is dropped
+OTP_MAX_ATTEMPTS = 5
+
+
+def _otp_cache_key(email) -> str:
+    return f"otp_{email}"
+
+
+def _otp_attempts_key(email) -> str:
+    return f"otp_attempts_{email}"
+
+
+def _otp_rate_key(phone_number) -> str:
+    return f"otp_rate_{phone_number}"
+
+
+def _hash_otp(email, otp) -> str:
+    return salted_hmac(OTP_KEY_SALT, f"{email}:{otp}").hexdigest()
+
+
+def generate_otp() -> str:
+    # Generate a 6-digit OTP
+    return str(100000 + secrets.randbelow(900000))
+
+
+def mask_phone_number(phone_number) -> str:
+    """Phone number for the logs, all but the last 3 digits hidden"""
+    phone_number = str(phone_number)
+    return "*" * max(len(phone_number) - 3, 0) + phone_number[-3:]
+
+
+def store_otp(email, otp) -> None:
+    """Keep only a keyed hash of the OTP, it expires after OTP_TIMEOUT"""
+    cache.set(_otp_cache_key(email), _hash_otp(email, otp), timeout=OTP_TIMEOUT)
+    cache.delete(_otp_attempts_key(email))
+
+
+def verify_otp(email, otp) -> bool:
+    """
+    Check the OTP entered by the user, a valid OTP can only be used once.
+    After OTP_MAX_ATTEMPTS wrong codes the OTP is dropped, so a code can
+    not be guessed within OTP_TIMEOUT.
+    """
+    otp_hash = cache.get(_otp_cache_key(email))
+    if otp_hash is None:
+        return False
+
+    if constant_time_compare(otp_hash, _hash_otp(email, otp)):
+        cache.delete_many([_otp_cache_key(email), _otp_attempts_key(email)])
+        return True
+
+    attempts_key = _otp_attempts_key(email)
+    cache.add(attempts_key, 0, timeout=OTP_TIMEOUT)
+    try:
+        attempts = cache.incr(attempts_key)
+    except ValueError:
+        # key expired between add() and incr()
+        cache.set(attempts_key, 1, timeout=OTP_TIMEOUT)
+        attempts = 1
+    if attempts >= OTP_MAX_ATTEMPTS:
+        logger.warning("OTP dropped after %s wrong codes", attempts)
+        cache.delete_many([_otp_cache_key(email), attempts_key])
+    return False
+
+
+def allow_otp_dispatch(phone_number) -> bool:
+    """Fixed-window rate limit of the OTP SMS sent to a phone number"""
+    key = _otp_rate_key(phone_number)
+    # add() only sets the key if it is missing, so the window is not extended
+    cache.add(key, 0, timeout=OTP_RATE_WINDOW)
+    try:
+        sent = cache.incr(key)
+    except ValueError:
+        # key expired between add() and incr()
+        cache.set(key, 1, timeout=OTP_RATE_WINDOW)
+        sent = 1
+
+    if sent > OTP_RATE_LIMIT:
+        logger.warning("OTP rate limit reached for %s", mask_phone_number(phone_number))
+        return False
+    return True
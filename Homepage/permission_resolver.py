@@ -0,0 +1,176 @@
+import logging
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+
+from Homepage.models import CustomSocialAccount
+from iii.tiered_cache import bump_versions, cached_version
+
+logger = logging.getLogger(__name__)
+
+PERMISSION_VERSION_KEY = "permissions_version"
+PERMISSION_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# user types that bypass the role permission tables
+UNRESTRICTED_USER_TYPES = frozenset({"ADMIN", "ADMINISTRATOR"})
+
+# Permissions required per user type, checked with a single subset test
+ADD_PRODUCT_PERMISSIONS = {
+    "SELLER": frozenset(
+        {
+            "Homepage.seller_add_product",
+            "Homepage.seller_update_product",
+            "Homepage.seller_delete_product",
+        }
+    ),
+    "MANAGER": frozenset(
+        {
+            "Homepage.manager_add_product",
+            "Homepage.manager_update_product",
+            "Homepage.manager_delete_product",
+        }
+    ),
+}
+
+COMMENT_PERMISSIONS = {
+    "CUSTOMER": frozenset(
+        {
+            "Homepage.customer_add_comment",
+            "Homepage.customer_edit_comment",
+            "Homepage.customer_delete_comment",
+        }
+    ),
+    "SELLER": frozenset(
+        {
+            "Homepage.seller_add_comment",
+            "Homepage.seller_edit_comment",
+            "Homepage.seller_delete_comment",
+        }
+    ),
+    "CUSTOMER REPRESENTATIVE": frozenset(
+        {
+            "Homepage.csr_add_comment",
+            "Homepage.csr_edit_comment",
+            "Homepage.csr_delete_comment",
+        }
+    ),
+    "MANAGER": frozenset(
+        {
+            "Homepage.manager_add_comment",
+            "Homepage.manager_edit_comment",
+            "Homepage.manager_delete_comment",
+        }
+    ),
+}
+
+BLOG_ADMIN_PERMISSIONS = frozenset(
+    {
+        "Homepage.admin_create_blog",
+        "Homepage.admin_update_blog",
+        "Homepage.admin_delete_blog",
+    }
+)
+
+
+def get_permission_version() -> int:
+    """Global version of groups / permissions, bumped by signals on change"""
+    return cached_version(PERMISSION_VERSION_KEY)
+
+
+def bump_permission_version() -> None:
+    bump_versions(PERMISSION_VERSION_KEY)
+
+
+def _user_permissions_key(user_id, version) -> str:
+    return f"user_permissions_{user_id}_v{version}"
+
+
+def _social_permissions_key(version) -> str:
+    return f"social_account_permissions_v{version}"
+
+
+def invalidate_user_permissions(user) -> None:
+    """Drop the cached permission set of a single user."""
+    cache.delete(_user_permissions_key(user.pk, get_permission_version()))
+    if hasattr(user, "_resolved_permissions"):
+        del user._resolved_permissions
+
+
+def get_user_permissions(user) -> frozenset:
+    """
+    Return the effective permission set ("app_label.codename") of the user.
+    The set is built once from the user and group permissions, then served
+    from the cache until the user or the permission version changes.
+    """
+    if not user or not user.is_authenticated or not user.is_active:
+        return frozenset()
+
+    # memoize on the instance, like ModelBackend does with _perm_cache
+    if hasattr(user, "_resolved_permissions"):
+        return user._resolved_permissions
+
+    key = _user_permissions_key(user.pk, get_permission_version())
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = frozenset(user.get_all_permissions())
+        cache.set(key, permissions, timeout=PERMISSION_CACHE_TIMEOUT)
+        logger.debug("permission set cached for user %s", user.pk)
+
+    user._resolved_permissions = permissions
+    return permissions
+
+
+def user_has_perms(user, perm_list) -> bool:
+    # active superusers have every permission, same as User.has_perm()
+    if user.is_active and getattr(user, "is_superuser", False):
+        return True
+    return set(perm_list) <= get_user_permissions(user)
+
+
+def user_has_role_permissions(user, role_permissions) -> bool:
+    """Check the permissions required for the user's type in role_permissions."""
+    if user.user_type in UNRESTRICTED_USER_TYPES:
+        return True
+
+    required_permissions = role_permissions.get(user.user_type)
+    if required_permissions is None:
+        return False
+    return user_has_perms(user, required_permissions)
+
+
+def get_social_account_permission_names() -> frozenset:
+    """Names of the model level permissions of CustomSocialAccount."""
+    key = _social_permissions_key(get_permission_version())
+    permission_names = cache.get(key)
+    if permission_names is None:
+        content_type = ContentType.objects.get_for_model(CustomSocialAccount)
+        permission_names = frozenset(
+            Permission.objects.filter(content_type=content_type).values_list(
+                "name", flat=True
+            )
+        )
+        cache.set(key, permission_names, timeout=PERMISSION_CACHE_TIMEOUT)
+    return permission_names
+
+
+def display_user_type_permissions(request) -> set:
+    """Permission codenames shown on the profile pages"""
+    clean_permissions = {
+        permission.split(".")[1] for permission in get_user_permissions(request.user)
+    }
+
+    # user logged-in via google account also gets social account permissions
+    if "user_id" in request.session and not "social_id" in request.session:
+        return clean_permissions
+
+    clean_permissions.update(get_social_account_permission_names())
+    return clean_permissions
+
+
+class CachedPermissionRequiredMixin(PermissionRequiredMixin):
+    """PermissionRequiredMixin answering from the cached permission set"""
+
+    def has_permission(self) -> bool:
+        return user_has_perms(self.request.user, self.get_permission_required())
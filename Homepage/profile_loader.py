@@ -0,0 +1,101 @@
+import logging
+
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from Homepage.models import (
+    AdministratorProfile,
+    CustomerProfile,
+    CustomerServiceProfile,
+    CustomUser,
+    ManagerProfile,
+    SellerProfile,
+    UserProfile,
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+
+# user type ==> (role profile model, field to UserProfile, field to CustomUser)
+ROLE_PROFILES = {
+    "CUSTOMER": (CustomerProfile, "customer_profile", "customuser_type_1"),
+    "SELLER": (SellerProfile, "seller_profile", "customuser_type_2"),
+    "CUSTOMER REPRESENTATIVE": (
+        CustomerServiceProfile,
+        "csr_profile",
+        "customuser_type_3",
+    ),
+    "MANAGER": (ManagerProfile, "manager_profile", "customuser_type_4"),
+    "ADMINISTRATOR": (AdministratorProfile, "admin_profile", "user"),
+}
+
+
+def _profile_cache_key(user_id, user_type) -> str:
+    return f"profile_{user_id}_{user_type.replace(' ', '_')}"
+
+
+def _role_profile_accessor(user_type) -> str:
+    """Reverse accessor from UserProfile to the role profile, e.g. 'sellerprofile'"""
+    model, profile_field, _ = ROLE_PROFILES[user_type]
+    return model._meta.get_field(profile_field).remote_field.get_accessor_name()
+
+
+def _fetch_profile(user_id, user_type):
+    """
+    Fetch user, UserProfile and role profile in one query. Missing rows are
+    returned as unsaved instances, so they are only written when a form is saved.
+    """
+    model, profile_field, user_field = ROLE_PROFILES[user_type]
+    accessor = _role_profile_accessor(user_type)
+
+    custom_user = get_object_or_404(
+        CustomUser.objects.select_related("userprofile", f"userprofile__{accessor}"),
+        pk=user_id,
+    )
+
+    try:
+        user_profile = custom_user.userprofile
+    except UserProfile.DoesNotExist:
+        user_profile = UserProfile(user=custom_user)
+
+    try:
+        role_profile = getattr(user_profile, accessor)
+    except model.DoesNotExist:
+        # FK id is filled in on save, after user_profile has been saved
+        role_profile = model(**{profile_field: user_profile, user_field: custom_user})
+
+    return custom_user, user_profile, role_profile
+
+
+def load_profile(user, user_type):
+    """
+    Read path: (user, user_profile, role_profile) from the cache, or one query
+    on a miss. Nothing is created here.
+    """
+    key = _profile_cache_key(user.pk, user_type)
+    profile = cache.get(key)
+    if profile is not None:
+        return profile
+
+    profile = _fetch_profile(user.pk, user_type)
+    _, user_profile, role_profile = profile
+
+    # only cache complete profiles, a missing row is created by the next save
+    if user_profile.pk and role_profile.pk:
+        cache.set(key, profile, timeout=PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def load_profile_for_update(user, user_type):
+    """Write path: always read from the database, never from the cache"""
+    return _fetch_profile(user.pk, user_type)
+
+
+def invalidate_profile(user_id) -> None:
+    if user_id is None:
+        return
+    cache.delete_many(
+        [_profile_cache_key(user_id, user_type) for user_type in ROLE_PROFILES]
+    )
+    logger.debug("profile cache invalidated for user %s", user_id)
@@ -0,0 +1,97 @@
+import logging
+
+from django.utils.functional import cached_property
+
+from cart.models import Cart
+from Homepage.models import CustomUser, UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+class RequestIdentity:
+    """
+    User, profile and open cart of the current request. Each one is resolved
+    on first access and then shared by every view and helper of the request.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @property
+    def is_logged_in(self) -> bool:
+        """Same gate the views used before: 'user_id' in the session cookie"""
+        return "user_id" in self.request.session
+
+    @cached_property
+    def user(self):
+        user_id = self.request.session.get("user_id")
+        if user_id is None:
+            return None
+
+        # already loaded by AuthenticationMiddleware
+        request_user = getattr(self.request, "user", None)
+        if request_user is not None and request_user.is_authenticated:
+            if request_user.pk == user_id:
+                return request_user
+
+        return CustomUser.objects.filter(pk=user_id).first()
+
+    @property
+    def user_id(self):
+        return self.user.pk if self.user is not None else None
+
+    @cached_property
+    def user_profile(self):
+        if self.user is None:
+            return None
+        try:
+            return self.user.userprofile
+        except UserProfile.DoesNotExist:
+            return None
+
+    @cached_property
+    def cart(self):
+        """The user's cart that has not been paid for yet"""
+        if self.user is None:
+            return None
+        return (
+            Cart.objects.filter(user=self.user)
+            .exclude(cart_payment__isnull=False)
+            .first()
+        )
+
+    @property
+    def cart_id(self):
+        return self.cart.pk if self.cart is not None else None
+
+    def set_cart(self, cart) -> None:
+        """Share a cart created during the request"""
+        self.__dict__["cart"] = cart
+
+    def forget_cart(self) -> None:
+        self.__dict__.pop("cart", None)
+
+
+def get_request_identity(request) -> RequestIdentity:
+    """request.identity, also for requests that did not go through the middleware"""
+    identity = getattr(request, "identity", None)
+    if identity is None:
+        identity = RequestIdentity(request)
+        request.identity = identity
+    return identity
+
+
+class RequestIdentityMiddleware:
+    """
+    Attach a lazy RequestIdentity to every request.
+
+    Must be placed after SessionMiddleware and AuthenticationMiddleware
+    in settings.py
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity = RequestIdentity(request)
+        return self.get_response(request)
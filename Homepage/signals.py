@@ -1,10 +1,24 @@
 from random import randint
 
-from django.contrib.auth.models import Group
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from Homepage.models import CustomSocialAccount, CustomUser
+from Homepage.models import (
+    AdministratorProfile,
+    CustomerProfile,
+    CustomerServiceProfile,
+    CustomSocialAccount,
+    CustomUser,
+    ManagerProfile,
+    SellerProfile,
+    UserProfile,
+)
+from Homepage.permission_resolver import (
+    bump_permission_version,
+    invalidate_user_permissions,
+)
+from Homepage.profile_loader import ROLE_PROFILES, invalidate_profile
 
 
 @receiver(post_save, sender=CustomUser)
@@ -34,3 +48,64 @@ def link_social_account(sender, instance, created, **kwargs):
         instance.user.save()
     else:
         pass
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_permissions_on_user_save(sender, instance, **kwargs):
+    # is_active / is_superuser / user_type may have changed
+    invalidate_user_permissions(instance)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def invalidate_permissions_on_user_m2m_change(sender, instance, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    if isinstance(instance, CustomUser):
+        invalidate_user_permissions(instance)
+    else:
+        # changed from the Group / Permission side, e.g. group.user_set.add()
+        bump_permission_version()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_permission_version_on_group_change(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_permission_version()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def bump_permission_version_on_save_or_delete(sender, **kwargs):
+    bump_permission_version()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_profile_on_user_change(sender, instance, **kwargs):
+    invalidate_profile(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_on_user_profile_change(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
+
+
+@receiver(post_save, sender=CustomerProfile)
+@receiver(post_delete, sender=CustomerProfile)
+@receiver(post_save, sender=SellerProfile)
+@receiver(post_delete, sender=SellerProfile)
+@receiver(post_save, sender=CustomerServiceProfile)
+@receiver(post_delete, sender=CustomerServiceProfile)
+@receiver(post_save, sender=ManagerProfile)
+@receiver(post_delete, sender=ManagerProfile)
+@receiver(post_save, sender=AdministratorProfile)
+@receiver(post_delete, sender=AdministratorProfile)
+def invalidate_profile_on_role_profile_change(sender, instance, **kwargs):
+    for model, _, user_field in ROLE_PROFILES.values():
+        if model is sender:
+            invalidate_profile(getattr(instance, f"{user_field}_id"))
@@ -1,11 +1,17 @@
 import logging
 
+import requests
 from celery import shared_task
 from celery.exceptions import MaxRetriesExceededError
 from django.conf import settings
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 
+from Homepage.google_oauth import revoke_token
+from Homepage.helper_functions import TwilioTemporaryError, helper_function
+from Homepage.otp_store import generate_otp, mask_phone_number, store_otp
+from iii import sitemap
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,3 +48,67 @@ def send_password_reset_email(self, email, reset_url):
             raise MaxRetriesExceededError(
                 "Max retries exceeded for email sending task."
             )
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def revoke_google_token(self, access_token):
+    """Revoke a Google OAuth token after logout, off the request path"""
+
+    try:
+        response = revoke_token(access_token)
+
+        # 400 means the token is already expired or revoked
+        if response.status_code not in (200, 400):
+            raise Exception(f"Non-200 response: {response.status_code}")
+
+        logger.info(f"Google token revoked, response: {response.status_code}")
+
+    except Exception as e:
+        logger.error(f"Error while revoking Google token: {str(e)}")
+
+        if self.request.retries < self.max_retries:
+            logger.info(f"Retrying... attempt {self.request.retries + 1}")
+            raise self.retry(exc=e, countdown=2**self.request.retries)
+        else:
+            raise MaxRetriesExceededError(
+                "Max retries exceeded for Google token revocation task."
+            )
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=2)
+def send_otp_sms(self, email, phone_number):
+    """
+    Generate the OTP of `email` and send it through Twilio, outside the
+    login request. The OTP is never a task argument, so it is not kept by
+    the broker, and a retry replaces the OTP of the failed attempt.
+    """
+
+    generated_otp = generate_otp()
+    store_otp(email, generated_otp)
+    try:
+        if helper_function(generated_otp, phone_number):
+            logger.info(f"OTP SMS sent to {mask_phone_number(phone_number)}")
+        else:
+            # rejected by Twilio (e.g. the 403 quota), a retry would fail too
+            logger.warning(f"OTP SMS to {mask_phone_number(phone_number)} was not sent")
+
+    except (TwilioTemporaryError, requests.exceptions.RequestException) as e:
+        logger.error(f"Error while sending OTP SMS: {str(e)}")
+
+        if self.request.retries < self.max_retries:
+            logger.info(f"Retrying... attempt {self.request.retries + 1}")
+            raise self.retry(exc=e, countdown=2**self.request.retries)
+        else:
+            raise MaxRetriesExceededError("Max retries exceeded for OTP SMS task.")
+
+
+@shared_task
+def build_sitemaps():
+    """Pre-render the sitemap files served at /sitemap.xml"""
+    counts = sitemap.build_sitemaps()
+    logger.info(
+        "Sitemaps built: %(written)s written, %(unchanged)s unchanged, "
+        "%(removed)s removed",
+        counts,
+    )
+    return counts
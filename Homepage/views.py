@@ -1,22 +1,20 @@
 import json
 import logging
-import random
 from typing import Any, Dict, Literal
 from urllib.parse import urlencode
 
 import cloudinary
 import requests
 import stripe
+from asgiref.sync import sync_to_async
 from axes.decorators import axes_dispatch
 from cloudinary.uploader import upload
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.contrib.auth.models import Permission
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.tokens import default_token_generator
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.cache import cache
 from django.http import (
@@ -26,7 +24,7 @@ from django.http import (
     HttpResponseRedirect,
     JsonResponse,
 )
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_bytes, force_str
@@ -62,21 +60,19 @@ from Homepage.forms import (
     SignUpForm,
     UserProfileForm,
 )
+from Homepage.google_oauth import aexchange_code_for_token, afetch_user_info
 from Homepage.helper_functions import (
     delete_temporary_cookies,
-    helper_function,
     send_dynamic_mail_template_in_production,
 )
-from Homepage.models import (
-    AdministratorProfile,
-    CustomerProfile,
-    CustomerServiceProfile,
-    CustomSocialAccount,
-    CustomUser,
-    ManagerProfile,
-    SellerProfile,
-    UserProfile,
+from Homepage.models import CustomSocialAccount, CustomUser
+from Homepage.otp_store import OTP_TIMEOUT, allow_otp_dispatch, verify_otp
+from Homepage.permission_resolver import (
+    CachedPermissionRequiredMixin,
+    display_user_type_permissions,
 )
+from Homepage.profile_loader import load_profile, load_profile_for_update
+from Homepage.tasks import revoke_google_token, send_otp_sms
 from i.browsing_history import your_browsing_history
 
 logger = logging.getLogger(__name__)
@@ -161,6 +157,7 @@ class SignupView(View):
 
 class CustomLoginView(View):
     "Custom Login-View"
+
     template_name = "login.html"
     form_class = LogInForm
 
@@ -374,100 +371,87 @@ def google_login(request):
     return redirect(url)
 
 
-def your_callback_view(request):
-    # Get the authorization code from the query parameters
-    code = request.GET.get("code")
+def _login_social_user(request, access_token, refresh_token, user_info):
+    """Create or update the user and its social account, then log the user in"""
+    email = user_info.get("email")
 
-    # Define the parameters for token exchange
-    token_params = {
-        "code": code,
-        "client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
-        "client_secret": settings.GOOGLE_OAUTH_CLIENT_SECRET,
-        "redirect_uri": settings.GOOGLE_OAUTH_REDIRECT_URI,
-        "grant_type": "authorization_code",
-    }
+    try:
+        # Check if the user already exists
+        user = CustomUser.objects.get(email=email)
+        try:
+            # Check if the social account already exists
+            social_account = CustomSocialAccount.objects.get(user=user)
+            # Update the access token and user info
+            social_account.access_token = access_token
+            social_account.user_info = user_info
+            social_account.refresh_token = refresh_token
+            social_account.save()
+
+        except CustomSocialAccount.DoesNotExist:
+            # Create the social account if it doesn't exist
+            social_account = CustomSocialAccount.objects.create(
+                user=user,
+                access_token=access_token,
+                user_info=user_info,
+                refresh_token=refresh_token,
+                code=user_info,
+            )
+    except CustomUser.DoesNotExist:
+        # Create a new user if it doesn't exist
+        user = CustomUser.objects.create(
+            email=email, username=email, user_type="SELLER"
+        )
+        # Create the social account for the new user
+        social_account = CustomSocialAccount.objects.create(
+            user=user,
+            access_token=access_token,
+            user_info=user_info,
+            refresh_token=refresh_token,
+            code=user_info,
+        )
 
-    # Make a POST request to exchange the code for an access token
-    token_response = requests.post(
-        "https://oauth2.googleapis.com/token", data=token_params
-    )
+    if "user_id" in request.session and "social_id" in request.session:
+        logout(request)
 
-    if token_response.status_code == 200:
-        with open("token_response.json", "w") as token_file:
-            json.dump(token_response.json(), token_file)
+    # Log the user in
+    login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+    request.session["social_id"] = social_account.id
+    request.session["user_id"] = social_account.user.id
+    request.session["access_token"] = social_account.access_token
 
-        access_token = token_response.json().get("access_token")
-        refresh_token = token_response.json().get("refresh_token")
 
-        print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$")
-        print(token_response.json())
-        print("####################################################################")
-        print(access_token)
-        print("%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%")
+async def your_callback_view(request):
+    # Get the authorization code from the query parameters
+    code = request.GET.get("code")
 
-        # Use the access token to fetch user data from Google
-        headers = {"Authorization": f"Bearer {access_token}"}
-        user_info_response = requests.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo", headers=headers
-        )
+    try:
+        # Exchange the code for an access token
+        token_response = await aexchange_code_for_token(code)
 
-        # Initialize objects
-        user = None
-        social_account = None
+        if token_response.status_code == 200:
+            token_data = token_response.json()
+            access_token = token_data.get("access_token")
+            refresh_token = token_data.get("refresh_token")
 
-        if user_info_response.status_code == 200:
-            user_info = user_info_response.json()
-            email = user_info.get("email")
+            # Use the access token to fetch user data from Google
+            user_info_response = await afetch_user_info(access_token)
 
-            try:
-                # Check if the user already exists
-                user = CustomUser.objects.get(email=email)
-                try:
-                    # Check if the social account already exists
-                    social_account = CustomSocialAccount.objects.get(user=user)
-                    # Update the access token and user info
-                    social_account.access_token = access_token
-                    social_account.user_info = user_info
-                    social_account.refresh_token = refresh_token
-                    social_account.save()
-
-                except CustomSocialAccount.DoesNotExist:
-                    # Create the social account if it doesn't exist
-                    social_account = CustomSocialAccount.objects.create(
-                        user=user,
-                        access_token=access_token,
-                        user_info=user_info,
-                        refresh_token=refresh_token,
-                        code=user_info,
-                    )
-            except CustomUser.DoesNotExist:
-                # Create a new user if it doesn't exist
-                user = CustomUser.objects.create(
-                    email=email, username=email, user_type="SELLER"
-                )
-                # Create the social account for the new user
-                social_account = CustomSocialAccount.objects.create(
-                    user=user,
-                    access_token=access_token,
-                    user_info=user_info,
-                    refresh_token=refresh_token,
-                    code=user_info,
+            if user_info_response.status_code == 200:
+                await sync_to_async(_login_social_user)(
+                    request, access_token, refresh_token, user_info_response.json()
                 )
+                messages.success(request, "Welcome! you are logged-in")
+                return redirect("Homepage:Home")
 
-            if "user_id" in request.session and "social_id" in request.session:
-                logout(request)
+            logger.error(
+                "Google userinfo request failed: %s", user_info_response.status_code
+            )
+        else:
+            logger.error("Google token exchange failed: %s", token_response.status_code)
 
-            # Log the user in
-            login(request, user, backend="django.contrib.auth.backends.ModelBackend")
-            request.session["social_id"] = social_account.id
-            request.session["user_id"] = social_account.user.id
-            request.session["access_token"] = social_account.access_token
+    except requests.exceptions.RequestException as e:
+        logger.error("Google OAuth callback failed: %s", e)
 
-            messages.success(request, "Welcome! you are logged-in")
-            return redirect("Homepage:Home")
-            # return redirect('Homepage:google_drive')
-        else:
-            return HttpError("response is not 200")
     # Handle errors or unauthorized access appropriately
     return HttpResponseNotFound("<h1>Sorry, an error occurred!</h1>")
 
@@ -560,21 +544,18 @@ class CustomLogoutView(View, SuccessMessageMixin):
         return redirect("Homepage:login")
 
     def google_logout(self, request, access_token):
-        revoke_token_url = "https://oauth2.googleapis.com/revoke"
-        params = {"token": access_token}
-
+        """Queue the token revocation, the user is logged out without waiting"""
         try:
-            revoke_response = requests.post(revoke_token_url, params=params)
-            revoke_response.raise_for_status()
-            logger.info("successfully Google logout: %s", revoke_response)
+            revoke_google_token.delay(access_token)
+            logger.info("Google token revocation queued")
             return True
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             logger.error("Google logout failed: %s", e)
             return False
 
 
 @method_decorator(login_required, name="dispatch")
-class CustomerProfilePageView(PermissionRequiredMixin, TemplateView):
+class CustomerProfilePageView(CachedPermissionRequiredMixin, TemplateView):
     user_profile_form_class = UserProfileForm
     customer_profile_form_class = CustomerProfileForm
     permission_required = [
@@ -603,41 +584,7 @@ class CustomerProfilePageView(PermissionRequiredMixin, TemplateView):
     def display_customer_user_type_permissions(
         self, request
     ) -> set[str | Any] | set[Any]:
-        social_id = request.session.get("social_id")
-
-        # Check if user is not logged in via google account
-        if "user_id" in request.session and not "social_id" in request.session:
-            user = self.request.user
-            user_permissions = user.get_all_permissions()
-            clean_permissions = {
-                permission.split(".")[1] for permission in user_permissions
-            }
-            return clean_permissions
-        else:
-            try:
-                social_user = CustomSocialAccount.objects.filter(id=social_id).first()
-                # model level permissions
-                content_type = ContentType.objects.get_for_model(CustomSocialAccount)
-                permissions = Permission.objects.filter(
-                    content_type=content_type,
-                )
-
-                user = request.user
-                # get all permission for user=social_user.user except Model level
-                user_permissions = user.get_all_permissions()
-                clean_permissions = {
-                    permission.split(".")[1] for permission in user_permissions
-                }
-                # update the user permission with content type permissions
-                clean_permissions.update(
-                    {permission.name for permission in permissions}
-                )
-
-                return clean_permissions
-
-            except CustomSocialAccount.DoesNotExist:
-                messages.error(request, "Social user does not exist")
-                return {}
+        return display_user_type_permissions(request)
 
     def get(
         self, request, *args, **kwargs
@@ -657,11 +604,10 @@ class CustomerProfilePageView(PermissionRequiredMixin, TemplateView):
         if not request.user.is_authenticated:
             return self.redirect_to_login(request)
 
-        current_user = get_object_or_404(CustomUser, id=request.user.id)
-
-        image_form = CustomUserImageForm(instance=current_user)
-        user_profile, created = UserProfile.objects.get_or_create(user=current_user)
-        customer_profile = CustomerProfile.objects.get(customer_profile=user_profile)
+        # missing profile rows are created when the forms are saved
+        current_user, user_profile, customer_profile = load_profile_for_update(
+            request.user, "CUSTOMER"
+        )
 
         user_profile_form = self.user_profile_form_class(
             request.POST, instance=user_profile
@@ -722,16 +668,9 @@ class CustomerProfilePageView(PermissionRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         image = self.request.user.image
-        # Fetch or create user and customer profiles
-        custom_user, created = CustomUser.objects.get_or_create(id=self.request.user.id)
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=self.request.user
-        )
-        (
-            customer_profile,
-            created_customer_profile,
-        ) = CustomerProfile.objects.get_or_create(
-            customer_profile=user_profile, customuser_type_1=self.request.user
+        # Fetch user and customer profiles
+        custom_user, user_profile, customer_profile = load_profile(
+            self.request.user, "CUSTOMER"
         )
 
         # Create forms instances and add to context
@@ -751,7 +690,7 @@ class CustomerProfilePageView(PermissionRequiredMixin, TemplateView):
 
 
 @method_decorator(login_required, name="dispatch")
-class SellerProfilePageView(PermissionRequiredMixin, TemplateView):
+class SellerProfilePageView(CachedPermissionRequiredMixin, TemplateView):
     template_name = "seller_profile_page.html"
     permission_required = [
         "Homepage.seller_edit_profile",
@@ -776,40 +715,7 @@ class SellerProfilePageView(PermissionRequiredMixin, TemplateView):
         return redirect("/login/")
 
     def display_seller_user_type_permissions(self, request):
-        social_id = request.session.get("social_id")
-
-        if "user_id" in request.session and not "social_id" in request.session:
-            user = self.request.user
-            user_permissions = user.get_all_permissions()
-            clean_permissions = {
-                permission.split(".")[1] for permission in user_permissions
-            }
-            return clean_permissions
-        else:
-            try:
-                social_user = CustomSocialAccount.objects.filter(id=social_id).first()
-                # model level permissions
-                content_type = ContentType.objects.get_for_model(CustomSocialAccount)
-                permissions = Permission.objects.filter(
-                    content_type=content_type,
-                )
-
-                user = request.user
-                # get all permission for user=social_user.user except Model level
-                user_permissions = user.get_all_permissions()
-                clean_permissions = {
-                    permission.split(".")[1] for permission in user_permissions
-                }
-                # update the user permission with content type permissions
-                clean_permissions.update(
-                    {permission.name for permission in permissions}
-                )
-
-                return clean_permissions
-
-            except CustomSocialAccount.DoesNotExist:
-                messages.error(request, "Social user does not exist")
-                return {}
+        return display_user_type_permissions(request)
 
     def get(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -821,11 +727,10 @@ class SellerProfilePageView(PermissionRequiredMixin, TemplateView):
         if not request.user.is_authenticated:
             return self.redirect_to_login(request)
 
-        current_user = get_object_or_404(CustomUser, id=request.user.id)
-
-        image_form = CustomUserImageForm(instance=current_user)
-        user_profile, created = UserProfile.objects.get_or_create(user=current_user)
-        seller_profile = SellerProfile.objects.get(seller_profile=user_profile)
+        # missing profile rows are created when the forms are saved
+        current_user, user_profile, seller_profile = load_profile_for_update(
+            request.user, "SELLER"
+        )
 
         user_profile_form = UserProfileForm(request.POST, instance=user_profile)
         seller_profile_form = SellerProfileForm(request.POST, instance=seller_profile)
@@ -882,14 +787,10 @@ class SellerProfilePageView(PermissionRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         image = self.request.user.image
-        # Fetch or create user and customer profiles
+        # Fetch user and seller profiles
         # custom_user == self.request.user
-        custom_user, created = CustomUser.objects.get_or_create(id=self.request.user.id)
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=self.request.user
-        )
-        seller_profile, created_customer_profile = SellerProfile.objects.get_or_create(
-            seller_profile=user_profile, customuser_type_2=self.request.user
+        custom_user, user_profile, seller_profile = load_profile(
+            self.request.user, "SELLER"
         )
 
         # Create forms instances and add to context
@@ -910,7 +811,7 @@ class SellerProfilePageView(PermissionRequiredMixin, TemplateView):
 
 
 @method_decorator(login_required, name="dispatch")
-class CSRProfilePageView(PermissionRequiredMixin, TemplateView):
+class CSRProfilePageView(CachedPermissionRequiredMixin, TemplateView):
     template_name = "csr_profile_page.html"
     permission_required = [
         "Homepage.csr_edit_profile",
@@ -935,40 +836,7 @@ class CSRProfilePageView(PermissionRequiredMixin, TemplateView):
         return redirect("/login/")
 
     def display_csr_user_type_permissions(self, request):
-        social_id = request.session.get("social_id")
-
-        if "user_id" in request.session and not "social_id" in request.session:
-            user = self.request.user
-            user_permissions = user.get_all_permissions()
-            clean_permissions = {
-                permission.split(".")[1] for permission in user_permissions
-            }
-            return clean_permissions
-        else:
-            try:
-                social_user = CustomSocialAccount.objects.filter(id=social_id).first()
-                # model level permissions
-                content_type = ContentType.objects.get_for_model(CustomSocialAccount)
-                permissions = Permission.objects.filter(
-                    content_type=content_type,
-                )
-
-                user = request.user
-                # get all permission for user=social_user.user except Model level
-                user_permissions = user.get_all_permissions()
-                clean_permissions = {
-                    permission.split(".")[1] for permission in user_permissions
-                }
-                # update the user permission with content type permissions
-                clean_permissions.update(
-                    {permission.name for permission in permissions}
-                )
-
-                return clean_permissions
-
-            except CustomSocialAccount.DoesNotExist:
-                messages.error(request, "Social user does not exist")
-                return {}
+        return display_user_type_permissions(request)
 
     def get(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -980,11 +848,10 @@ class CSRProfilePageView(PermissionRequiredMixin, TemplateView):
         if not request.user.is_authenticated:
             return self.redirect_to_login(request)
 
-        current_user = get_object_or_404(CustomUser, id=request.user.id)
-
-        image_form = CustomUserImageForm(instance=current_user)
-        user_profile, created = UserProfile.objects.get_or_create(user=current_user)
-        csr_profile = CustomerServiceProfile.objects.get(csr_profile=user_profile)
+        # missing profile rows are created when the forms are saved
+        current_user, user_profile, csr_profile = load_profile_for_update(
+            request.user, "CUSTOMER REPRESENTATIVE"
+        )
 
         user_profile_form = UserProfileForm(request.POST, instance=user_profile)
         csr_profile_form = CustomerServiceProfileForm(
@@ -1041,17 +908,10 @@ class CSRProfilePageView(PermissionRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         image = self.request.user.image
-        # Fetch or create user and customer profiles
+        # Fetch user and csr profiles
         # custom_user == self.request.user
-        custom_user, created = CustomUser.objects.get_or_create(id=self.request.user.id)
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=self.request.user
-        )
-        (
-            csr_profile,
-            created_customer_profile,
-        ) = CustomerServiceProfile.objects.get_or_create(
-            csr_profile=user_profile, customuser_type_3=self.request.user
+        custom_user, user_profile, csr_profile = load_profile(
+            self.request.user, "CUSTOMER REPRESENTATIVE"
         )
 
         # Create forms instances and add to context
@@ -1071,7 +931,7 @@ class CSRProfilePageView(PermissionRequiredMixin, TemplateView):
 
 
 @method_decorator(login_required, name="dispatch")
-class ManagerProfilePageView(PermissionRequiredMixin, TemplateView):
+class ManagerProfilePageView(CachedPermissionRequiredMixin, TemplateView):
     template_name = "manager_profile_page.html"
     permission_required = [
         "Homepage.manager_edit_profile",
@@ -1096,40 +956,7 @@ class ManagerProfilePageView(PermissionRequiredMixin, TemplateView):
         return redirect("/login/")
 
     def display_manager_user_type_permissions(self, request):
-        social_id = request.session.get("social_id")
-
-        if "user_id" in request.session and not "social_id" in request.session:
-            user = self.request.user
-            user_permissions = user.get_all_permissions()
-            clean_permissions = {
-                permission.split(".")[1] for permission in user_permissions
-            }
-            return clean_permissions
-        else:
-            try:
-                social_user = CustomSocialAccount.objects.filter(id=social_id).first()
-                # model level permissions
-                content_type = ContentType.objects.get_for_model(CustomSocialAccount)
-                permissions = Permission.objects.filter(
-                    content_type=content_type,
-                )
-
-                user = request.user
-                # get all permission for user=social_user.user except Model level
-                user_permissions = user.get_all_permissions()
-                clean_permissions = {
-                    permission.split(".")[1] for permission in user_permissions
-                }
-                # update the user permission with content type permissions
-                clean_permissions.update(
-                    {permission.name for permission in permissions}
-                )
-
-                return clean_permissions
-
-            except CustomSocialAccount.DoesNotExist:
-                messages.error(request, "Social user does not exist")
-                return {}
+        return display_user_type_permissions(request)
 
     def get(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -1141,11 +968,10 @@ class ManagerProfilePageView(PermissionRequiredMixin, TemplateView):
         if not request.user.is_authenticated:
             return self.redirect_to_login(request)
 
-        current_user = get_object_or_404(CustomUser, id=request.user.id)
-
-        image_form = CustomUserImageForm(instance=current_user)
-        user_profile, created = UserProfile.objects.get_or_create(user=current_user)
-        manager_profile = ManagerProfile.objects.get(manager_profile=user_profile)
+        # missing profile rows are created when the forms are saved
+        current_user, user_profile, manager_profile = load_profile_for_update(
+            request.user, "MANAGER"
+        )
 
         user_profile_form = UserProfileForm(request.POST, instance=user_profile)
         manager_profile_form = ManagerProfileForm(
@@ -1200,17 +1026,10 @@ class ManagerProfilePageView(PermissionRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Fetch or create user and customer profiles
+        # Fetch user and manager profiles
         # custom_user == self.request.user
-        custom_user, created = CustomUser.objects.get_or_create(id=self.request.user.id)
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=self.request.user
-        )
-        (
-            manager_profile,
-            created_customer_profile,
-        ) = ManagerProfile.objects.get_or_create(
-            manager_profile=user_profile, customuser_type_4=self.request.user
+        custom_user, user_profile, manager_profile = load_profile(
+            self.request.user, "MANAGER"
         )
 
         # Create forms instances and add to context
@@ -1229,7 +1048,9 @@ class ManagerProfilePageView(PermissionRequiredMixin, TemplateView):
         return context
 
 
-class AdminProfilePageView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+class AdminProfilePageView(
+    LoginRequiredMixin, CachedPermissionRequiredMixin, TemplateView
+):
     login_url = "/login/"
     permission_required = [
         "Homepage.admin_edit_seller_profile",
@@ -1250,53 +1071,11 @@ class AdminProfilePageView(LoginRequiredMixin, PermissionRequiredMixin, Template
         )
 
     def display_manager_user_type_permissions(self, request):
-        social_id = request.session.get("social_id")
-
-        if "user_id" in request.session and not "social_id" in request.session:
-            user = self.request.user
-            user_permissions = user.get_all_permissions()
-            clean_permissions = {
-                permission.split(".")[1] for permission in user_permissions
-            }
-            return clean_permissions
-        else:
-            try:
-                social_user = CustomSocialAccount.objects.filter(id=social_id).first()
-                # model level permissions
-                content_type = ContentType.objects.get_for_model(CustomSocialAccount)
-                permissions = Permission.objects.filter(
-                    content_type=content_type,
-                )
-
-                user = request.user
-                # get all permission for user=social_user.user except Model level
-                user_permissions = user.get_all_permissions()
-                clean_permissions = {
-                    permission.split(".")[1] for permission in user_permissions
-                }
-                # update the user permission with content type permissions
-                clean_permissions.update(
-                    {permission.name for permission in permissions}
-                )
-
-                return clean_permissions
-
-            except CustomSocialAccount.DoesNotExist:
-                messages.error(request, "Social user does not exist")
-                return {}
+        return display_user_type_permissions(request)
 
     def get(self, request):
-        current_user = get_object_or_404(CustomUser, id=self.request.user.id)
-
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=current_user
-        )
-
-        (
-            Admin_profile,
-            created_customer_profile,
-        ) = AdministratorProfile.objects.get_or_create(
-            admin_profile=user_profile, user=current_user
+        current_user, user_profile, Admin_profile = load_profile(
+            self.request.user, "ADMINISTRATOR"
         )
 
         image_form = CustomUserImageForm(instance=current_user)
@@ -1318,15 +1097,9 @@ class AdminProfilePageView(LoginRequiredMixin, PermissionRequiredMixin, Template
         )
 
     def post(self, request):
-        user_profile, created_user_profile = UserProfile.objects.get_or_create(
-            user=self.request.user
-        )
-
-        (
-            Admin_profile,
-            created_customer_profile,
-        ) = AdministratorProfile.objects.get_or_create(
-            admin_profile=user_profile, user=self.request.user
+        # missing profile rows are created when the forms are saved
+        current_user, user_profile, Admin_profile = load_profile_for_update(
+            self.request.user, "ADMINISTRATOR"
         )
 
         user_profile_form = UserProfileForm(request.POST, instance=user_profile)
@@ -1416,11 +1189,6 @@ def send_email(request) -> JsonResponse:
         return JsonResponse({"message": f"Error: {str(e)}"}, status=500)
 
 
-def generate_otp() -> str:
-    # Generate a 6-digit OTP
-    return str(random.randint(100000, 999999))
-
-
 # def send_sms(
 #     request,
 # ) -> HttpResponseRedirect | HttpResponsePermanentRedirect | HttpResponse | JsonResponse:
@@ -1565,37 +1333,46 @@ def validate_user(request, *args, **kwargs):
                 except CustomUser.DoesNotExist:
                     return redirect("Homepage:signup")
 
-            generated_otp = generate_otp()
             phone_number = user.userprofile.phone_number
 
             if phone_number:
 
-                if helper_function(generated_otp, phone_number):
-                    messages.success(request, "An OTP is sent to your mobile number")
-                    response = redirect(reverse("Homepage:validate_otp_view"))
-
-                    # Create OTP Cookie for storing generated otp
-                    response.set_cookie(
-                        key="temporary_cookie",
-                        value=json.dumps(
-                            {
-                                "email": email,
-                                "id": user.id,
-                                "generated_otp": generated_otp,
-                                "referer_url": referer_url,
-                            }
-                        ),
-                        max_age=300,
-                        path="/",
-                        httponly=True,
+                if not allow_otp_dispatch(phone_number.as_e164):
+                    messages.error(
+                        request,
+                        "Too many OTP requests. Please try again later or reset your password via email.",
                     )
-                    return response
-                else:
+                    return redirect("Homepage:login")
+
+                try:
+                    # the task generates the OTP and stores its hash
+                    send_otp_sms.delay(email, phone_number.as_e164)
+                except Exception as e:
+                    logger.error("Unable to queue OTP SMS: %s", e)
                     messages.error(
                         request,
                         "OTP service is currently unavailable. Please reset your password via email.",
                     )
                     return redirect("Homepage:login")
+
+                messages.success(request, "An OTP is sent to your mobile number")
+                response = redirect(reverse("Homepage:validate_otp_view"))
+
+                # Cookie for the user and intent, the OTP itself is kept in the cache
+                response.set_cookie(
+                    key="temporary_cookie",
+                    value=json.dumps(
+                        {
+                            "email": email,
+                            "id": user.id,
+                            "referer_url": referer_url,
+                        }
+                    ),
+                    max_age=OTP_TIMEOUT,
+                    path="/",
+                    httponly=True,
+                )
+                return response
             else:
                 messages.warning(
                     request, "Your profile is not updated, Email-Verification Required"
@@ -1615,7 +1392,6 @@ def validate_otp_view(request, *args, **kwargs):
 
         # Init variables
         email = None
-        generated_otp = None
         referer_url = None
         user = None
 
@@ -1632,7 +1408,6 @@ def validate_otp_view(request, *args, **kwargs):
             return redirect(reverse("Homepage:password_reset_confirm_via_otp"))
 
         email = temporary_cookie.get("email", None)
-        generated_otp = temporary_cookie.get("generated_otp", None)
 
         otp_form = OTPForm(request.POST)
 
@@ -1649,7 +1424,7 @@ def validate_otp_view(request, *args, **kwargs):
             user = cache.get(f"user_{email}")
 
             # Check if the OTP matches and user instance exists
-            if generated_otp == str(user_entered_otp) and user:
+            if user and verify_otp(email, user_entered_otp):
 
                 # deleting temporary_cookie, and otp_cookie
                 response = redirect("/")
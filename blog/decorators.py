@@ -2,11 +2,12 @@ from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import render
 
 from Homepage.models import CustomUser
+from Homepage.permission_resolver import BLOG_ADMIN_PERMISSIONS, user_has_perms
 
 
 def can_update_blogpost(user):
     # Check if the user has the 'update_blogpost' permission
-    return user.has_perm("Homepage.update_blogpost")
+    return user_has_perms(user, ["Homepage.update_blogpost"])
 
 
 update_blogpost_required = user_passes_test(can_update_blogpost)
@@ -18,11 +19,7 @@ def create_update_delete_blogpost_permission_required(view_func):
     """
 
     def _wrapped_view(request, *args, **kwargs):
-        if (
-            request.user.has_perm("Homepage.admin_create_blog")
-            and request.user.has_perm("Homepage.admin_update_blog")
-            and request.user.has_perm("Homepage.admin_delete_blog")
-        ):
+        if user_has_perms(request.user, BLOG_ADMIN_PERMISSIONS):
             return view_func(request, *args, **kwargs)
         else:
             user_email = request.user.email  # Get the user's name (or email)
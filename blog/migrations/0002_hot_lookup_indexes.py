@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-created_on'], name='blog_post_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                condition=models.Q(active=True),
+                fields=['post', 'created_on'],
+                name='blog_comment_active_idx',
+            ),
+        ),
+    ]
@@ -2,6 +2,7 @@ from ckeditor.fields import RichTextField
 from django.db import models
 from django.urls import reverse
 
+from blog.slugs import insert_with_unique_slug, slug_base
 from Homepage.models import CustomUser
 
 STATUS = ((0, "Draft"), (1, "Publish"))
@@ -27,15 +28,29 @@ class Post(models.Model):
 
     class Meta:
         ordering = ["-created_on"]
+        indexes = [
+            models.Index(
+                fields=["status", "-created_on"], name="blog_post_status_created_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        kwargs["force_insert"] = True
+        insert_with_unique_slug(
+            self, slug_base(self.title), lambda: super(Post, self).save(*args, **kwargs)
+        )
+
     def admin_post_count(self, user) -> list[int]:
-        publish = Post.objects.filter(post_admin=user, status="1").count()
-        draft = Post.objects.filter(post_admin=user, status="0").count()
-        total = publish + draft
-        return [publish, draft, total]
+        from blog.post_stats import author_post_stats
+
+        stats = author_post_stats(user.id)
+        return [stats["publish"], stats["draft"], stats["total"]]
 
     def get_absolute_url(self):
         return reverse("blog:live_post", kwargs={"slug": self.slug})
@@ -53,6 +68,14 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["created_on"]
+        indexes = [
+            # the post page lists the active comments only
+            models.Index(
+                fields=["post", "created_on"],
+                condition=models.Q(active=True),
+                name="blog_comment_active_idx",
+            ),
+        ]
 
     def __str__(self):
         return f'Comment "{self.body}" by {self.comments_user.username}'
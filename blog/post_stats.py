@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from blog.models import Post
+
+POST_STATS_TIMEOUT = 60 * 60  # 1 hour
+
+
+def _stats_key(author_id) -> str:
+    return f"blog_post_stats_{author_id}"
+
+
+def author_post_stats(author_id) -> dict:
+    """Published, draft and total post counts of an author, in one query"""
+    key = _stats_key(author_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = Post.objects.filter(post_admin_id=author_id).aggregate(
+            publish=Count("pk", filter=Q(status=1)),
+            draft=Count("pk", filter=Q(status=0)),
+        )
+        stats["total"] = stats["publish"] + stats["draft"]
+        cache.set(key, stats, timeout=POST_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_author_post_stats(author_id) -> None:
+    cache.delete(_stats_key(author_id))
+
+
+def posts_with_comment_counts(author, status=1):
+    """Posts of an author annotated with comment_count, in one query"""
+    return (
+        Post.objects.filter(status=status, post_admin=author)
+        .select_related("post_admin")
+        .annotate(comment_count=Count("comments", filter=Q(comments__active=True)))
+        .order_by("-created_on")
+    )
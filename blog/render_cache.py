@@ -0,0 +1,81 @@
+"""
+Cached data of the published blog pages.
+
+live_post.html caches the rendered post body under the slug and updated_on
+of the post, and the comment thread under the slug and comments_version().
+The view only needs the cached Post, so a warm post page costs no query
+of its own.
+"""
+
+from django.core.cache import cache, caches
+from django.core.paginator import Page, Paginator
+
+from blog.models import Post
+from iii.tiered_cache import (
+    TIERED_CACHE_ALIAS,
+    bump_versions,
+    cached_version,
+    get_or_recompute,
+)
+
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+POSTS_PER_PAGE = 12
+
+FIRST_PAGE_KEY = "blog_home_first_page"
+
+
+def _post_key(slug) -> str:
+    return f"blog_post_{slug}"
+
+
+def _comments_version_key(slug) -> str:
+    return f"blog_comments_version_{slug}"
+
+
+def published_posts():
+    return (
+        Post.objects.filter(status=1)
+        .select_related("post_admin")
+        .order_by("-created_on")
+    )
+
+
+def get_cached_post(slug):
+    """Published post with its author, None if it is not cached"""
+    return cache.get(_post_key(slug))
+
+
+def cache_post(post) -> None:
+    cache.set(_post_key(post.slug), post, timeout=RENDER_CACHE_TIMEOUT)
+
+
+def comments_version(slug):
+    """Version of the comment thread of a post, changed by comment saves"""
+    return cached_version(_comments_version_key(slug))
+
+
+def bump_comments_version(slug) -> None:
+    bump_versions(_comments_version_key(slug))
+
+
+def get_first_page() -> Page:
+    """
+    First page of the blog home, the posts and their count are cached in
+    the tiered cache and computed by one caller at a time.
+    """
+    paginator = Paginator(published_posts(), POSTS_PER_PAGE)
+
+    def compute():
+        page = paginator.page(1)
+        return list(page.object_list), paginator.count
+
+    posts, count = get_or_recompute(FIRST_PAGE_KEY, compute, RENDER_CACHE_TIMEOUT)
+    # count is a cached_property, set it so page links do not query it
+    paginator.count = count
+    return Page(posts, 1, paginator)
+
+
+def invalidate_post(slug) -> None:
+    cache.delete(_post_key(slug))
+    # through the tiered cache, so the L1 copy of this process goes too
+    caches[TIERED_CACHE_ALIAS].delete(FIRST_PAGE_KEY)
@@ -1,22 +1,48 @@
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from slugify import \
-    slugify  # Importing slugify from the python-slugify library
 
-from blog.models import Post
+from blog.models import Comment, Post
+from blog.post_stats import invalidate_author_post_stats
+from blog.render_cache import bump_comments_version, invalidate_post
 
 
 @receiver(pre_save, sender=Post)
-def create_post_slug(sender, instance, *args, **kwargs):
-    if not instance.slug:  # Only create slug if it doesn't exist already
-        base_slug = slugify(instance.title)
-        instance_slug = base_slug[:80]  # Adjust the length of the base slug as needed
-        similar_slugs = Post.objects.filter(slug__startswith=instance_slug).count()
-
-        if similar_slugs > 0:
-            half_meta_description = instance.meta_description[:len(instance.meta_description) // 2]
-            half_meta_description_slug = slugify(half_meta_description)
-            instance_slug += f"-{half_meta_description_slug}"
-            instance.slug = instance_slug[:80]  # Limit slug length if necessary
-        else:
-            instance.slug = instance_slug
+def remember_previous_author(sender, instance, using, **kwargs):
+    # a post moved to another author changes the stats of both
+    instance._previous_post_admin_id = (
+        Post.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list("post_admin_id", flat=True)
+        .first()
+        if not instance._state.adding
+        else None
+    )
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_cached_post(sender, instance, using, **kwargs):
+    # after the commit, or a concurrent request caches the old post again
+    slug = instance.slug
+    transaction.on_commit(lambda: invalidate_post(slug), using=using)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_cached_post_stats(sender, instance, using, **kwargs):
+    author_ids = {
+        instance.post_admin_id,
+        getattr(instance, "_previous_post_admin_id", None),
+    } - {None}
+
+    def invalidate():
+        for author_id in author_ids:
+            invalidate_author_post_stats(author_id)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_cached_comments(sender, instance, using, **kwargs):
+    # after the commit, or the old thread is rendered under the new version
+    post_id = instance.post_id
+    transaction.on_commit(lambda: bump_comments_version(post_id), using=using)
@@ -8,7 +8,12 @@ class BlogPostSitemap(Sitemap):
     limit = 10000  # Maximum number of URLs per sitemap file
 
     def items(self):
-        return Post.objects.filter(status=1)  # Only published posts
+        # Only published posts, ordered so the pages of the sitemap are stable
+        return (
+            Post.objects.filter(status=1)
+            .only("slug", "updated_on")
+            .order_by("created_on", "slug")
+        )
 
     def lastmod(self, obj):
-        return obj.modified_on
+        return obj.updated_on
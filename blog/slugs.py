@@ -0,0 +1,60 @@
+"""
+Unique slugs without scanning the slugs already taken.
+
+The first post of a title gets slugify(title), the next ones base-2, base-3,
+... from a per-base counter kept in the cache, so allocating a slug is one
+cache INCR. A lost counter is seeded again from the database, and a slug
+taken anyway (e.g. by a post saved with an explicit slug) is skipped by the
+unique-constraint retry of insert_with_unique_slug().
+"""
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from slugify import slugify
+
+SLUG_BASE_LENGTH = 80
+MAX_SLUG_ATTEMPTS = 5
+
+
+def _counter_key(model, base) -> str:
+    return f"slug_counter_{model._meta.label_lower}_{base}"
+
+
+def slug_base(text) -> str:
+    return slugify(text)[:SLUG_BASE_LENGTH].strip("-") or "post"
+
+
+def allocate_slug(model, base) -> str:
+    """Next free slug of the base, one cache round trip once the counter exists"""
+    key = _counter_key(model, base)
+    try:
+        number = cache.incr(key)
+    except ValueError:
+        # counts slugs of other bases sharing the prefix too, it only
+        # has to be at least the number of slugs taken by this base
+        taken = model.objects.filter(slug__startswith=base).count()
+        cache.add(key, taken, timeout=None)
+        number = cache.incr(key)
+    return base if number == 1 else f"{base}-{number}"
+
+
+def insert_with_unique_slug(instance, base, insert) -> None:
+    """
+    Give instance a new slug and call insert(), which must force an INSERT.
+    The slug is the primary key, an UPDATE would overwrite another row.
+    """
+    model = instance.__class__
+    for _ in range(MAX_SLUG_ATTEMPTS):
+        instance.slug = allocate_slug(model, base)
+        try:
+            with transaction.atomic():
+                insert()
+            return
+        except IntegrityError:
+            if not model.objects.filter(slug=instance.slug).exists():
+                # another unique field failed, not the slug
+                instance.slug = ""
+                raise
+
+    instance.slug = ""
+    raise IntegrityError(f"no free slug for {base!r} after {MAX_SLUG_ATTEMPTS} tries")
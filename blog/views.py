@@ -3,6 +3,7 @@ from typing import Any
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -11,12 +12,30 @@ from django.views.generic import ListView, TemplateView
 from blog.decorators import create_update_delete_blogpost_permission_required
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.post_stats import author_post_stats, posts_with_comment_counts
+from blog.render_cache import (
+    POSTS_PER_PAGE,
+    RENDER_CACHE_TIMEOUT,
+    cache_post,
+    comments_version,
+    get_cached_post,
+    get_first_page,
+    published_posts,
+)
 from i.decorators import user_comment_permission_required
 
 
 def PostListView(request):
-    blog_posts = Post.objects.filter(status=1).order_by("-created_on")
-    return render(request, "blog_home.html", {"blog_posts": blog_posts})
+    page_number = request.GET.get("page", "1")
+    if page_number == "1":
+        page_obj = get_first_page()
+    else:
+        page_obj = Paginator(published_posts(), POSTS_PER_PAGE).get_page(page_number)
+    return render(
+        request,
+        "blog_home.html",
+        {"blog_posts": page_obj.object_list, "page_obj": page_obj},
+    )
 
 
 @login_required(login_url="Homepage:login")
@@ -24,9 +43,7 @@ def PostListView(request):
 def my_posts_list(request):
     logged_in_user = request.user
     if logged_in_user.user_type == "ADMINISTRATOR":
-        posts = Post.objects.filter(status=1, post_admin=logged_in_user).order_by(
-            "-created_on"
-        )
+        posts = posts_with_comment_counts(logged_in_user)
     else:
         return render(
             request,
@@ -39,8 +56,22 @@ def my_posts_list(request):
 @login_required(login_url="Homepage:login")
 @user_comment_permission_required
 def live_post(request, slug):
-    post = get_object_or_404(Post, slug=slug, status=1)
-    comments = Comment.objects.filter(post=post, active=True)
+    post = get_cached_post(slug)
+    if post is None:
+        # the post and the comment thread are cached for a day, they are
+        # read from default, not from a replica that may lag behind it
+        post = get_object_or_404(
+            Post.objects.using("default").select_related("post_admin"),
+            slug=slug,
+            status=1,
+        )
+        cache_post(post)
+    # not evaluated when the comment thread is rendered from the cache
+    comments = (
+        Comment.objects.using("default")
+        .filter(post=post, active=True)
+        .select_related("comments_user")
+    )
     new_comment = None
 
     if request.method == "POST":
@@ -58,14 +89,26 @@ def live_post(request, slug):
             return render(
                 request,
                 "live_post.html",
-                {"blog_post": post, "comments": comments, "comment_form": comment_form},
+                {
+                    "blog_post": post,
+                    "comments": comments,
+                    "comment_form": comment_form,
+                    "comments_version": comments_version(slug),
+                    "render_cache_timeout": RENDER_CACHE_TIMEOUT,
+                },
             )
     else:
         comment_form = CommentForm()
     return render(
         request,
         "live_post.html",
-        {"blog_post": post, "comments": comments, "comment_form": comment_form},
+        {
+            "blog_post": post,
+            "comments": comments,
+            "comment_form": comment_form,
+            "comments_version": comments_version(slug),
+            "render_cache_timeout": RENDER_CACHE_TIMEOUT,
+        },
     )
 
 
@@ -243,12 +286,12 @@ class Search_Results_For_Admin_My_Post(ListView):
 
         search_requested = self.request.GET.get("search")
         status_requested = self.request.GET.get("value")
-        admin_post_detail = Post.admin_post_count(self, self.request.user)
+        admin_post_detail = author_post_stats(self.request.user.id)
 
         context["status"] = status_requested
         context["search"] = search_requested
-        context["publish"] = admin_post_detail[0]
-        context["draft"] = admin_post_detail[1]
-        context["total"] = admin_post_detail[2]
+        context["publish"] = admin_post_detail["publish"]
+        context["draft"] = admin_post_detail["draft"]
+        context["total"] = admin_post_detail["total"]
 
         return context
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'book_'
+
+    def ready(self):
+        # connects the signals invalidating the memoized helpers
+        import book_.utils  # noqa: F401
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.8 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book_', '0002_bookformat_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookformat',
+            index=models.Index(fields=['format', 'price'], name='book_format_format_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookformat',
+            index=models.Index(fields=['price'], name='book_format_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookformat',
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=['id'],
+                name='book_format_active_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['book_format', 'user'], name='book_review_format_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['book_format', 'user'], name='book_rating_format_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['book_format', 'rating'], name='book_rating_format_rating_idx'),
+        ),
+    ]
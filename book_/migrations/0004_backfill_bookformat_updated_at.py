@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    # rows older than the field have no updated_at, so no sitemap lastmod
+    BookFormat = apps.get_model("book_", "BookFormat")
+    BookFormat.objects.filter(updated_at__isnull=True).update(updated_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book_", "0003_hot_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
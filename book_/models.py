@@ -80,6 +80,20 @@ class BookFormat(models.Model):
         blank=False,
         default="https://res.cloudinary.com/dh8vfw5u0/image/upload/v1702231959/rmpi4l8wsz4pdc6azeyr.ico",
     )
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["format", "price"], name="book_format_format_price_idx"
+            ),
+            models.Index(fields=["price"], name="book_format_price_idx"),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_active=True),
+                name="book_format_active_idx",
+            ),
+        ]
 
     def custom_string_representation_of_object(self):
         return f"Name: {self.book_author_name.book_name} - {self.format} - ${self.price} - Author: {self.book_author_name.author_name}"
@@ -110,6 +124,13 @@ class Review(models.Model):
         default="https://res.cloudinary.com/dh8vfw5u0/image/upload/v1702231959/rmpi4l8wsz4pdc6azeyr.ico",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["book_format", "user"], name="book_review_format_user_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Review by {self.user} for {self.book_format.book_author_name.author_name} - {self.book_format.book_author_name.book_name}"
 
@@ -132,5 +153,15 @@ class Rating(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["book_format", "user"], name="book_rating_format_user_idx"
+            ),
+            models.Index(
+                fields=["book_format", "rating"], name="book_rating_format_rating_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Rating by {self.user} for {self.book_format.book_author_name.author_name}- {self.book_format.book_author_name.book_name}"
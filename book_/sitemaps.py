@@ -0,0 +1,25 @@
+from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
+from book_.models import BookFormat
+
+
+class BookFormatSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.8
+    limit = 10000  # Maximum number of URLs per sitemap file
+
+    def items(self):
+        return (
+            BookFormat.objects.filter(is_active=True)
+            .only("id", "book_author_name_id", "updated_at")
+            .order_by("id")
+        )
+
+    def location(self, obj):
+        return reverse(
+            "book_:book_detail_view",
+            kwargs={"pk": obj.book_author_name_id, "format_id": obj.id},
+        )
+
+    def lastmod(self, obj):
+        return obj.updated_at
@@ -3,22 +3,27 @@
 from django.db.models import Avg, Count
 
 from book_.models import Rating
+from i.utils import RATINGS_TIMEOUT
+from iii.memoize import memoize
 
 
 class RatingCalculator:
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Rating])
     def calculate_average_rating(book):
         return Rating.objects.filter(
             book_format=book
         ).aggregate(average_rating=Avg('rating'))['average_rating'] or 0.0
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Rating])
     def count_users_who_rated(book):
         return Rating.objects.filter(
             book_format=book
         ).count()
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Rating])
     def count_star_ratings(book, star_rating):
         return Rating.objects.filter(
             book_format=book,
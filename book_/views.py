@@ -28,7 +28,7 @@ from i.decorators import (
     user_add_product_permission_required,
     user_comment_permission_required,
 )
-from i.models import ProductCategory
+from i.reference_tables import product_category
 
 
 class Create_Book_Formats_View(SuccessMessageMixin, CreateView):
@@ -102,7 +102,7 @@ class Create_Book_Formats_View(SuccessMessageMixin, CreateView):
                 try:
                     # Set relationships and other attributes for book_format
                     book_format.user = self.request.user
-                    book_category = ProductCategory.objects.get(name="BOOKS")
+                    book_category = product_category("BOOKS")
                     book_format.product_category = book_category
                     book_format.book_author_name = book_author
                     book_format.save()
@@ -253,9 +253,7 @@ class Update_Book_Formats_View(
                                         return super().form_invalid(form)
 
                             book_format.book_author_name = author_form
-                            get_product_category = ProductCategory.objects.get(
-                                name="BOOKS"
-                            )
+                            get_product_category = product_category("BOOKS")
                             book_format.product_category = get_product_category
                             book_format.user = self.object.user
                             book_format.save()
@@ -327,7 +325,7 @@ class FilteredBooksView(TemplateResponseMixin, View, FilteredBooksMixin):
         return paginator.get_page(page_number)
 
     def get_context_data(self, page_obj, form):
-        content_id = ContentType.objects.get(app_label="book_", model="bookformat").id
+        content_id = ContentType.objects.get_for_model(BookFormat).id
         return {
             "content_id": content_id,
             "item_list": page_obj,
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['cart', 'content_type', 'object_id'], name='cart_item_cart_object_idx'),
+        ),
+    ]
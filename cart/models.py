@@ -26,3 +26,11 @@ class CartItem(models.Model):
     content_object = GenericForeignKey("content_type", "object_id")
     quantity = models.PositiveIntegerField(default=1)
     price = models.FloatField(default=0.00)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["cart", "content_type", "object_id"],
+                name="cart_item_cart_object_idx",
+            ),
+        ]
@@ -8,12 +8,13 @@ from django.shortcuts import get_object_or_404, redirect, render
 
 from cart.cart_items import add_product_to_cart_history, your_cart_items
 from cart.models import Cart, CartItem
+from Homepage.request_identity import get_request_identity
 
 # from checkout.models import Payment
 
 
 def add_to_cart(request, content_id, product_id):
-    if "user_id" in request.session:
+    if get_request_identity(request).is_logged_in:
         add_to_cart_helper(request, content_id, product_id)
         return redirect("cart:cart_view")
     else:
@@ -25,15 +26,7 @@ def remove_from_cart(request, content_id, product_id):
     if request.method == "GET":
         if "user_id" and "cart_items" in request.session:
             content_type = ContentType.objects.get_for_id(content_id)
-            # cart = Cart.objects.get(user=request.user)
-
-            cart = (
-                Cart.objects.filter(user=request.user)
-                .exclude(cart_payment__isnull=False)
-                .select_related("user")
-            )
-
-            cart = cart.first()
+            cart = get_request_identity(request).cart
 
             cart_item = CartItem.objects.get(
                 cart=cart, content_type=content_type, object_id=product_id
@@ -80,7 +73,10 @@ def remove_from_cart(request, content_id, product_id):
 
 def cart_view(request):
     if request.method == "GET":
-        if "user_id" in request.session and "cart_items" in request.session:
+        if (
+            get_request_identity(request).is_logged_in
+            and "cart_items" in request.session
+        ):
             cart_items = your_cart_items(request)
 
             # cart = Cart.objects.get(user=request.user)
@@ -143,18 +139,12 @@ def add_to_cart_helper(request, content_type_id, product_id):
     model_class = get_model_name(content_type_id)
 
     product = get_object_or_404(model_class, pk=product_id)
-    user_id = request.session.get("user_id")
+    identity = get_request_identity(request)
 
-    cart = (
-        Cart.objects.filter(user=request.user)
-        .exclude(cart_payment__isnull=False)
-        .select_related("user")
-    )
-
-    if not cart.exists():
-        cart = Cart.objects.create(user=request.user)
-    else:
-        cart = cart.first()
+    cart = identity.cart
+    if cart is None:
+        cart = Cart.objects.create(user=identity.user)
+        identity.set_cart(cart)
 
     cart_item, cart_item_created = CartItem.objects.get_or_create(
         cart=cart,
@@ -181,7 +171,7 @@ def add_to_cart_helper(request, content_type_id, product_id):
 
 def get_model_name(content_type_id):
     try:
-        content_type = ContentType.objects.get(id=content_type_id)
+        content_type = ContentType.objects.get_for_id(content_type_id)
         model_class = content_type.model_class()
         return model_class
     except ContentType.DoesNotExist:
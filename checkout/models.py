@@ -34,6 +34,16 @@ class Payment(models.Model):
 
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["stripe_charge_id"], name="checkout_payment_charge_idx"
+            ),
+            models.Index(
+                fields=["user", "timestamp"], name="checkout_payment_user_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.user.username
 
@@ -6,15 +6,15 @@ from django.contrib import messages
 
 # from django.contrib.auth import login, logout
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect, render
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
 from cart.cart_items import update_cart_items
 from cart.models import Cart, CartItem
 from checkout.models import Payment, Refund
-from Homepage.models import CustomUser, UserProfile
+from Homepage.request_identity import get_request_identity
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
@@ -23,24 +23,18 @@ class CheckOutView(View):
     template_name = "checkout.html"
 
     def get_user_from_cookie(self):
-        user_id = self.request.session.get("user_id")
-        user = get_object_or_404(CustomUser, id=user_id)
-        print(f"Get user_from_cookie, Current user for checkout : {user.email}")
+        user = get_request_identity(self.request).user
+        if user is None:
+            raise Http404("No user found for the current session")
         return user
 
     def get_cart_for_user(self):
-        cart = (
-            Cart.objects.filter(user=self.request.user)
-            .exclude(cart_payment__isnull=False)
-            .select_related("user")
-            .first()
-        )
-        print(f"Inside get_cart_for_user(), Cart for current user: {cart}")
-        return cart
+        return get_request_identity(self.request).cart
 
     def get_userprofile_for_user(self):
-        user_id = self.request.session.get("user_id")
-        user_profile = get_object_or_404(UserProfile, user__id=user_id)
+        user_profile = get_request_identity(self.request).user_profile
+        if user_profile is None:
+            raise Http404("No profile found for the current user")
         phone = user_profile.phone_number.as_e164
         full_name = user_profile.full_name
         shipping_address = user_profile.shipping_address
@@ -69,7 +63,8 @@ class CheckOutView(View):
             if not cart:
                 return redirect("Homepage:Home")
 
-            email = self.get_user_from_cookie().email
+            user = self.get_user_from_cookie()
+            email = user.email
 
             query = f"email:'{email}' AND phone:'{phone}' AND name:'{name}'"
 
@@ -87,8 +82,7 @@ class CheckOutView(View):
                         and customer["name"] == name
                         and "user_id" in customer["metadata"]
                         and "cart_id" in customer["metadata"]
-                        and customer["metadata"]["user_id"]
-                        == str(self.request.session["user_id"])
+                        and customer["metadata"]["user_id"] == str(user.id)
                         and customer["metadata"]["cart_id"] == str(cart.id)
                     ):
                         stripe_customer = customer
@@ -102,7 +96,7 @@ class CheckOutView(View):
                         email=email,
                         name=name,
                         metadata={
-                            "user_id": self.request.session["user_id"],
+                            "user_id": user.id,
                             "cart_id": cart.id,
                         },
                     )
@@ -120,7 +114,7 @@ class CheckOutView(View):
                         currency="usd",
                         description="Example Charge",
                         metadata={
-                            "user_id": self.request.session["user_id"],
+                            "user_id": user.id,
                             "cart_id": cart.id,
                         },
                     )
@@ -129,7 +123,7 @@ class CheckOutView(View):
 
                 try:
                     payment = Payment.objects.create(
-                        user=self.get_user_from_cookie(),
+                        user=user,
                         cart=cart,
                         stripe_charge_id=charge["id"],
                         stripe_customer_id=stripe_customer["id"],
@@ -249,8 +243,9 @@ def updating_refund_status(refund, request):
 
 class Charge_Refund(View):
     def get_user_from_cookie(self):
-        user_id = self.request.session["user_id"]
-        user = CustomUser.objects.get(id=user_id)
+        user = get_request_identity(self.request).user
+        if user is None:
+            raise Http404("No user found for the current session")
         return user
 
     def get_amount_refunded(self):
@@ -295,7 +290,7 @@ class Charge_Refund(View):
 
 class View_Orders(View):
     def get(self, request, **kwargs):
-        user_id = self.request.session["user_id"]
+        user_id = get_request_identity(self.request).user_id
         # get the cart for which user has confirmed Checkout
 
         cart_objects = Cart.objects.filter(user__id=user_id).select_related("user")
@@ -8,6 +8,7 @@ import celery.contrib.pytest
 import pytest
 from celery.contrib.testing.tasks import ping
 from django.conf import settings
+from django.core.cache import cache, caches
 
 pytest_plugins = "celery.contrib.pytest"
 
@@ -28,9 +29,8 @@ pytest_plugins = "celery.contrib.pytest"
 def celery_config():
 
     settings.CELERY_TASK_ALWAYS_EAGER = True  # Runs tasks synchronously
-    settings.CELERY_TASK_EAGER_PROPAGATES = (
-        True  # Ensures exceptions are raised immediately
-    )
+    # not CELERY_TASK_EAGER_PROPAGATES, an eager retry would raise Retry
+    # instead of running the task again
     settings.BROKER_BACKEND = (
         "memory"  # Use in-memory backend to avoid needing a broker
     )
@@ -56,6 +56,16 @@ faker_logger.setLevel(logging.ERROR)
 factory_logger.setLevel(logging.ERROR)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # a rollback reaches neither the cached values nor the reference tables
+    from i import reference_tables
+
+    cache.clear()
+    caches["tiered"].clear_local()
+    reference_tables.clear()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def configure_logging():
     faker_logger.setLevel(logging.ERROR)
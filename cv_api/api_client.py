@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from prometheus_client import Histogram
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds
+CV_API_TIMEOUT = (3.05, 10)
+
+# Retries of a failed call (5xx, connection error or timeout)
+CV_API_MAX_RETRIES = 2
+CV_API_BACKOFF = 0.1  # seconds, doubled on every retry
+CV_API_BACKOFF_MAX = 2
+
+# Methods that are safe to send again
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+cv_api_latency = Histogram(
+    "cv_api_request_latency_seconds",
+    "Latency of the requests sent to the CV API",
+    ["method", "endpoint", "status"],
+)
+
+
+class CVApiUnavailable(requests.exceptions.RequestException):
+    """The circuit breaker is open, the CV API is not called"""
+
+
+class CircuitBreaker:
+    """
+    Open after `failure_threshold` consecutive failures, then let a single
+    trial call through once `reset_timeout` seconds have passed (half-open).
+    The trial closes the circuit when it succeeds and opens it again when it
+    fails, a trial that never reports back is replaced after `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            if (
+                self.trial_started_at is not None
+                and now - self.trial_started_at < self.reset_timeout
+            ):
+                # half-open, another caller holds the trial call
+                return False
+            self.trial_started_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.reset()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_started_at is not None:
+                # the trial call failed
+                self.opened_at = time.monotonic()
+                self.trial_started_at = None
+                logger.warning("CV API circuit breaker opened again")
+            elif self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                logger.warning("CV API circuit breaker opened")
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session shared by all CV API calls of a process"""
+    session = requests.Session()
+    # the CV API is called without SSL verification, see verify=False before
+    session.verify = False
+    session.headers.update({"Content-Type": "application/json"})
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=20))
+    return session
+
+
+http_session = _build_session()
+circuit_breaker = CircuitBreaker()
+
+
+def get_base_url() -> str:
+    if settings.DEBUG:
+        return "https://diverse-intense-whippet.ngrok-free.app/"
+    return "https://osamaaslam.pythonanywhere.com/"
+
+
+def cv_api_url(path) -> str:
+    return get_base_url() + path.lstrip("/")
+
+
+def _backoff(attempt) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(CV_API_BACKOFF_MAX, CV_API_BACKOFF * 2**attempt))
+
+
+def request(method, path, endpoint, access_token=None, retry=None, **kwargs):
+    """
+    Send a request to the CV API and return the requests.Response.
+
+    `endpoint` is a short name used as the metric label, `path` may contain ids.
+    5xx responses, connection errors and timeouts are retried for idempotent
+    methods, or when `retry` is True. Raises CVApiUnavailable when the circuit
+    breaker is open, and requests.RequestException when the last attempt fails.
+    """
+    method = method.upper()
+    if retry is None:
+        retry = method in IDEMPOTENT_METHODS
+    max_retries = CV_API_MAX_RETRIES if retry else 0
+
+    if access_token:
+        kwargs["headers"] = {
+            "Authorization": f"Bearer {access_token}",
+            **kwargs.get("headers", {}),
+        }
+    kwargs.setdefault("timeout", CV_API_TIMEOUT)
+    url = cv_api_url(path)
+
+    for attempt in range(max_retries + 1):
+        if not circuit_breaker.allow_request():
+            raise CVApiUnavailable(f"CV API circuit is open, {method} {endpoint}")
+
+        start = time.perf_counter()
+        try:
+            response = http_session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            cv_api_latency.labels(method, endpoint, "error").observe(
+                time.perf_counter() - start
+            )
+            circuit_breaker.record_failure()
+            if attempt == max_retries:
+                raise
+            logger.warning("CV API %s %s failed: %s, retrying", method, endpoint, e)
+        else:
+            cv_api_latency.labels(method, endpoint, response.status_code).observe(
+                time.perf_counter() - start
+            )
+            if response.status_code < 500:
+                circuit_breaker.record_success()
+                return response
+
+            circuit_breaker.record_failure()
+            if attempt == max_retries:
+                return response
+            logger.warning(
+                "CV API %s %s returned %s, retrying",
+                method,
+                endpoint,
+                response.status_code,
+            )
+
+        time.sleep(_backoff(attempt))
+
+
+def get(path, endpoint, **kwargs):
+    return request("GET", path, endpoint, **kwargs)
+
+
+def post(path, endpoint, **kwargs):
+    return request("POST", path, endpoint, **kwargs)
+
+
+def patch(path, endpoint, **kwargs):
+    return request("PATCH", path, endpoint, **kwargs)
+
+
+def delete(path, endpoint, **kwargs):
+    return request("DELETE", path, endpoint, **kwargs)
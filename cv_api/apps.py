@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CvApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cv_api'
+
+    def ready(self):
+        import cv_api.signals  # Import signals here
@@ -1,9 +1,7 @@
-import json
-
 import requests
-from django.conf import settings
 from django.http import JsonResponse
 
+from cv_api import api_client as cv_api_client
 from Homepage.models import CustomUser
 
 # Question: difference between class method and instance method in python
@@ -21,16 +19,6 @@ class TokenUtils:
 
     @staticmethod
     def register_user(user):
-        # Define the URL of the API endpoint for user registration
-        if settings.DEBUG:
-            api_url = (
-                "https://diverse-intense-whippet.ngrok-free.app/api/auth/crud-user/"
-            )
-        else:
-            api_url = "https://osamaaslam.pythonanywhere.com/api/auth/crud-user/"
-
-        headers = {"Content-Type": "application/json"}
-
         user_data = {
             "email": user.email,
             "username": user.username,
@@ -39,35 +27,20 @@ class TokenUtils:
 
         try:
             # Send a POST request to the API endpoint to register the user
-            response = requests.post(
-                api_url, data=json.dumps(user_data), headers=headers, verify=False
+            response = cv_api_client.post(
+                "api/auth/crud-user/", "register_user", json=user_data
             )
 
-            # display the Headers in response
-            print(response.headers)
-            # display the response body equivalent to request.body
-            print(response.content)
-
             # Check if the user is created (status code 201)
             if response.status_code == 201:
-                # Parse the JSON response to extract the access and refresh tokens
                 json_response = response.json()
-                print(f"response_register___________{json_response}")
-                return json_response if "id" in response.json() else None
+                return json_response if "id" in json_response else None
 
         except requests.exceptions.RequestException as e:
             return None
 
     @staticmethod  # It can be called either on the class (e.g. C.f()) or on an instance (e.g. C().f()).
     def get_user(user):
-
-        if settings.DEBUG:
-            api_url = "https://diverse-intense-whippet.ngrok-free.app/api/auth/get-api-user-id-for-user/"
-        else:
-            api_url = "https://osamaaslam.pythonanywhere.com/api/auth/get-api-user-id-for-user/"
-
-        headers = {"Content-Type": "application/json"}
-
         user_data = {
             "email": user.email,
             "username": user.username,
@@ -75,23 +48,16 @@ class TokenUtils:
         }
 
         try:
-            response = requests.post(
-                api_url, data=json.dumps(user_data), headers=headers, verify=False
+            response = cv_api_client.post(
+                "api/auth/get-api-user-id-for-user/",
+                "get_user",
+                json=user_data,
+                retry=True,
             )
             if response.status_code == 200:
-                print(f"response_get_____________{response.status_code}")
-                # Parse the JSON response to extract the access and refresh tokens
                 json_response = response.json()
-                # display the Headers in response
-                print(response.headers)
-
-                # display the response body equivalent to request.body
-                print(response.content)
-
-                print(f"user_get_____{json_response}")
 
                 if json_response and "id" in json_response:
-                    print(f"json_response________________{json_response}")
                     return json_response
                 else:
                     return None  # response is list who 0th element id dict containg user details
@@ -106,16 +72,7 @@ class TokenUtils:
 
     @staticmethod  # It can be called either on the class (e.g. C.f()) or on an instance (e.g. C().f()).
     def get_tokens_for_user(user_id):
-
-        if settings.DEBUG:
-            api_url = "https://diverse-intense-whippet.ngrok-free.app/api/auth/token/"
-        else:
-            api_url = "https://osamaaslam.pythonanywhere.com/api/auth/token/"
-
-        headers = {"Content-Type": "application/json"}
-
         user = CustomUser.objects.filter(id=user_id).first()
-        print(f"user_get_tokens_for_user________________{user}")
 
         # Define the user data to be sent in the request body
         user_data = {
@@ -125,53 +82,32 @@ class TokenUtils:
         }
 
         try:
-            # Send a POST request to the API endpoint to register the user
-            response = requests.post(
-                api_url, data=json.dumps(user_data), headers=headers, verify=False
+            response = cv_api_client.post(
+                "api/auth/token/", "get_tokens", json=user_data, retry=True
             )
 
-            # display the Headers in response
-            print(f"headers_get_tokens_for_user________{response.headers}")
-            # display the response body equivalent to request.body
-            print(f"content_get_tokens_for_user--------------{response.content}")
-
             if response.status_code == 200:
                 tokens = response.json()
-                print(f"tokens________________{tokens}")
-                return tokens if "refresh" in response.json() else None
+                return tokens if "refresh" in tokens else None
 
         except requests.exceptions.RequestException as e:
             return None
 
     @staticmethod  # It can be called either on the class (e.g. C.f()) or on an instance (e.g. C().f()).
     def get_new_access_token_for_user(refresh_token):
-        # Define the URL of the API endpoint for acquiring fresh access token using refresh token
+        # Acquire a fresh access token using the refresh token
 
         # Caution :RuntimeError: You called this URL via POST, but the URL doesn't end in a slash and you have APPEND_SLASH set
-        if settings.DEBUG:
-            api_url = (
-                "https://diverse-intense-whippet.ngrok-free.app/api/auth/token/refresh/"
-            )
-        else:
-            api_url = "https://osamaaslam.pythonanywhere.com/api/auth/token/refresh/"
-
-        headers = {"Content-Type": "application/json"}
-
         user_data = {
             "refresh": refresh_token
         }  # key must be "refresh" else 400 Bad request
         try:
-            response = requests.post(
-                api_url, data=json.dumps(user_data), headers=headers, verify=False
+            response = cv_api_client.post(
+                "api/auth/token/refresh/", "refresh_token", json=user_data, retry=True
             )
-            print(response.content)  # json containing the access_token
 
             if response.status_code == 200:
-                response = response.json()
-                access_token = response["access"]
-
-                print(access_token)
-                return access_token
+                return response.json()["access"]
             else:
                 return {
                     "json_response": response.json(),
@@ -185,26 +121,15 @@ class TokenUtils:
     def verify_access_token_for_user(access_token):
 
         # Caution :RuntimeError: You called this URL via POST, but the URL doesn't end in a slash and you have APPEND_SLASH set
-        if settings.DEBUG:
-            api_url = (
-                "https://diverse-intense-whippet.ngrok-free.app/api/auth/token/verify/"
-            )
-        else:
-            api_url = "https://osamaaslam.pythonanywhere.com/api/auth/token/verify/"
-
-        headers = {"Content-Type": "application/json"}
-
         user_data = {
             "token": access_token
         }  # key must be "token" else error status with 400/Bad request
         try:
-            # Send a POST request to the API endpoint to register the user
-            response = requests.post(
-                api_url, data=json.dumps(user_data), headers=headers, verify=False
+            response = cv_api_client.post(
+                "api/auth/token/verify/", "verify_token", json=user_data, retry=True
             )
 
-            # print(response.content) will {} for 200
-
+            # response.content will be {} for 200
             if response.status_code == 200:
                 return True
             else:
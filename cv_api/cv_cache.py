@@ -0,0 +1,94 @@
+import logging
+
+from django.core.cache import cache
+
+from cv_api.models import PersonalInfo
+from iii.tiered_cache import bump_versions, cached_version
+
+logger = logging.getLogger(__name__)
+
+# documents are replaced or dropped by the webhook, the timeout only
+# bounds how long a missed webhook can leave a stale copy
+CV_DOCUMENT_TIMEOUT = 60 * 60 * 6  # 6 hours
+
+
+def _document_version_key(api_id_of_cv) -> str:
+    return f"cv_document_version_{api_id_of_cv}"
+
+
+def _list_version_key(api_user_id) -> str:
+    return f"cv_list_version_{api_user_id}"
+
+
+def _document_key(api_id_of_cv, version) -> str:
+    return f"cv_document_{api_id_of_cv}_v{version}"
+
+
+def _list_key(api_user_id, version) -> str:
+    return f"cv_list_{api_user_id}_v{version}"
+
+
+def document_version(api_id_of_cv):
+    """
+    Version of a CV document, bumped by invalidate_cv(). Read it before
+    fetching the document and store the document under it: a fetch that
+    started before an invalidation stores its copy under a version that is
+    no longer read.
+    """
+    return cached_version(_document_version_key(api_id_of_cv))
+
+
+def list_version(api_user_id):
+    """Version of the CV list of an API user, see document_version()"""
+    return cached_version(_list_version_key(api_user_id))
+
+
+def owns_cv(user, api_id_of_cv) -> bool:
+    """
+    Whether `user` owns the CV. A cached document skips the token check of
+    the CV API, so it is only served to its owner.
+    """
+    return PersonalInfo.objects.filter(
+        user_id_for_personal_info=user, api_id_of_cv=api_id_of_cv
+    ).exists()
+
+
+def get_cv_document(api_id_of_cv, version=None):
+    """CV document from the local cache, None on a miss"""
+    if version is None:
+        version = document_version(api_id_of_cv)
+    return cache.get(_document_key(api_id_of_cv, version))
+
+
+def set_cv_document(api_id_of_cv, document, version=None) -> None:
+    """Store a document fetched at `version`, the current one by default"""
+    if version is None:
+        version = document_version(api_id_of_cv)
+    key = _document_key(api_id_of_cv, version)
+    cache.set(key, document, timeout=CV_DOCUMENT_TIMEOUT)
+
+
+def get_cv_list(api_user_id, version=None):
+    """CV documents of an API user from the local cache, None on a miss"""
+    if version is None:
+        version = list_version(api_user_id)
+    return cache.get(_list_key(api_user_id, version))
+
+
+def set_cv_list(api_user_id, documents, version=None) -> None:
+    """Store a list fetched at `version`, the current one by default"""
+    if version is None:
+        version = list_version(api_user_id)
+    key = _list_key(api_user_id, version)
+    cache.set(key, documents, timeout=CV_DOCUMENT_TIMEOUT)
+
+
+def invalidate_cv(api_id_of_cv=None, api_user_id=None) -> None:
+    """Drop a CV document and the CV list of its owner"""
+    keys = []
+    if api_id_of_cv is not None:
+        keys.append(_document_version_key(api_id_of_cv))
+    if api_user_id is not None:
+        keys.append(_list_version_key(api_user_id))
+    bump_versions(*keys)
+    logger.debug("CV cache invalidated: cv %s, user %s", api_id_of_cv, api_user_id)
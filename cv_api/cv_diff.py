@@ -0,0 +1,42 @@
+"""
+Minimal JSON merge patches (RFC 7396) of a CV document.
+
+The update form only submits the fields it shows, fields the CV API manages
+(ids, status, ...) are missing from it. So a key missing from the submitted
+document means "unchanged", never "delete", and lists are compared on the
+submitted keys of their items only.
+"""
+
+
+def _same(original, submitted) -> bool:
+    if isinstance(original, dict) and isinstance(submitted, dict):
+        return not merge_patch(original, submitted)
+
+    if isinstance(original, list) and isinstance(submitted, list):
+        return len(original) == len(submitted) and all(
+            _same(old, new) for old, new in zip(original, submitted)
+        )
+
+    return original == submitted
+
+
+def merge_patch(original, submitted) -> dict:
+    """
+    Merge patch that turns `original` into `submitted`, {} when nothing changed.
+    Nested objects are patched key by key, a changed list is sent whole
+    as the merge patch format has no way to patch list items.
+    """
+    patch = {}
+    for key, value in submitted.items():
+        if key not in original:
+            patch[key] = value
+            continue
+
+        old_value = original[key]
+        if isinstance(old_value, dict) and isinstance(value, dict):
+            nested = merge_patch(old_value, value)
+            if nested:
+                patch[key] = nested
+        elif not _same(old_value, value):
+            patch[key] = value
+    return patch
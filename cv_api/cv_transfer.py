@@ -0,0 +1,323 @@
+"""
+Stream CVs between the cv_api models and NDJSON, one CV document per line.
+
+A document has the shape the CV API uses: the PersonalInfo fields plus
+"overview", "education", "job" (with its "accomplishment"), "skill",
+"programming_area", "projects" and "publications". "user" is the id of the
+local owner of the CV.
+"""
+
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import requests
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+from cv_api import api_client as cv_api_client
+from cv_api.cv_cache import (
+    document_version,
+    get_cv_document,
+    invalidate_cv,
+    set_cv_document,
+)
+from cv_api.models import (
+    Education,
+    Job,
+    JobAccomplishment,
+    Overview,
+    PersonalInfo,
+    ProgrammingArea,
+    Projects,
+    Publication,
+    SkillAndSkillLevel,
+)
+from cv_api.token_manager import get_access_token
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# requests in flight to the CV API during a sync
+MAX_CONCURRENT_REQUESTS = 8
+
+# document key, model and field pointing to the parent, for the list relations
+LIST_RELATIONS = (
+    ("education", Education, "personal_info"),
+    ("skill", SkillAndSkillLevel, "personal_info"),
+    ("programming_area", ProgrammingArea, "personal_info"),
+    ("projects", Projects, "personal_info"),
+    ("publications", Publication, "personal_info"),
+)
+
+
+def _fields(instance, exclude=()) -> dict:
+    """Concrete fields of an instance except the primary key"""
+    return {
+        field.name: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in exclude
+    }
+
+
+def _field_names(model, exclude=()) -> set:
+    return {
+        field.name
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in exclude
+    }
+
+
+def _build(model, data, exclude=(), **extra):
+    """Unsaved instance of model from the known fields of a document"""
+    names = _field_names(model, exclude)
+    return model(**{k: v for k, v in data.items() if k in names}, **extra)
+
+
+def cv_export_queryset():
+    return PersonalInfo.objects.select_related(
+        "overview", "job__accomplishment"
+    ).prefetch_related(*(key for key, _, _ in LIST_RELATIONS))
+
+
+def serialize_cv(personal_info) -> dict:
+    document = _fields(personal_info, exclude=("user_id_for_personal_info",))
+    document["user"] = personal_info.user_id_for_personal_info_id
+
+    overview = getattr(personal_info, "overview", None)
+    document["overview"] = (
+        _fields(overview, exclude=("personal_info",)) if overview else None
+    )
+
+    job = getattr(personal_info, "job", None)
+    if job:
+        document["job"] = _fields(job, exclude=("personal_info_job",))
+        accomplishment = getattr(job, "accomplishment", None)
+        document["job"]["accomplishment"] = (
+            _fields(accomplishment, exclude=("job",)) if accomplishment else None
+        )
+    else:
+        document["job"] = None
+
+    for key, _, parent_field in LIST_RELATIONS:
+        document[key] = [
+            _fields(item, exclude=(parent_field,))
+            for item in getattr(personal_info, key).all()
+        ]
+    return document
+
+
+def fetch_remote_cv(personal_info):
+    """CV document from the CV API, None when it can not be fetched"""
+    if not personal_info.api_id_of_cv:
+        return None
+    # the CV of personal_info is owned by its user
+    version = document_version(personal_info.api_id_of_cv)
+    document = get_cv_document(personal_info.api_id_of_cv, version)
+    if document is not None:
+        return document
+
+    access_token = get_access_token(personal_info.user_id_for_personal_info_id)
+    if not access_token:
+        return None
+    try:
+        response = cv_api_client.get(
+            f"resume/api/get-personal-info-data/{personal_info.api_id_of_cv}/",
+            "retrieve_cv",
+            access_token=access_token,
+        )
+    except requests.RequestException as e:
+        logger.warning("CV %s not fetched: %s", personal_info.api_id_of_cv, e)
+        return None
+    if response.status_code != 200:
+        return None
+
+    document = response.json()
+    set_cv_document(personal_info.api_id_of_cv, document, version)
+    return document
+
+
+def push_remote_cv(document) -> bool:
+    """Full update of the remote copy of a CV document"""
+    api_id = document.get("api_id_of_cv")
+    api_user_id = document.get("api_user_id_for_cv")
+    user_id = document.get("user")
+    if not api_id or not api_user_id or not user_id:
+        return False
+
+    access_token = get_access_token(user_id)
+    if not access_token:
+        return False
+    payload = {key: value for key, value in document.items() if key != "user"}
+    try:
+        response = cv_api_client.patch(
+            f"resume/patch-put-personal-info-data-for-user/?id={api_id}&user_id={api_user_id}&partial=False",
+            "update_cv",
+            access_token=access_token,
+            data=json.dumps(payload, cls=DjangoJSONEncoder),
+            retry=True,
+        )
+    except requests.RequestException as e:
+        logger.warning("CV %s not synced: %s", api_id, e)
+        return False
+
+    if response.status_code != 200:
+        return False
+    invalidate_cv(api_id, api_user_id)
+    return True
+
+
+def bounded_map(func, items, max_workers=MAX_CONCURRENT_REQUESTS):
+    """
+    Lazy, ordered map of func over items on a thread pool. At most
+    2 * max_workers items are pending, so items is consumed as the
+    results are, never all at once.
+    """
+    # func queries outside of a request, the connections its threads open
+    # are kept for their next items and closed once the map ends
+    thread_connections = {}
+
+    def worker(item):
+        try:
+            return func(item)
+        finally:
+            for conn in connections.all(initialized_only=True):
+                if id(conn) not in thread_connections:
+                    conn.inc_thread_sharing()
+                    thread_connections[id(conn)] = conn
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(executor.submit(worker, item))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        for conn in thread_connections.values():
+            conn.close()
+            conn.dec_thread_sharing()
+
+
+def export_cvs(queryset=None, remote=False, chunk_size=CHUNK_SIZE):
+    """
+    Yield one NDJSON line per CV. With remote=True the document of the
+    CV API replaces the local one, the local one is kept when it can not
+    be fetched.
+    """
+    if queryset is None:
+        queryset = cv_export_queryset()
+    # prefetch_related works per chunk with iterator() since Django 4.1
+    personal_infos = queryset.iterator(chunk_size=chunk_size)
+
+    def to_document(personal_info):
+        document = serialize_cv(personal_info)
+        if remote:
+            remote_document = fetch_remote_cv(personal_info)
+            if remote_document is not None:
+                document.update(remote_document)
+                document["user"] = personal_info.user_id_for_personal_info_id
+        return document
+
+    documents = (
+        bounded_map(to_document, personal_infos)
+        if remote
+        else map(to_document, personal_infos)
+    )
+    for document in documents:
+        yield json.dumps(document, cls=DjangoJSONEncoder) + "\n"
+
+
+def parse_cv_documents(lines):
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number} is not valid JSON: {e}") from e
+
+
+@transaction.atomic
+def _import_chunk(documents) -> None:
+    personal_infos = PersonalInfo.objects.bulk_create(
+        _build(
+            PersonalInfo,
+            document,
+            exclude=("user_id_for_personal_info",),
+            user_id_for_personal_info_id=document.get("user"),
+        )
+        for document in documents
+    )
+
+    overviews, jobs, accomplishments = [], [], []
+    related = {key: [] for key, _, _ in LIST_RELATIONS}
+    for personal_info, document in zip(personal_infos, documents):
+        if document.get("overview"):
+            overviews.append(
+                _build(
+                    Overview,
+                    document["overview"],
+                    exclude=("personal_info",),
+                    personal_info=personal_info,
+                )
+            )
+        if document.get("job"):
+            jobs.append(
+                (
+                    _build(
+                        Job,
+                        document["job"],
+                        exclude=("personal_info_job",),
+                        personal_info_job=personal_info,
+                    ),
+                    document["job"].get("accomplishment"),
+                )
+            )
+        for key, model, parent_field in LIST_RELATIONS:
+            related[key].extend(
+                _build(
+                    model, item, exclude=(parent_field,), personal_info=personal_info
+                )
+                for item in document.get(key) or ()
+            )
+
+    # bulk_create skips Projects.save(), which fills long_description
+    for project in related["projects"]:
+        project.long_description = project.long_description or project.short_description
+
+    Overview.objects.bulk_create(overviews)
+    Job.objects.bulk_create([job for job, _ in jobs])
+    for job, accomplishment in jobs:
+        if accomplishment:
+            accomplishments.append(
+                _build(JobAccomplishment, accomplishment, exclude=("job",), job=job)
+            )
+    JobAccomplishment.objects.bulk_create(accomplishments)
+    for key, model, _ in LIST_RELATIONS:
+        model.objects.bulk_create(related[key])
+
+
+def import_cvs(lines, sync=False, chunk_size=CHUNK_SIZE):
+    """
+    Create the CVs of an NDJSON stream, chunk_size CVs per transaction.
+    With sync=True the CVs are also sent to the CV API.
+    Return (imported, synced).
+    """
+    imported = synced = 0
+    documents = parse_cv_documents(lines)
+    while True:
+        chunk = list(islice(documents, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(chunk)
+        imported += len(chunk)
+        if sync:
+            synced += sum(bounded_map(push_remote_cv, chunk))
+        logger.info("%s CVs imported", imported)
+    return imported, synced
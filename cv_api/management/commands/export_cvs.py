@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from cv_api.cv_transfer import CHUNK_SIZE, cv_export_queryset, export_cvs
+
+
+class Command(BaseCommand):
+    help = "Export CVs as NDJSON, one CV per line"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="-", help="file to write to, '-' for stdout"
+        )
+        parser.add_argument("--user", type=int, help="only the CVs of this user id")
+        parser.add_argument(
+            "--remote",
+            action="store_true",
+            help="export the documents of the CV API instead of the local ones",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = cv_export_queryset().order_by("id")
+        if options["user"]:
+            queryset = queryset.filter(user_id_for_personal_info__id=options["user"])
+
+        lines = export_cvs(
+            queryset, remote=options["remote"], chunk_size=options["chunk_size"]
+        )
+        if options["output"] == "-":
+            exported = self.write_lines(lines, sys.stdout)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                exported = self.write_lines(lines, output)
+
+        self.stderr.write(self.style.SUCCESS(f"{exported} CVs exported"))
+
+    def write_lines(self, lines, output):
+        exported = 0
+        for line in lines:
+            output.write(line)
+            exported += 1
+        return exported
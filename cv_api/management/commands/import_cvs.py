@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cv_api.cv_transfer import CHUNK_SIZE, import_cvs
+
+
+class Command(BaseCommand):
+    help = "Import CVs from NDJSON written by export_cvs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="file to read from, '-' for stdin")
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="also send the imported CVs to the CV API",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            if options["input"] == "-":
+                imported, synced = self.import_lines(sys.stdin, options)
+            else:
+                with open(options["input"], encoding="utf-8") as lines:
+                    imported, synced = self.import_lines(lines, options)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"{imported} CVs imported"))
+        if options["sync"]:
+            self.stdout.write(f"{synced} CVs synced with the CV API")
+
+    def import_lines(self, lines, options):
+        return import_cvs(lines, sync=options["sync"], chunk_size=options["chunk_size"])
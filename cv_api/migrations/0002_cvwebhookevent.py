@@ -0,0 +1,37 @@
+# Generated by Django 4.2.8 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+def clear_placeholder_cv_ids(apps, schema_editor):
+    # CVs waiting for their cv_created event used 9999999 as api_id_of_cv
+    PersonalInfo = apps.get_model("cv_api", "PersonalInfo")
+    PersonalInfo.objects.filter(api_id_of_cv=9999999).update(api_id_of_cv=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('api_id_of_cv', models.IntegerField()),
+                ('api_user_id_for_cv', models.IntegerField()),
+                ('event', models.CharField(choices=[('cv_created', 'CV created'), ('cv_updated', 'CV updated'), ('cv_deleted', 'CV deleted'), ('cv_update_failed', 'CV update failed'), ('cv_deletion_failed', 'CV deletion failed')], max_length=25)),
+                ('status', models.CharField(blank=True, max_length=25)),
+                ('payload', models.JSONField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['api_id_of_cv', 'processed_at'], name='cv_api_cvwe_api_id__5be489_idx')],
+            },
+        ),
+        migrations.RunPython(clear_placeholder_cv_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-19 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_api', '0002_cvwebhookevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalinfo',
+            index=models.Index(fields=['api_id_of_cv'], name='cv_personalinfo_cv_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalinfo',
+            index=models.Index(fields=['api_user_id_for_cv', 'api_id_of_cv'], name='cv_personalinfo_user_cv_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cvwebhookevent',
+            index=models.Index(fields=['processed_at', 'received_at'], name='cv_webhookevent_pending_idx'),
+        ),
+    ]
@@ -31,6 +31,16 @@ class PersonalInfo(models.Model):
     site = models.URLField(blank=True)
     twittername = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["api_id_of_cv"], name="cv_personalinfo_cv_idx"),
+            # the webhooks also look up the CVs of a user not linked yet
+            models.Index(
+                fields=["api_user_id_for_cv", "api_id_of_cv"],
+                name="cv_personalinfo_user_cv_idx",
+            ),
+        ]
+
     def full_name(self):
         return " ".join([self.first_name, self.middle_name, self.last_name])
 
@@ -46,6 +56,39 @@ class TokensForUser(models.Model):
     refresh_token = models.CharField(max_length=1000, blank=False)
 
 
+class CVWebhookEvent(models.Model):
+    EVENT_CHOICES = (
+        ("cv_created", "CV created"),
+        ("cv_updated", "CV updated"),
+        ("cv_deleted", "CV deleted"),
+        ("cv_update_failed", "CV update failed"),
+        ("cv_deletion_failed", "CV deletion failed"),
+    )
+
+    api_id_of_cv = models.IntegerField()
+    api_user_id_for_cv = models.IntegerField()
+    event = models.CharField(max_length=25, choices=EVENT_CHOICES)
+    status = models.CharField(max_length=25, blank=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    # set once the event is applied to PersonalInfo
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["api_id_of_cv", "processed_at"]),
+            # pending_cv_ids(): the events not applied, oldest first
+            models.Index(
+                fields=["processed_at", "received_at"],
+                name="cv_webhookevent_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} - {self.api_id_of_cv}"
+
+
 class Overview(models.Model):
 
     personal_info = models.OneToOneField(
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cv_api.models import TokensForUser
+from cv_api.token_manager import invalidate_tokens
+
+
+@receiver([post_save, post_delete], sender=TokensForUser)
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    invalidate_tokens(instance.user_id)
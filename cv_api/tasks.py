@@ -0,0 +1,65 @@
+import logging
+import time
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from cv_api.models import TokensForUser
+from cv_api.token_manager import (
+    PROACTIVE_REFRESH_ACTIVE_USERS,
+    PROACTIVE_REFRESH_WINDOW,
+    get_token_expiry,
+    refresh_access_token,
+)
+from cv_api.webhooks import apply_events, pending_cv_ids, release_processing
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_expiring_cv_api_tokens():
+    """
+    Beat task: refresh the CV API access tokens of the active users before
+    they expire. Tokens already expired are left to the request path, or
+    every run would log dormant users in again.
+    """
+
+    refreshed = 0
+    active_since = timezone.now() - timedelta(seconds=PROACTIVE_REFRESH_ACTIVE_USERS)
+    tokens = (
+        TokensForUser.objects.filter(user__last_login__gte=active_since)
+        .exclude(access_token="")
+        .values_list("user_id", "access_token")
+        .iterator(chunk_size=500)
+    )
+    now = time.time()
+    for user_id, access_token in tokens:
+        exp = get_token_expiry(access_token)
+        if exp is not None and now < exp < now + PROACTIVE_REFRESH_WINDOW:
+            if refresh_access_token(user_id, margin=PROACTIVE_REFRESH_WINDOW):
+                refreshed += 1
+
+    logger.info(f"CV API tokens refreshed: {refreshed}")
+    return refreshed
+
+
+@shared_task
+def process_cv_webhook_events(api_id_of_cv):
+    """Apply the webhook events received for a CV since the last run"""
+
+    # events recorded from now on schedule a new run
+    release_processing(api_id_of_cv)
+    return apply_events(api_id_of_cv)
+
+
+@shared_task
+def process_pending_cv_webhook_events():
+    """Beat task: apply the events whose processing task was lost"""
+
+    applied = 0
+    for api_id_of_cv in pending_cv_ids(timezone.now() - timedelta(minutes=1)):
+        applied += apply_events(api_id_of_cv)
+
+    logger.info(f"Pending CV webhook events applied: {applied}")
+    return applied
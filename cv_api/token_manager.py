@@ -0,0 +1,173 @@
+import base64
+import json
+import logging
+import time
+
+from django.core.cache import cache
+
+from cv_api.create_read_update_delete_user import TokenUtils
+from cv_api.models import TokensForUser
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+# refresh on the request path only when this close to expiry
+REFRESH_MARGIN = 30
+# the beat task refreshes tokens expiring within this window
+PROACTIVE_REFRESH_WINDOW = 60 * 5
+# of the users who logged in within this, dormant ones refresh on request
+PROACTIVE_REFRESH_ACTIVE_USERS = 60 * 60 * 24
+REFRESH_LOCK_TIMEOUT = 15
+REFRESH_WAIT_TIMEOUT = 5
+
+# in-process cache of decoded expiry, keyed by the token itself
+_MAX_EXPIRY_ENTRIES = 1024
+_expiry_cache = {}
+
+
+def _tokens_cache_key(user_id) -> str:
+    return f"cv_api_tokens_{user_id}"
+
+
+def _refresh_lock_key(user_id) -> str:
+    return f"cv_api_token_refresh_{user_id}"
+
+
+def get_token_expiry(token):
+    """
+    `exp` claim of a JWT as a unix timestamp, None for opaque tokens.
+    The signature is not checked, the CV API does that.
+    """
+    if not token:
+        return None
+    if token in _expiry_cache:
+        return _expiry_cache[token]
+
+    exp = None
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        pass
+
+    if len(_expiry_cache) >= _MAX_EXPIRY_ENTRIES:
+        _expiry_cache.clear()
+    _expiry_cache[token] = exp
+    return exp
+
+
+def expires_within(token, seconds) -> bool:
+    """True when the token is a JWT expiring within `seconds`"""
+    exp = get_token_expiry(token)
+    return exp is not None and exp - time.time() < seconds
+
+
+def load_tokens(user_id):
+    """{"access": ..., "refresh": ...} of the user, or None"""
+    key = _tokens_cache_key(user_id)
+    tokens = cache.get(key)
+    if tokens is not None:
+        return tokens
+
+    token_instance = TokensForUser.objects.filter(user__id=user_id).first()
+    if not token_instance or not token_instance.access_token:
+        return None
+
+    tokens = {
+        "access": token_instance.access_token,
+        "refresh": token_instance.refresh_token,
+    }
+    cache.set(key, tokens, timeout=TOKEN_CACHE_TIMEOUT)
+    return tokens
+
+
+def store_tokens(user_id, access_token, refresh_token=None) -> None:
+    """Save the tokens of the user, refresh_token=None keeps the stored one"""
+    fields = {"access_token": access_token}
+    if refresh_token is not None:
+        fields["refresh_token"] = refresh_token
+
+    updated = TokensForUser.objects.filter(user__id=user_id).update(**fields)
+    if not updated:
+        TokensForUser.objects.create(user_id=user_id, **fields)
+    # post_save is not sent by update(), so drop the cached tokens here
+    invalidate_tokens(user_id)
+
+
+def invalidate_tokens(user_id) -> None:
+    cache.delete(_tokens_cache_key(user_id))
+
+
+def _obtain_new_tokens(user_id, tokens):
+    """Refresh the access token, or log in again when the refresh token expired"""
+    access_token = TokenUtils.get_new_access_token_for_user(tokens["refresh"])
+    if isinstance(access_token, str):
+        store_tokens(user_id, access_token)
+        return access_token
+
+    new_tokens = TokenUtils.get_tokens_for_user(user_id)
+    if new_tokens:
+        store_tokens(user_id, new_tokens["access"], new_tokens["refresh"])
+        return new_tokens["access"]
+
+    logger.error("unable to refresh the CV API tokens of user %s", user_id)
+    return None
+
+
+def _wait_for_refresh(user_id, access_token):
+    """Another process is refreshing, wait for it to store the new token"""
+    deadline = time.monotonic() + REFRESH_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        if not cache.get(_refresh_lock_key(user_id)):
+            tokens = load_tokens(user_id)
+            return tokens["access"] if tokens else None
+
+    # still valid for a few seconds, better than failing the request
+    return None if expires_within(access_token, 0) else access_token
+
+
+def refresh_access_token(user_id, margin=REFRESH_MARGIN):
+    """
+    Refresh the access token of the user unless it is valid for more than
+    `margin` seconds. Concurrent refreshes of a user, in any process, are
+    single-flighted by a cache lock: one caller talks to the CV API, the
+    others wait for its result.
+    """
+    tokens = load_tokens(user_id)
+    if tokens is None:
+        return None
+    if not expires_within(tokens["access"], margin):
+        # refreshed by a concurrent caller
+        return tokens["access"]
+
+    # a lock per user, so a slow CV API holds up this user only
+    lock_key = _refresh_lock_key(user_id)
+    if not cache.add(lock_key, 1, timeout=REFRESH_LOCK_TIMEOUT):
+        return _wait_for_refresh(user_id, tokens["access"])
+
+    try:
+        # refreshed between the check above and taking the lock
+        tokens = load_tokens(user_id)
+        if tokens is None:
+            return None
+        if not expires_within(tokens["access"], margin):
+            return tokens["access"]
+        return _obtain_new_tokens(user_id, tokens)
+    finally:
+        cache.delete(lock_key)
+
+
+def get_access_token(user_id):
+    """
+    Access token of the user for the CV API, None if the user has none.
+    Served from the cache; only a token about to expire is refreshed here,
+    everything else is kept fresh by refresh_expiring_cv_api_tokens.
+    """
+    tokens = load_tokens(user_id)
+    if tokens is None:
+        return None
+    if expires_within(tokens["access"], REFRESH_MARGIN):
+        return refresh_access_token(user_id)
+    return tokens["access"]
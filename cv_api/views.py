@@ -3,22 +3,33 @@ from datetime import date, datetime
 from typing import Any
 
 import requests
-from django.conf import settings
 from django.contrib import messages
+from django.db import transaction
 from django.http import (HttpResponse, HttpResponsePermanentRedirect,
-                         HttpResponseRedirect, JsonResponse, response)
+                         HttpResponseRedirect, JsonResponse)
 from django.shortcuts import redirect, render
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 
+from cv_api import api_client as cv_api_client
+from cv_api.api_client import cv_api_url
 from cv_api.create_read_update_delete_user import TokenUtils
+from cv_api.cv_cache import (document_version, get_cv_document, get_cv_list,
+                             invalidate_cv, list_version, owns_cv,
+                             set_cv_document, set_cv_list)
+from cv_api.cv_diff import merge_patch
 from cv_api.forms import (EducationfoForm, JobAccomplishmentfoForm, JobfoForm,
                           OverviewForm, PersonalInfoForm, ProgrammingAreaForm,
                           ProjectsForm, PublicationForm,
                           SkillAndSkillLevelForm)
 from cv_api.models import PersonalInfo, TokensForUser
+from cv_api.tasks import process_cv_webhook_events
+from cv_api.token_manager import get_access_token, store_tokens
+from cv_api.webhooks import (COALESCE_DELAY, SIGNATURE_HEADER,
+                             InvalidWebhookEvent, claim_processing,
+                             parse_event, record_event, verify_signature)
 from Homepage.models import CustomUser
 
 
@@ -44,35 +55,6 @@ class CVApiPostRequest(TemplateView):
         tokens = TokenUtils.get_tokens_for_user(user_id)
         return tokens
 
-    def verify_token_for_user(self, token_instance) -> bool:
-
-        access_token = token_instance.access_token
-        if TokenUtils.verify_access_token_for_user(access_token):
-            return True
-        else:
-            return False
-
-    def get_new_access_token_for_user(
-        self, token_instance
-    ) -> Any | dict[str, Any] | JsonResponse | None:
-
-        access_token = TokenUtils.get_new_access_token_for_user(
-            token_instance.refresh_token
-        )
-        if access_token is not None:
-            return access_token
-        else:
-            return None
-
-    def create_token_instance_for_user(self, user_id) -> TokensForUser | None:
-        token_instance_created_for_user = None
-
-        user = CustomUser.objects.filter(id=user_id)
-        if user:
-            user = user[0]
-            token_instance_created_for_user = TokensForUser.objects.create(user=user)
-        return token_instance_created_for_user or None
-
     def get(
         self, request, **kwargs
     ) -> (
@@ -81,49 +63,18 @@ class CVApiPostRequest(TemplateView):
         | HttpResponsePermanentRedirect
         | HttpResponse
     ):
-        access_token = None
         if "user_id" in self.request.session and self.request.user.is_authenticated:
             user_id = self.request.session["user_id"]
 
-            user_data = self.get_or_create_api_user(user_id)
-            print(f"user_data_____________{user_data}")
+            # cached token, refreshed ahead of expiry by the beat task
+            if get_access_token(user_id) is None:
+                self.get_or_create_api_user(user_id)
 
-            token_instance = TokensForUser.objects.filter(user__id=user_id)
-            print(f"token_instance_______________{token_instance}")
-            if token_instance:
-                token_instance = token_instance[0]
-                print(
-                    f"token_instance_access_token_______________{token_instance.access_token}"
-                )
-                if token_instance.access_token is not None:
-                    token_is_valid = self.verify_token_for_user(token_instance)
-                    if token_is_valid:
-                        pass
-                    else:
-                        access_token = self.get_new_access_token_for_user(
-                            token_instance
-                        )
-                        print(f"get_new_access_token_for_user------ : {access_token}")
-                        if (
-                            "access" in access_token
-                            and access_token["access"] is not None
-                        ):
-                            token_instance.access_token = access_token
-                        else:
-                            return JsonResponse(
-                                {
-                                    "error": f"response inside view 'get_new_access_token_for_user' is causing error: {response.json()}"
-                                },
-                                status=response.status_code,
-                            )
-            else:
-                token_instance = self.create_token_instance_for_user(user_id)
-
-            tokens = self.get_tokens_for_user(user_id)
-            access_token = tokens["access"]
-            token_instance.access_token = tokens["access"]
-            token_instance.refresh_token = tokens["refresh"]
-            token_instance.save()
+                tokens = self.get_tokens_for_user(user_id)
+                if not tokens:
+                    messages.error(request, "CV service is unavailable, Try again!")
+                    return redirect("Homepage:Home")
+                store_tokens(user_id, tokens["access"], tokens["refresh"])
 
         else:
             return redirect("Homepage:login")
@@ -158,10 +109,10 @@ class CVApiSubmitForm(View):
                 user_data = TokenUtils.get_user(user)
                 print(f"user_data__**************____id________________{user_data}")
                 try:
+                    # api_id_of_cv is set by the cv_created webhook event
                     PersonalInfo.objects.create(
                         user_id_for_personal_info=self.request.user,
                         api_user_id_for_cv=user_data["id"],
-                        api_id_of_cv="9999999",
                     )
                 except Exception as e:
                     messages.info(self.request, "Please try again!")
@@ -182,15 +133,7 @@ class CVApiSubmitForm(View):
         print(f"api_user_id___________{api_user_id}")
 
         try:
-
-            if settings.DEBUG:
-                return HttpResponseRedirect(
-                    f"https://diverse-intense-whippet.ngrok-free.app/resume/?user_id={api_user_id}"
-                )
-            else:
-                return HttpResponseRedirect(
-                    f"https://osamaaslam.pythonanywhere.com/resume/?user_id={api_user_id}"
-                )
+            return HttpResponseRedirect(cv_api_url(f"resume/?user_id={api_user_id}"))
         except Exception as e:
             messages.info(self.request, "Please try again!")
             return redirect("Homepage:Home")
@@ -200,13 +143,24 @@ class ListOfCVForUser(TemplateView):
     template_name = "list_of_cv_for_user.html"
     cv_data = None
 
+    def fetch_cv_list(self, api_user_id, access_token):
+        """CVs of the user from the local cache, or from the CV API on a miss"""
+        version = list_version(api_user_id)
+        cv_list = get_cv_list(api_user_id, version)
+        if cv_list is None:
+            response = cv_api_client.get(
+                f"resume/get-personal-info-data-for-user/?user_id={api_user_id}",
+                "list_cv",
+                access_token=access_token,
+            )
+            response.raise_for_status()
+
+            cv_list = response.json()
+            set_cv_list(api_user_id, cv_list, version)
+        return cv_list
+
     def get_token_from_database(self, user_id):
-        token_instance_for_user_id = TokensForUser.objects.filter(user__id=user_id)
-        if token_instance_for_user_id:
-            access_token = token_instance_for_user_id[0].access_token
-            return access_token
-        else:
-            return None
+        return get_access_token(user_id)
 
     def get(self, request, **kwargs):
         user_id = self.request.user.id
@@ -220,22 +174,8 @@ class ListOfCVForUser(TemplateView):
             else:
                 return super().get(request, **kwargs)
 
-            if settings.DEBUG:
-                url = f"https://diverse-intense-whippet.ngrok-free.app/resume/get-personal-info-data-for-user/?user_id={api_user_id}"
-            else:
-                url = f"https://osamaaslam.pythonanywhere.com/resume/get-personal-info-data-for-user/?user_id={api_user_id}"
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token}",
-            }
-
             try:
-                response = requests.get(url, headers=headers, verify=False)
-                print(response.json())
-                response.raise_for_status()
-
-                self.cv_data = response.json()
+                self.cv_data = self.fetch_cv_list(api_user_id, access_token)
             except requests.RequestException as e:
                 messages.error(self.request, f"Error fetching CV data: {e}")
         else:
@@ -256,13 +196,30 @@ class ListOfCVForUser(TemplateView):
 class RetrieveCVDataToUpdate(View):
 
     def get_token_from_database(self, user_id):
-        token_instance_for_user_id = TokensForUser.objects.filter(user__id=user_id)
-        if token_instance_for_user_id:
-            access_token = token_instance_for_user_id[0].access_token
-            return access_token
-        else:
+        return get_access_token(user_id)
+
+    def fetch_cv_document(self, user, personal_info_id, access_token):
+        """
+        CV document from the local cache when `user` owns it, else from the
+        CV API, which checks the token
+        """
+        version = document_version(personal_info_id)
+        document = get_cv_document(personal_info_id, version)
+        if document is not None and owns_cv(user, personal_info_id):
+            return document
+
+        response = cv_api_client.get(
+            f"resume/api/get-personal-info-data/{personal_info_id}/",
+            "retrieve_cv",
+            access_token=access_token,
+        )
+        if response.status_code != 200:
             return None
 
+        document = response.json()
+        set_cv_document(personal_info_id, document, version)
+        return document
+
     def get(self, request, **kwargs):
         user_id = self.request.user.id
         if (
@@ -276,24 +233,18 @@ class RetrieveCVDataToUpdate(View):
         if access_token:
 
             personal_info_id = kwargs["personal_info_id"]
-
-            if settings.DEBUG:
-                url = f"https://diverse-intense-whippet.ngrok-free.app/resume/api/get-personal-info-data/{personal_info_id}/"
-            else:
-                url = f"https://osamaaslam.pythonanywhere.com/resume/api/get-personal-info-data/{personal_info_id}/"
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token}",
-            }
         else:
             return redirect("Homepage:Home")
 
-        # verify = Flase, is used to bypass SSL or ask the API endpoint not to validate the request
-        response = requests.get(url, headers=headers, verify=False)
-        if response.status_code == 200:
-            # convert the json to '{}' or dictionary
-            json_to_dic = response.json()
+        try:
+            # CV document as '{}' or dictionary
+            json_to_dic = self.fetch_cv_document(
+                request.user, personal_info_id, access_token
+            )
+        except requests.RequestException:
+            json_to_dic = None
+
+        if json_to_dic is not None:
             # return JsonResponse(json_to_dic, safe=False)
             try:
                 overview_text = json_to_dic["overview"]
@@ -624,6 +575,12 @@ class RetrieveCVDataToUpdate(View):
                             user_id_for_personal_info__id=user_id,
                             api_id_of_cv=personal_info_id,
                         ).first()
+                        if cv_to_update is None:
+                            # not a CV of this user, its cached copy is not
+                            # served below either
+                            return JsonResponse(
+                                {"cv_to_update": "CV not found"}, status=404
+                            )
 
                         api_user_id = cv_to_update.api_user_id_for_cv
 
@@ -637,27 +594,35 @@ class RetrieveCVDataToUpdate(View):
                         {f"access token for user id {user_id} not found in datbase"},
                         status=500,
                     )
-                if settings.DEBUG:
-                    url = f"https://diverse-intense-whippet.ngrok-free.app/resume/patch-put-personal-info-data-for-user/?id={personal_info_id}&user_id={api_user_id}&partial=False"
-                else:
-                    url = f"https://osamaaslam.pythonanywhere.com/resume/patch-put-personal-info-data-for-user/?id={personal_info_id}&user_id={api_user_id}&partial=False"
-
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {access_token}",
-                }
-
                 try:
                     json_data = json.dumps(personal_info, cls=DateTimeEncoder)
-                    print(json_data)
 
                 except Exception as e:
                     messages.info(request, "fail to serialize the data")
                     return HttpResponsePermanentRedirect("/")
 
+                # send only what changed when the document the form was
+                # built from is still cached, else the whole document
+                partial = False
+                # cv_to_update has checked that the user owns the CV
+                document = get_cv_document(personal_info_id)
+                if document is not None:
+                    patch = merge_patch(document, json.loads(json_data))
+                    if not patch:
+                        messages.info(request, "No changes to update")
+                        return HttpResponsePermanentRedirect("/")
+                    json_data = json.dumps(patch)
+                    partial = True
+
                 try:
-                    response = requests.patch(
-                        url, headers=headers, data=json_data, verify=False, timeout=5
+                    # the merge patch is a full replacement of the fields
+                    # it contains, so it is safe to send again
+                    response = cv_api_client.patch(
+                        f"resume/patch-put-personal-info-data-for-user/?id={personal_info_id}&user_id={api_user_id}&partial={partial}",
+                        "update_cv",
+                        access_token=access_token,
+                        data=json_data,
+                        retry=True,
                     )
                     response.raise_for_status()
 
@@ -671,6 +636,8 @@ class RetrieveCVDataToUpdate(View):
                     )
 
                 if response.status_code == 200:
+                    invalidate_cv(personal_info_id, api_user_id)
+
                     # Get all PersonalInfo instances for current user
                     instances_of_current_user = PersonalInfo.objects.select_related(
                         "user_id_for_personal_info"
@@ -712,11 +679,7 @@ class DeleteCVForUser(View):
     template_name = "list_of_cv_for_user.html"
 
     def get_token_from_database(self, user_id):
-        instance_for_access_token = TokensForUser.objects.filter(user__id=user_id)
-        if instance_for_access_token:
-            access_token = instance_for_access_token[0].access_token
-            return access_token
-        return None
+        return get_access_token(user_id)
 
     def get(self, request, **kwargs):
         user_id = self.request.user.id
@@ -725,24 +688,20 @@ class DeleteCVForUser(View):
             messages.error(self.request, "Token not found for user.")
             return HttpResponsePermanentRedirect("/")
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {access_token}",
-        }
-
         personal_info_id = kwargs.get("personal_info_id")
 
-        if settings.DEBUG:
-            url = f"https://diverse-intense-whippet.ngrok-free.app/resume/api/get-personal-info-data/{personal_info_id}/"
-        else:
-            url = f"https://osamaaslam.pythonanywhere.com/resume/api/get-personal-info-data/{personal_info_id}/"
-
         try:
-            response = requests.delete(url, headers=headers, verify=False)
-            # response.raise_for_status()
-            print(f"response.json() delte ------ {response.json()}")
+            response = cv_api_client.delete(
+                f"resume/api/get-personal-info-data/{personal_info_id}/",
+                "delete_cv",
+                access_token=access_token,
+            )
 
             if response.status_code == 204 or response.status_code == 200:
+                invalidate_cv(
+                    personal_info_id, response.json()["data"].get("user_id")
+                )
+
                 # Get all PersonalInfo instances for current user
                 instances_of_current_user = PersonalInfo.objects.select_related(
                     "user_id_for_personal_info"
@@ -784,113 +743,30 @@ class DeleteCVForUser(View):
 
 @method_decorator(csrf_exempt, name="dispatch")
 class WebHookEvent(View):
-    def post(self, request, **kwargs):
-        try:
-            data = json.loads(request.body)
-            print(f"request.body________________{request.body}")
-            try:
-
-                personal_info = PersonalInfo.objects.filter(
-                    api_id_of_cv=data["id"], api_user_id_for_cv=data["user_id"]
-                ).first()
-                if not personal_info:
-                    personal_info = PersonalInfo.objects.filter(
-                        api_id_of_cv="9999999", api_user_id_for_cv=data["user_id"]
-                    ).first()
-
-            except Exception as e:
-                print(f"exception in webhook View: {str(e)}")
-                return JsonResponse({"error": str(e)}, status=500)
-
-            if data["event"] == "cv_created":
-                try:
-
-                    personal_info.status = data["status"]
-                    personal_info.api_id_of_cv = data["id"]
-                    personal_info.save()
-                    print(
-                        f"status updated in event cv_created------- status: {personal_info.status} : id : {personal_info.api_id_of_cv}"
-                    )
-
-                    print(f"You have created your CV successfully")
-                    return JsonResponse(
-                        {
-                            "cv_created_status": "Cv creation status updated on client-side"
-                        },
-                        status=200,
-                    )
-
-                except Exception as e:
-                    print(f"cv created but error is caused by----- : {e}")
-                    return JsonResponse({"error": str(e)}, status=500)
-
-            if data["event"] == "cv_updated":
-                try:
-
-                    personal_info.status = data["status"]
-                    print(f"status------------: {personal_info.status}")
-                    personal_info.save()
-                    print("------------- U    P   D   A   T    E   D ---------")
-
-                    print(f"You have updated your CV successfully")
-                    return JsonResponse(
-                        {"cv_updated_status": "Cv status updated on client-side"},
-                        status=200,
-                    )
-
-                except Exception as e:
-                    print(f"execution error in webhook event: cv_updated : {e}")
-                    return JsonResponse({"error": str(e)}, status=500)
-
-            elif data["event"] == "cv_deleted":
-                try:
-                    personal_info.delete()
+    """
+    Record the event and acknowledge it, the PersonalInfo of the CV is
+    updated by the process_cv_webhook_events task.
+    """
 
-                    print(f"You have deleted your CV successfully")
-                    return JsonResponse(
-                        {"cv_deleted": "You have deleted your CV successfully"},
-                        status=200,
-                    )
-                except Exception as e:
-                    return JsonResponse(
-                        {" error deleting on Client-Side": str(e)}, status=500
-                    )
-
-            elif data["event"] == "cv_deletion_failed":
-                try:
-                    personal_info.status = data["status"]
-                    personal_info.save()
-
-                    print(f"Your CV deletion has failed")
-                    return JsonResponse(
-                        {"cv_deletion_failed": "You have created your CV successfully"},
-                        status=200,
-                    )
-
-                except Exception as e:
-                    return JsonResponse({"error": str(e)}, status=500)
-
-            elif data["event"] == "cv_update_failed":
-                try:
-                    personal_info.status = data["status"]
-                    personal_info.save()
-
-                    print(f"Your CV updation has failed on client-side")
-                    return JsonResponse(
-                        {
-                            "cv_update_failed_status": "CV status for update failed on client-side "
-                        },
-                        status=200,
-                    )
-
-                except Exception as e:
-                    print(f"execution error in webhook event: cv_updated : {e}")
-                    return JsonResponse({"error": str(e)}, status=500)
+    def post(self, request, **kwargs):
+        if not verify_signature(request.body, request.META.get(SIGNATURE_HEADER)):
+            return JsonResponse({"error": "invalid signature"}, status=403)
 
-            else:
-                return JsonResponse(
-                    {"event_type": "event type is not cv_updated/cv_deleted"},
-                    status=400,
+        try:
+            event = parse_event(request.body)
+        except InvalidWebhookEvent as e:
+            return JsonResponse({"event_type": str(e)}, status=400)
+
+        api_id_of_cv = event["api_id_of_cv"]
+        record_event(event)
+        # every event changes the remote CV, drop the local copy
+        invalidate_cv(api_id_of_cv, event["api_user_id_for_cv"])
+
+        if claim_processing(api_id_of_cv):
+            transaction.on_commit(
+                lambda: process_cv_webhook_events.apply_async(
+                    args=[api_id_of_cv], countdown=COALESCE_DELAY
                 )
-        except Exception as e:
-            return JsonResponse({"data error": str(e)}, status=500)
+            )
+
+        return JsonResponse({"event": event["event"], "status": "accepted"}, status=200)
@@ -0,0 +1,151 @@
+"""
+CV API webhook events: the view records them, a Celery task applies them.
+
+Events of a CV that arrive within COALESCE_DELAY seconds are applied by a
+single task run, so a burst of updates costs one write per CV.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from cv_api.models import CVWebhookEvent, PersonalInfo
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "HTTP_X_CV_SIGNATURE"
+# seconds the processing task waits for more events of the same CV
+COALESCE_DELAY = 2
+# a scheduled task that never ran stops blocking new ones after this
+SCHEDULED_FLAG_TIMEOUT = 60
+
+EVENTS = frozenset(event for event, _ in CVWebhookEvent.EVENT_CHOICES)
+
+
+class InvalidWebhookEvent(ValueError):
+    pass
+
+
+def verify_signature(body, signature) -> bool:
+    """
+    HMAC-SHA256 of the raw body. Without a secret every event is refused,
+    unless CV_WEBHOOK_ALLOW_UNSIGNED is on in DEBUG.
+    """
+    secret = settings.CV_WEBHOOK_SECRET
+    if not secret:
+        if settings.DEBUG and settings.CV_WEBHOOK_ALLOW_UNSIGNED:
+            return True
+        logger.warning("CV webhook refused, CV_WEBHOOK_SECRET is not set")
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def parse_event(body) -> dict:
+    """Decode and validate the body of a webhook request"""
+    try:
+        data = json.loads(body)
+        event = {
+            "event": data["event"],
+            "api_id_of_cv": int(data["id"]),
+            "api_user_id_for_cv": int(data["user_id"]),
+            "status": str(data.get("status") or ""),
+        }
+    except (TypeError, KeyError, ValueError) as e:
+        raise InvalidWebhookEvent(f"malformed webhook event: {e}") from e
+
+    if event["event"] not in EVENTS:
+        raise InvalidWebhookEvent(f"unknown webhook event: {event['event']}")
+    return {**event, "payload": data}
+
+
+def record_event(event) -> CVWebhookEvent:
+    return CVWebhookEvent.objects.create(**event)
+
+
+def _scheduled_key(api_id_of_cv) -> str:
+    return f"cv_webhook_scheduled_{api_id_of_cv}"
+
+
+def claim_processing(api_id_of_cv) -> bool:
+    """True when no processing task of the CV is pending yet"""
+    return cache.add(_scheduled_key(api_id_of_cv), 1, timeout=SCHEDULED_FLAG_TIMEOUT)
+
+
+def release_processing(api_id_of_cv) -> None:
+    cache.delete(_scheduled_key(api_id_of_cv))
+
+
+def _claim_unlinked_cv(api_id_of_cv, api_user_id) -> None:
+    """Link a new CV to the PersonalInfo created before the CV API gave it an id"""
+    if PersonalInfo.objects.filter(
+        api_id_of_cv=api_id_of_cv, api_user_id_for_cv=api_user_id
+    ).exists():
+        return
+
+    pk = (
+        PersonalInfo.objects.filter(
+            api_user_id_for_cv=api_user_id, api_id_of_cv__isnull=True
+        )
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if pk is None:
+        logger.warning(
+            "CV %s created for an unknown user %s", api_id_of_cv, api_user_id
+        )
+        return
+    PersonalInfo.objects.filter(pk=pk).update(api_id_of_cv=api_id_of_cv)
+
+
+def apply_events(api_id_of_cv) -> int:
+    """
+    Apply the pending events of a CV and return how many were applied.
+    Only the last event sets the status, earlier ones are superseded by it.
+    """
+    with transaction.atomic():
+        events = list(
+            CVWebhookEvent.objects.select_for_update().filter(
+                api_id_of_cv=api_id_of_cv, processed_at__isnull=True
+            )
+        )
+        if not events:
+            return 0
+
+        last = events[-1]
+        api_user_id = last.api_user_id_for_cv
+        if any(event.event == "cv_created" for event in events):
+            _claim_unlinked_cv(api_id_of_cv, api_user_id)
+
+        cvs = PersonalInfo.objects.filter(
+            api_id_of_cv=api_id_of_cv, api_user_id_for_cv=api_user_id
+        )
+        if last.event == "cv_deleted":
+            cvs.delete()
+        else:
+            cvs.update(status=last.status)
+
+        CVWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            processed_at=timezone.now()
+        )
+
+    logger.info("%s webhook events applied to CV %s", len(events), api_id_of_cv)
+    return len(events)
+
+
+def pending_cv_ids(older_than):
+    """CVs with events received before `older_than` and not applied yet"""
+    return (
+        CVWebhookEvent.objects.filter(
+            processed_at__isnull=True, received_at__lt=older_than
+        )
+        .values_list("api_id_of_cv", flat=True)
+        .distinct()
+        .order_by()
+    )
@@ -4,4 +4,10 @@ from django.apps import AppConfig
 
 class IConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'i'
\ No newline at end of file
+    name = 'i'
+
+    def ready(self):
+        # connects the signals invalidating the memoized helpers and the
+        # reference tables
+        import i.reference_tables  # noqa: F401
+        import i.utils  # noqa: F401
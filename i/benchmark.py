@@ -0,0 +1,286 @@
+"""
+Load benchmark of the storefront journeys.
+
+Every journey browses the monitors, filters them, opens a monitor, reviews
+it, adds it to the cart and checks out, through the full middleware stack
+of Django's test client. Journeys run concurrently, one logged in client
+per worker thread. Stripe, Cloudinary and Twilio are stubbed, so the
+numbers are the cost of this project only.
+
+Run it with the benchmark_journeys management command.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from Homepage.models import CustomUser, UserProfile
+from i.models import Monitors
+
+STEPS = ("browse", "filter", "detail", "add_review", "add_to_cart", "checkout")
+PERCENTILES = (50, 95, 99)
+
+# the review form has no permissions of its own in a fresh database
+COMMENT_PERMISSIONS = (
+    "customer_add_comment",
+    "customer_edit_comment",
+    "customer_delete_comment",
+)
+
+STUB_IMAGE_URL = "https://res.cloudinary.com/benchmark/image/upload/review.png"
+# a 1x1 GIF, for the review images
+PIXEL = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01"
+    b"\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+def seed_benchmark_data(monitors, users) -> dict:
+    """
+    Seed the catalog through the management commands of the i app, then
+    copy the seeded monitors up to `monitors` and create `users` customers.
+    """
+    for command in (
+        "product_category",
+        "computersubcategory",
+        "Special_Features",
+        "populate_monitors",
+    ):
+        call_command(command, stdout=StringIO())
+
+    seeded = list(Monitors.objects.prefetch_related("special_features"))
+    templates = [seeded[n % len(seeded)] for n in range(max(monitors - len(seeded), 0))]
+    copies = Monitors.objects.bulk_create(
+        Monitors(
+            **{
+                field.attname: getattr(template, field.attname)
+                for field in Monitors._meta.concrete_fields
+                if not field.primary_key
+            },
+        )
+        for template in templates
+    )
+    Features = Monitors.special_features.through
+    Features.objects.bulk_create(
+        Features(monitors_id=copy.pk, special_features_id=feature.pk)
+        for copy, template in zip(copies, templates)
+        for feature in template.special_features.all()
+    )
+
+    content_type = ContentType.objects.get_for_model(CustomUser)
+    permissions = [
+        Permission.objects.get_or_create(
+            codename=codename,
+            content_type=content_type,
+            defaults={"name": codename.replace("_", " ")},
+        )[0]
+        for codename in COMMENT_PERMISSIONS
+    ]
+    customers = []
+    for n in range(users):
+        customer = CustomUser.objects.create(
+            username=f"benchmark-{n}",
+            email=f"benchmark-{n}@example.com",
+            user_type="CUSTOMER",
+        )
+        customer.user_permissions.add(*permissions)
+        UserProfile.objects.create(
+            user=customer,
+            full_name=f"Benchmark Customer {n}",
+            age=30,
+            gender="Male",
+            phone_number=f"+9230{7000000 + n:08d}",
+            city="Lahore",
+            country="PK",
+            postal_code="54400",
+            shipping_address="Benchmark Street",
+        )
+        customers.append(customer)
+
+    return {
+        "monitor_ids": list(Monitors.objects.values_list("pk", flat=True)),
+        "users": customers,
+    }
+
+
+@contextmanager
+def external_stubs():
+    """Stub the calls to Stripe, Cloudinary and Twilio"""
+    stubs = {
+        "stripe.Customer.search": {"data": []},
+        "stripe.Customer.create": {"id": "cus_benchmark", "metadata": {}},
+        "stripe.Charge.create": {"id": "ch_benchmark"},
+        "i.views.upload": {"url": STUB_IMAGE_URL},
+        "Homepage.helper_functions.helper_function": True,
+        "Homepage.tasks.helper_function": True,
+    }
+    with ExitStack() as stack:
+        for target, return_value in stubs.items():
+            stack.enter_context(mock.patch(target, return_value=return_value))
+        yield
+
+
+def log_in(client, user) -> None:
+    client.force_login(user)
+    session = client.session
+    session["user_id"] = user.pk
+    session.save()
+    # signed cookie sessions live in the cookie only
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+
+def journey_requests(monitor_id, monitor_content_type_id):
+    """(step, method, url, data) of one journey"""
+    return (
+        ("browse", "get", reverse("i:MonitorListView"), None),
+        ("filter", "post", reverse("i:filter"), {"monitor_type": "CARE_MONITOR"}),
+        (
+            "detail",
+            "get",
+            reverse("i:add_review", kwargs={"product_id": monitor_id}),
+            None,
+        ),
+        (
+            "add_review",
+            "post",
+            reverse("i:monitor_add_review", kwargs={"product_id": monitor_id}),
+            {
+                "rating": "4.0",
+                "text": "Sharp picture, good stand.",
+                "image_1": SimpleUploadedFile("1.gif", PIXEL, "image/gif"),
+                "image_2": SimpleUploadedFile("2.gif", PIXEL, "image/gif"),
+            },
+        ),
+        (
+            "add_to_cart",
+            "post",
+            reverse(
+                "cart:add_to_cart",
+                kwargs={
+                    "content_id": monitor_content_type_id,
+                    "product_id": monitor_id,
+                },
+            ),
+            None,
+        ),
+        ("checkout", "post", reverse("checkout:check_out"), {"stripeToken": "tok"}),
+    )
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class BenchmarkResults:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.elapsed = 0.0
+
+    def record(self, step, seconds, ok) -> None:
+        with self._lock:
+            self.durations[step].append(seconds)
+            if not ok:
+                self.errors[step] += 1
+
+    def summary(self) -> dict:
+        steps = {}
+        for step in STEPS:
+            durations = sorted(self.durations[step])
+            steps[step] = {
+                "requests": len(durations),
+                "errors": self.errors[step],
+                "rps": len(durations) / self.elapsed if self.elapsed else 0.0,
+                **{f"p{q}": percentile(durations, q) for q in PERCENTILES},
+            }
+        return {"elapsed": self.elapsed, "steps": steps}
+
+
+def format_summary(summary) -> str:
+    header = f"{'step':<12}{'requests':>9}{'errors':>8}{'rps':>9}" + "".join(
+        f"{f'p{q} ms':>10}" for q in PERCENTILES
+    )
+    lines = [header]
+    for step, stats in summary["steps"].items():
+        latencies = "".join(
+            (
+                f"{stats[f'p{q}'] * 1000:>10.1f}"
+                if stats[f"p{q}"] is not None
+                else f"{'-':>10}"
+            )
+            for q in PERCENTILES
+        )
+        lines.append(
+            f"{step:<12}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['rps']:>9.1f}{latencies}"
+        )
+    lines.append(f"{summary['elapsed']:.2f}s elapsed")
+    return "\n".join(lines)
+
+
+def run_benchmark(data, journeys, concurrency, seed=None) -> BenchmarkResults:
+    """Run `journeys` journeys on `concurrency` threads"""
+    results = BenchmarkResults()
+    content_type_id = ContentType.objects.get_for_model(Monitors).pk
+    rng = random.Random(seed)
+    monitor_ids = [rng.choice(data["monitor_ids"]) for _ in range(journeys)]
+
+    users = list(data["users"])
+    users_lock = threading.Lock()
+    local = threading.local()
+
+    def journey(monitor_id):
+        client = getattr(local, "client", None)
+        if client is None:
+            # got_request_exception is global, a client raising the view
+            # exceptions would raise those of the other threads too
+            client = local.client = Client(raise_request_exception=False)
+            with users_lock:
+                user = users.pop()
+            log_in(client, user)
+
+        for step, method, url, body in journey_requests(monitor_id, content_type_id):
+            start = time.perf_counter()
+            response = getattr(client, method)(url, body)
+            ok = response.status_code < 500
+            results.record(step, time.perf_counter() - start, ok)
+
+    def worker(monitor_id):
+        try:
+            journey(monitor_id)
+        finally:
+            # the login of a thread queries outside of a request
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, monitor_ids))
+    results.elapsed = time.perf_counter() - start
+    return results
+
+
+def write_summary(path, summary, **config) -> None:
+    with open(path, "w") as f:
+        json.dump({"config": config, **summary}, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,525 @@
+"""
+Synthetic catalog at production scale.
+
+Users, monitors, books, reviews, ratings, carts and blog posts are generated
+in chunks of `chunk_size` rows and inserted with bulk_create, the special
+features of the monitors through bulk inserts into the M2M through table.
+The phases run in order, as each one points at the rows of the previous
+ones. The chunks of a phase are independent of each other and run on a pool
+of `processes` worker processes when asked to; every chunk is one
+transaction.
+
+The rows reference each other by the primary keys bulk_create returns,
+which SQLite and PostgreSQL do. The values come from the choices of the
+forms, so the filters of the storefront find the seeded products. A user
+reviews or rates a product at most once, as the views expect.
+
+Seeded users share the password PASSWORD, hashed once, so they are only
+seeded with DEBUG on or allow_production. Run it with the seed_catalog
+management command.
+"""
+
+import functools
+import math
+import multiprocessing
+import random
+from decimal import Decimal
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, connections, transaction
+
+from blog.models import Comment, Post
+from book_.models import BookAuthorName, BookFormat, Rating
+from book_.models import Review as BookReview
+from cart.models import Cart, CartItem
+from Homepage.models import CustomUser, UserProfile
+from i.forms import MonitorsForm
+from i.models import ComputerSubCategory, Monitors, ProductCategory
+from i.models import Review as MonitorReview
+from i.models import Special_Features
+
+DEFAULT_CHUNK_SIZE = 5000
+PASSWORD = "seed-password"
+
+# one user in SELLER_EVERY sells, one in ADMIN_EVERY writes the blog
+SELLER_EVERY = 10
+ADMIN_EVERY = 50
+MAX_FEATURES = 4
+MAX_FORMATS = 4
+MAX_CART_ITEMS = 5
+MAX_COMMENTS = 5
+
+CITIES = ("Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan", "Peshawar")
+WORDS = (
+    "sharp",
+    "bright",
+    "solid",
+    "quiet",
+    "fast",
+    "cheap",
+    "thin",
+    "great",
+    "colour",
+    "stand",
+    "panel",
+    "price",
+    "delivery",
+    "value",
+    "screen",
+    "story",
+    "chapter",
+    "author",
+)
+SCREEN_SIZES = ('21.5"', '24"', '27"', '32"', '34"')
+ASPECT_RATIOS = ("16:9", "16:10", "21:9")
+COLORS = ("Black", "White", "Silver")
+PUBLISHERS = ("Penguin", "Vintage", "Orbit", "Tor", "Picador")
+
+# (model, field, prefix) of the phases whose rows are numbered, a new run
+# continues the numbering after the seeded rows
+NUMBERED = {
+    "users": (CustomUser, "username", "seed-user-"),
+    "monitors": (Monitors, "name", "Seed Monitor "),
+    "books": (BookAuthorName, "book_name", "Seed Book "),
+    "posts": (Post, "title", "Seed Post "),
+}
+
+
+def _choices(pairs) -> tuple:
+    return tuple(value for value, _ in pairs)
+
+
+def _sentence(rng, words=12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _price(rng, low, high) -> Decimal:
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+@functools.lru_cache
+def _stride(count) -> int:
+    # n * stride % count visits every number below count once when the
+    # stride is coprime with count
+    stride = int(count * 0.618) + 1
+    while math.gcd(stride, count) != 1:
+        stride += 1
+    return stride
+
+
+def _pair(n, users, products) -> tuple:
+    """
+    The n-th (user, index of a product) pair in a shuffled order, distinct
+    for the n of a range no longer than len(users) * products.
+    """
+    count = len(users) * products
+    p = n * _stride(count) % count
+    return users[p // products], p % products
+
+
+def _new_pairs(model, product_field, pairs) -> list:
+    """`pairs` without duplicates and the ones a row of `model` already has"""
+    existing = set(
+        model.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            **{f"{product_field}__in": {product_id for _, product_id in pairs}},
+        ).values_list("user_id", product_field)
+    )
+    return list(dict.fromkeys(pair for pair in pairs if pair not in existing))
+
+
+def seed_users(start, stop, rng, context) -> int:
+    users = [
+        CustomUser(
+            username=f"seed-user-{n}",
+            email=f"seed-user-{n}@example.com",
+            password=context["password"],
+            user_type=(
+                "ADMINISTRATOR"
+                if n % ADMIN_EVERY == 0
+                else "SELLER" if n % SELLER_EVERY == 0 else "CUSTOMER"
+            ),
+        )
+        for n in range(start, stop)
+    ]
+    users = CustomUser.objects.bulk_create(users)
+    UserProfile.objects.bulk_create(
+        UserProfile(
+            user_id=user.pk,
+            full_name=f"Seed User {n}",
+            age=rng.randint(18, 80),
+            gender=rng.choice(_choices(UserProfile.GENDER_CHOICES)),
+            # +9234 numbers are not handed out by generate_unique_phone_number
+            phone_number=f"+9234{n:08d}",
+            city=rng.choice(CITIES),
+            country="PK",
+            postal_code=f"{rng.randint(10000, 99999)}",
+            shipping_address=f"House {n}, Street {rng.randint(1, 99)}",
+        )
+        for n, user in zip(range(start, stop), users)
+    )
+    return len(users)
+
+
+def seed_monitors(start, stop, rng, context) -> int:
+    monitors = [
+        Monitors(
+            name=f"Seed Monitor {n}",
+            brand=rng.choice(_choices(MonitorsForm.brand_choices)),
+            aspect_ratio=rng.choice(ASPECT_RATIOS),
+            max_display_resolution=rng.choice(
+                _choices(MonitorsForm.max_display_resolution_choices)
+            ),
+            screen_size=rng.choice(SCREEN_SIZES),
+            monitor_type=rng.choice(_choices(MonitorsForm.monitor_type_choices)),
+            refresh_rate=rng.choice(_choices(MonitorsForm.refresh_rate_choices)),
+            mounting_type=rng.choice(_choices(MonitorsForm.mounting_type_choices)),
+            item_dimensions="20x10x5 inches",
+            item_weight=rng.randint(2000, 9000),
+            color=rng.choice(COLORS),
+            price=_price(rng, 80, 1500),
+            quantity_available=rng.randint(0, 100),
+            Product_Category_id=context["computer_category"],
+            Computer_SubCategory_id=context["monitor_sub_category"],
+            user_id=rng.choice(context["sellers"]),
+        )
+        for n in range(start, stop)
+    ]
+    monitors = Monitors.objects.bulk_create(monitors)
+    Features = Monitors.special_features.through
+    Features.objects.bulk_create(
+        Features(monitors_id=monitor.pk, special_features_id=feature)
+        for monitor in monitors
+        for feature in rng.sample(context["features"], rng.randint(0, MAX_FEATURES))
+    )
+    return len(monitors)
+
+
+def seed_books(start, stop, rng, context) -> int:
+    books = [
+        BookAuthorName(
+            book_name=f"Seed Book {n}",
+            author_name=f"Author {n // 3}",
+            about_author=_sentence(rng),
+        )
+        for n in range(start, stop)
+    ]
+    books = BookAuthorName.objects.bulk_create(books)
+    formats = _choices(BookFormat.FORMAT_CHOICES)
+    BookFormat.objects.bulk_create(
+        BookFormat(
+            book_author_name_id=book.pk,
+            user_id=rng.choice(context["sellers"]),
+            product_category_id=context["books_category"],
+            format=book_format,
+            is_new_available=rng.randint(0, 50),
+            is_used_available=rng.randint(0, 50),
+            publisher_name=rng.choice(PUBLISHERS),
+            length=rng.randint(80, 900),
+            price=_price(rng, 5, 120),
+        )
+        for book in books
+        for book_format in rng.sample(formats, rng.randint(1, MAX_FORMATS))
+    )
+    return len(books)
+
+
+def seed_reviews(start, stop, rng, context) -> int:
+    """Reviews of monitors and book formats, one per user and product"""
+    monitors, book_formats = context["monitors"], context["book_formats"]
+    monitor_pairs, book_pairs = [], []
+    for n in range(start, stop):
+        user_id, product = _pair(n, context["users"], len(monitors) + len(book_formats))
+        if product < len(monitors):
+            monitor_pairs.append((user_id, monitors[product]))
+        else:
+            book_pairs.append((user_id, book_formats[product - len(monitors)]))
+
+    monitor_reviews = [
+        MonitorReview(
+            user_id=user_id,
+            product_id=product_id,
+            rating=Decimal(rng.randint(10, 50)) / 10,
+            text=_sentence(rng),
+        )
+        for user_id, product_id in _new_pairs(
+            MonitorReview, "product_id", monitor_pairs
+        )
+    ]
+    book_reviews = [
+        BookReview(
+            user_id=user_id,
+            book_format_id=book_format_id,
+            title=_sentence(rng, words=3),
+            content=_sentence(rng),
+        )
+        for user_id, book_format_id in _new_pairs(
+            BookReview, "book_format_id", book_pairs
+        )
+    ]
+    MonitorReview.objects.bulk_create(monitor_reviews)
+    BookReview.objects.bulk_create(book_reviews)
+    return len(monitor_reviews) + len(book_reviews)
+
+
+def seed_ratings(start, stop, rng, context) -> int:
+    book_formats = context["book_formats"]
+    pairs = []
+    for n in range(start, stop):
+        user_id, book_format = _pair(n, context["users"], len(book_formats))
+        pairs.append((user_id, book_formats[book_format]))
+    ratings = Rating.objects.bulk_create(
+        Rating(
+            user_id=user_id,
+            book_format_id=book_format_id,
+            rating=Decimal(rng.randint(1, 5)),
+        )
+        for user_id, book_format_id in _new_pairs(Rating, "book_format_id", pairs)
+    )
+    return len(ratings)
+
+
+def seed_carts(start, stop, rng, context) -> int:
+    products = [
+        (content_type, ids)
+        for content_type, ids in (
+            (context["monitor_type"], context["monitors"]),
+            (context["book_format_type"], context["book_formats"]),
+        )
+        if ids
+    ]
+    carts, items = [], []
+    for _ in range(start, stop):
+        cart_items = []
+        for _ in range(rng.randint(1, MAX_CART_ITEMS)):
+            content_type, ids = rng.choice(products)
+            cart_items.append(
+                CartItem(
+                    content_type_id=content_type,
+                    object_id=rng.choice(ids),
+                    quantity=rng.randint(1, 3),
+                    price=float(_price(rng, 5, 1500)),
+                )
+            )
+        subtotal = sum(item.price * item.quantity for item in cart_items)
+        carts.append(
+            Cart(
+                user_id=rng.choice(context["users"]),
+                subtotal=subtotal,
+                total=subtotal,
+            )
+        )
+        items.append(cart_items)
+
+    carts = Cart.objects.bulk_create(carts)
+    for cart, cart_items in zip(carts, items):
+        for item in cart_items:
+            item.cart_id = cart.pk
+    CartItem.objects.bulk_create(item for cart_items in items for item in cart_items)
+    return len(carts)
+
+
+def seed_posts(start, stop, rng, context) -> int:
+    # bulk_create skips Post.save, the slug is set here
+    posts = Post.objects.bulk_create(
+        Post(
+            title=f"Seed Post {n}",
+            slug=f"seed-post-{n}",
+            meta_description=_sentence(rng, words=8),
+            post_admin_id=rng.choice(context["admins"]),
+            content="".join(f"<p>{_sentence(rng, words=40)}</p>" for _ in range(5)),
+            status=1,
+        )
+        for n in range(start, stop)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            post_id=post.slug,
+            comments_user_id=rng.choice(context["users"]),
+            body=_sentence(rng),
+        )
+        for post in posts
+        for _ in range(rng.randint(0, MAX_COMMENTS))
+    )
+    return len(posts)
+
+
+PHASES = {
+    "users": seed_users,
+    "monitors": seed_monitors,
+    "books": seed_books,
+    "reviews": seed_reviews,
+    "ratings": seed_ratings,
+    "carts": seed_carts,
+    "posts": seed_posts,
+}
+
+
+def _ids(queryset) -> list:
+    return list(queryset.values_list("pk", flat=True))
+
+
+def _category(model, name, **defaults) -> int:
+    return model.objects.get_or_create(name=name, defaults=defaults)[0].pk
+
+
+def phase_context(phase) -> dict:
+    """The keys of the existing rows the rows of `phase` point at"""
+    if phase == "users":
+        return {"password": make_password(PASSWORD)}
+
+    if phase in ("monitors", "books"):
+        computer_category = _category(ProductCategory, "COMPUTER")
+        return {
+            "sellers": _ids(CustomUser.objects.filter(user_type="SELLER")),
+            "computer_category": computer_category,
+            "monitor_sub_category": _category(
+                ComputerSubCategory,
+                "MONITORS",
+                product_category_id=computer_category,
+            ),
+            "books_category": _category(ProductCategory, "BOOKS"),
+            "features": [
+                _category(Special_Features, name)
+                for name in _choices(Special_Features.SPECIAL_FEATURES_CHOICES)
+            ],
+        }
+
+    context = {"users": _ids(CustomUser.objects.all())}
+    if phase == "posts":
+        context["admins"] = _ids(CustomUser.objects.filter(user_type="ADMINISTRATOR"))
+    else:
+        context["monitors"] = _ids(Monitors.objects.filter(is_active=True))
+        context["book_formats"] = _ids(BookFormat.objects.all())
+        context["monitor_type"] = ContentType.objects.get_for_model(Monitors).pk
+        context["book_format_type"] = ContentType.objects.get_for_model(BookFormat).pk
+    return context
+
+
+def missing_rows(phase, context) -> list:
+    """What is missing from the database for `phase` to point at"""
+    needed = {
+        "monitors": ("sellers",),
+        "books": ("sellers",),
+        "reviews": ("users",),
+        "ratings": ("users", "book_formats"),
+        "carts": ("users",),
+        "posts": ("users", "admins"),
+    }.get(phase, ())
+    missing = [key for key in needed if not context[key]]
+    if phase in ("reviews", "carts") and not (
+        context["monitors"] or context["book_formats"]
+    ):
+        missing.append("monitors or book_formats")
+    return missing
+
+
+def pair_count(phase, context):
+    """How many (user, product) pairs `phase` draws from, None if it does not"""
+    if phase == "reviews":
+        products = len(context["monitors"]) + len(context["book_formats"])
+    elif phase == "ratings":
+        products = len(context["book_formats"])
+    else:
+        return None
+    return len(context["users"]) * products
+
+
+def first_number(phase) -> int:
+    # a new run draws the pairs after the ones of the earlier runs
+    if phase == "reviews":
+        return MonitorReview.objects.count() + BookReview.objects.count()
+    if phase == "ratings":
+        return Rating.objects.count()
+    if phase not in NUMBERED:
+        return 0
+    model, field, prefix = NUMBERED[phase]
+    return model.objects.filter(**{f"{field}__startswith": prefix}).count()
+
+
+_worker_context = {}
+
+
+def _init_worker(context) -> None:
+    if not apps.ready:
+        # spawned workers start without Django
+        django.setup()
+    # a forked worker must not share the connections of its parent
+    connections.close_all()
+    _worker_context.clear()
+    _worker_context.update(context)
+
+
+def _seed_chunk(task) -> int:
+    phase, start, stop, seed = task
+    rng = random.Random(f"{seed}-{phase}-{start}" if seed is not None else None)
+    with transaction.atomic():
+        return PHASES[phase](start, stop, rng, _worker_context)
+
+
+def seed_catalog(
+    counts,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    processes=1,
+    seed=None,
+    log=None,
+    allow_production=False,
+) -> dict:
+    """
+    Seed `counts[phase]` rows of every phase of PHASES, returns the rows
+    seeded by phase. Raises ValueError when a phase has nothing to point at,
+    or when users are asked for with DEBUG off and not `allow_production`.
+    Reviews and ratings that a user already has are skipped, so fewer rows
+    than asked may be seeded.
+    """
+    if counts.get("users", 0) > 0 and not (settings.DEBUG or allow_production):
+        raise ValueError(
+            "Seeded users share a known password, seed them with DEBUG on "
+            "or allow_production"
+        )
+
+    seeded = {}
+    for phase in PHASES:
+        total = counts.get(phase, 0)
+        if total <= 0:
+            continue
+        context = phase_context(phase)
+        missing = missing_rows(phase, context)
+        if missing:
+            raise ValueError(f"Cannot seed {phase}, there are no {', '.join(missing)}")
+        pairs = pair_count(phase, context)
+        if pairs is not None and total > pairs:
+            raise ValueError(
+                f"Cannot seed {total} {phase}, there are {pairs} user and "
+                f"product pairs"
+            )
+
+        first = first_number(phase)
+        tasks = [
+            (phase, start, min(start + chunk_size, first + total), seed)
+            for start in range(first, first + total, chunk_size)
+        ]
+        if processes > 1 and len(tasks) > 1:
+            connections.close_all()
+            with multiprocessing.Pool(
+                min(processes, len(tasks)),
+                initializer=_init_worker,
+                initargs=(context,),
+            ) as pool:
+                seeded[phase] = sum(pool.imap_unordered(_seed_chunk, tasks))
+        else:
+            _worker_context.clear()
+            _worker_context.update(context)
+            seeded[phase] = sum(map(_seed_chunk, tasks))
+        if log:
+            log(f"{phase}: {seeded[phase]} rows")
+    return seeded
+
+
+def supports_processes() -> bool:
+    """SQLite locks the whole database on every write"""
+    return connection.vendor != "sqlite"
@@ -4,31 +4,18 @@ from django.contrib import messages
 from django.shortcuts import redirect, render
 
 from book_.models import Review
+from Homepage.permission_resolver import (
+    ADD_PRODUCT_PERMISSIONS,
+    COMMENT_PERMISSIONS,
+    user_has_role_permissions,
+)
 
 
 def user_add_product_permission_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if request.user and request.user.is_authenticated:
-            user_type = request.user.user_type
-
-            if (
-                user_type == "SELLER"
-                and request.user.has_perm("Homepage.seller_add_product")
-                and request.user.has_perm("Homepage.seller_update_product")
-                and request.user.has_perm("Homepage.seller_delete_product")
-            ):
-                return view_func(request, *args, **kwargs)
-
-            elif (
-                user_type == "MANAGER"
-                and request.user.has_perm("Homepage.manager_add_product")
-                and request.user.has_perm("Homepage.manager_update_product")
-                and request.user.has_perm("Hompage.manager_delete_product")
-            ):
-                return view_func(request, *args, **kwargs)
-
-            elif user_type == "ADMIN" or user_type == "ADMINISTRATOR":
+            if user_has_role_permissions(request.user, ADD_PRODUCT_PERMISSIONS):
                 return view_func(request, *args, **kwargs)
             else:
                 return render(
@@ -49,41 +36,7 @@ def user_add_product_permission_required(view_func):
 def user_comment_permission_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
-        user_type = request.user.user_type
-
-        if (
-            user_type == "CUSTOMER"
-            and request.user.has_perm("Homepage.customer_add_comment")
-            and request.user.has_perm("Homepage.customer_edit_comment")
-            and request.user.has_perm("Homepage.customer_delete_comment")
-        ):
-            return view_func(request, *args, **kwargs)
-
-        elif (
-            user_type == "SELLER"
-            and request.user.has_perm("Homepage.seller_add_comment")
-            and request.user.has_perm("Homepage.seller_edit_comment")
-            and request.user.has_perm("Homepage.seller_delete_comment")
-        ):
-            return view_func(request, *args, **kwargs)
-
-        elif (
-            user_type == "CUSTOMER REPRESENTATIVE"
-            and request.user.has_perm("Homepage.csr_add_comment")
-            and request.user.has_perm("Homepage.csr_edit_comment")
-            and request.user.has_perm("Homepage.csr_delete_comment")
-        ):
-            return view_func(request, *args, **kwargs)
-
-        elif (
-            user_type == "MANAGER"
-            and request.user.has_perm("Homepage.manager_add_comment")
-            and request.user.has_perm("Homepage.manager_edit_comment")
-            and request.user.has_perm("Homepage.manager_delete_comment")
-        ):
-            return view_func(request, *args, **kwargs)
-
-        elif user_type == "ADMINISTRATOR" or user_type == "ADMIN":
+        if user_has_role_permissions(request.user, COMMENT_PERMISSIONS):
             return view_func(request, *args, **kwargs)
 
         else:
@@ -3,7 +3,8 @@ from django import forms
 from django.db.models import Q
 
 from i.forms import MonitorsForm
-from i.models import Monitors, Special_Features
+from i.models import Monitors
+from i.reference_tables import special_feature_choices
 
 
 class MonitorsFilter(django_filters.FilterSet):
@@ -20,10 +21,10 @@ class MonitorsFilter(django_filters.FilterSet):
         choices=MonitorsForm.refresh_rate_choices
     )
     brand = django_filters.ChoiceFilter(choices=MonitorsForm.brand_choices)
-    special_features = django_filters.ModelMultipleChoiceFilter(
+    # the ids of the reference table, so the form needs no query
+    special_features = django_filters.MultipleChoiceFilter(
         field_name="special_features__id",  # Filter by IDs instead of objects
-        to_field_name="id",  # Use primary key (ID) for filtering
-        queryset=Special_Features.objects.all(),
+        choices=special_feature_choices,
         widget=forms.CheckboxSelectMultiple,
         conjoined=True,  # when set to False, the filter applies an OR operation. Setting conjoined=True
         #    is useful when you want to narrow down results based on multiple selections,
@@ -48,8 +49,8 @@ class MonitorsFilter(django_filters.FilterSet):
         q_objects = Q()
 
         if special_features:
-            # Extract IDs from Special_Features objects
-            special_feature_ids = [sf.id for sf in special_features]
+            # the choices are the ids, as strings
+            special_feature_ids = [int(sf) for sf in special_features]
             q_objects |= Q(special_features__id__in=special_feature_ids)
 
         # Apply other filters similarly
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from i.benchmark import (
+    external_stubs,
+    format_summary,
+    run_benchmark,
+    seed_benchmark_data,
+    write_summary,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the storefront journeys (browse, filter, detail, review, "
+        "cart, checkout) against a fresh test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--journeys", type=int, default=200)
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="journeys run at once"
+        )
+        parser.add_argument(
+            "--monitors", type=int, default=50, help="monitors in the catalog"
+        )
+        parser.add_argument("--seed", type=int, help="seed of the monitor choice")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="keep the test database between runs",
+        )
+        parser.add_argument("--json", help="also write the results to this file")
+
+    def handle(self, *args, **options):
+        if options["journeys"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--journeys and --concurrency must be positive")
+
+        test_settings = connections["default"].settings_dict.setdefault("TEST", {})
+        if connections["default"].vendor == "sqlite" and not test_settings.get("NAME"):
+            # an in-memory database locks whole tables, concurrent requests
+            # would fail on each other instead of waiting
+            test_settings["NAME"] = os.path.join(
+                tempfile.gettempdir(), "benchmark_journeys.sqlite3"
+            )
+
+        verbosity = options["verbosity"]
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            data = seed_benchmark_data(options["monitors"], options["concurrency"])
+            connections.close_all()
+            with external_stubs():
+                results = run_benchmark(
+                    data,
+                    options["journeys"],
+                    options["concurrency"],
+                    seed=options["seed"],
+                )
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        summary = results.summary()
+        self.stdout.write(format_summary(summary))
+        if options["json"]:
+            write_summary(
+                options["json"],
+                summary,
+                journeys=options["journeys"],
+                concurrency=options["concurrency"],
+                monitors=options["monitors"],
+                database=connections["default"].vendor,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Results written to {options['json']}")
+            )
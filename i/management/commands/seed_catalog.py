@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from i.catalog_seeder import (
+    DEFAULT_CHUNK_SIZE,
+    PASSWORD,
+    PHASES,
+    seed_catalog,
+    supports_processes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog of users, monitors, books, reviews, ratings, "
+        "carts and blog posts with chunked bulk inserts"
+    )
+
+    def add_arguments(self, parser):
+        for phase in PHASES:
+            parser.add_argument(
+                f"--{phase}", type=int, default=0, help=f"{phase} to seed"
+            )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="rows of one bulk insert",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="worker processes of a phase, not on SQLite",
+        )
+        parser.add_argument("--seed", type=int, help="seed of the generated values")
+        parser.add_argument(
+            "--allow-production",
+            action="store_true",
+            help="seed users, who share a known password, with DEBUG off",
+        )
+
+    def handle(self, *args, **options):
+        counts = {phase: options[phase] for phase in PHASES}
+        if not any(count > 0 for count in counts.values()):
+            raise CommandError(
+                f"Nothing to seed, pass a count of --{' --'.join(PHASES)}"
+            )
+        if options["chunk_size"] < 1 or options["processes"] < 1:
+            raise CommandError("--chunk-size and --processes must be positive")
+
+        processes = options["processes"]
+        if processes > 1 and not supports_processes():
+            self.stderr.write(
+                "SQLite takes one writer at a time, seeding in one process"
+            )
+            processes = 1
+
+        start = time.perf_counter()
+        try:
+            seeded = seed_catalog(
+                counts,
+                chunk_size=options["chunk_size"],
+                processes=processes,
+                seed=options["seed"],
+                log=self.stdout.write,
+                allow_production=options["allow_production"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {sum(seeded.values())} rows in "
+                f"{time.perf_counter() - start:.1f}s, "
+                f"seeded users log in with the password {PASSWORD}"
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitors',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.8 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i', '0002_monitors_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monitors',
+            index=models.Index(fields=['brand'], name='i_monitor_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitors',
+            index=models.Index(fields=['monitor_type'], name='i_monitor_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitors',
+            index=models.Index(fields=['refresh_rate'], name='i_monitor_refresh_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitors',
+            index=models.Index(fields=['price'], name='i_monitor_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitors',
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=['monitor_id'],
+                name='i_monitor_active_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'rating'], name='i_review_product_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'user'], name='i_review_product_user_idx'),
+        ),
+    ]
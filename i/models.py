@@ -227,6 +227,21 @@ class Monitors(models.Model):
     user = models.ForeignKey(
         CustomUser, on_delete=models.CASCADE, related_name="monitor_user"
     )
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        indexes = [
+            # the catalog filter ORs these, each one gets its own index
+            models.Index(fields=["brand"], name="i_monitor_brand_idx"),
+            models.Index(fields=["monitor_type"], name="i_monitor_type_idx"),
+            models.Index(fields=["refresh_rate"], name="i_monitor_refresh_idx"),
+            models.Index(fields=["price"], name="i_monitor_price_idx"),
+            models.Index(
+                fields=["monitor_id"],
+                condition=models.Q(is_active=True),
+                name="i_monitor_active_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}- {self.max_display_resolution} Pixels- {self.mounting_type}- {self.monitor_type}- {self.screen_size}"
@@ -727,5 +742,13 @@ class Review(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product", "rating"], name="i_review_product_rating_idx"
+            ),
+            models.Index(fields=["product", "user"], name="i_review_product_user_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.product.name} Review"
@@ -22,7 +22,7 @@ def populate_monitors():
             'hdmi_port': 2.0,  # Replace with HDMI port value
             'built_speakers': 'yes',  # Replace with built-in speakers value
             'price': 299.99,  # Replace with the price
-            'quantity': 10,  # Replace with quantity
+            'quantity_available': 10,  # Replace with quantity
             'Product_Category': ProductCategory.objects.get_or_create(pk=1)[0],
             'Computer_SubCategory': ComputerSubCategory.objects.get_or_create(pk=5)[0],
             'user': CustomUser.objects.get_or_create(pk=2)[0],
@@ -45,7 +45,7 @@ def populate_monitors():
             'hdmi_port': 2.0,  # Replace with HDMI port value
             'built_speakers': 'yes',  # Replace with built-in speakers value
             'price': 99.99,  # Replace with the price
-            'quantity': 10,  # Replace with quantity
+            'quantity_available': 10,  # Replace with quantity
             'Product_Category': ProductCategory.objects.get_or_create(pk=1)[0],
             'Computer_SubCategory': ComputerSubCategory.objects.get_or_create(pk=5)[0],
             'user': CustomUser.objects.get_or_create(pk=2)[0],
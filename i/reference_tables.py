@@ -0,0 +1,138 @@
+"""
+Reference tables.
+
+ProductCategory, ComputerSubCategory and Special_Features hold a handful
+of rows that almost never change. Each process loads a table once, at
+its first lookup, into read-only dicts keyed by name and by id, and the
+lookups below are dict hits instead of queries. A save or delete of one
+of their rows, from the site or the admin, bumps a version in the shared
+cache once it commits, and every process reloads the tables at its next
+lookup. A name or id missing from a table is still looked up in the
+database, for rows written without a signal (bulk_create, update).
+
+The rows are shared by the threads of a process, do not modify them.
+Content types are not here, ContentType.objects.get_for_id() and
+get_for_model() already keep them per process.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from i.models import ComputerSubCategory, ProductCategory, Special_Features
+from iii.db_router import primary_reads
+from iii.tiered_cache import bump_versions, cached_version
+
+MODELS = (ProductCategory, ComputerSubCategory, Special_Features)
+VERSION_KEY = "reference_tables_version"
+
+
+class Tables:
+    """The tables of one version, each loaded at its first lookup"""
+
+    def __init__(self, version):
+        self.version = version
+        # model -> {name: row}, model -> {id: row}
+        self.by_name = {}
+        self.by_id = {}
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def tables_version():
+    """Version of the tables, changed on every save or delete of a row"""
+    return cached_version(VERSION_KEY)
+
+
+def bump_tables_version() -> None:
+    bump_versions(VERSION_KEY)
+
+
+def _bump_on_commit(sender, using, **kwargs) -> None:
+    # tables loaded before the commit would be kept under the new version
+    transaction.on_commit(bump_tables_version, using=using)
+
+
+def clear() -> None:
+    """Forget the tables of this process, they are loaded at the next lookup"""
+    global _tables
+    _tables = None
+
+
+def _load(tables, model) -> None:
+    # kept until the next bump, not loaded from a lagging replica
+    with primary_reads():
+        rows = list(model.objects.order_by("pk"))
+    # the first row of a name, like the oldest one a get() would find
+    names = {}
+    for row in rows:
+        names.setdefault(row.name, row)
+    tables.by_name[model] = MappingProxyType(names)
+    tables.by_id[model] = MappingProxyType({row.pk: row for row in rows})
+
+
+def get_tables(model) -> Tables:
+    """The current tables, with the one of `model` loaded"""
+    global _tables
+    version = tables_version()
+    tables = _tables
+    if tables is None or tables.version != version or model not in tables.by_id:
+        with _tables_lock:
+            if _tables is None or _tables.version != version:
+                _tables = Tables(version)
+            tables = _tables
+            if model not in tables.by_id:
+                _load(tables, model)
+    return tables
+
+
+def _by_name(model, name):
+    row = get_tables(model).by_name[model].get(name)
+    if row is None:
+        row = model.objects.filter(name=name).order_by("pk").first()
+        if row is None:
+            raise model.DoesNotExist(f"{model.__name__} {name!r} does not exist.")
+        # written without a signal, the tables are out of date
+        bump_tables_version()
+    return row
+
+
+def product_category(name: str) -> ProductCategory:
+    return _by_name(ProductCategory, name)
+
+
+def computer_sub_category(name: str) -> ComputerSubCategory:
+    return _by_name(ComputerSubCategory, name)
+
+
+def special_features() -> tuple[Special_Features, ...]:
+    return tuple(get_tables(Special_Features).by_id[Special_Features].values())
+
+
+def special_features_by_id(ids: Iterable) -> list[Special_Features]:
+    """The features of `ids`, ids of no feature are left out"""
+    table = get_tables(Special_Features).by_id[Special_Features]
+    ids = {int(pk) for pk in ids}
+    features = [table[pk] for pk in sorted(ids) if pk in table]
+    if len(features) < len(ids):
+        missing = ids - table.keys()
+        found = list(Special_Features.objects.filter(id__in=missing))
+        if found:
+            bump_tables_version()
+        features = sorted(features + found, key=lambda feature: feature.pk)
+    return features
+
+
+def special_feature_choices() -> list[tuple[int, str]]:
+    return [(feature.pk, str(feature)) for feature in special_features()]
+
+
+for _model in MODELS:
+    _uid = f"reference_tables:{_model._meta.label}"
+    post_save.connect(_bump_on_commit, sender=_model, dispatch_uid=_uid)
+    post_delete.connect(_bump_on_commit, sender=_model, dispatch_uid=_uid)
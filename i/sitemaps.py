@@ -1,6 +1,5 @@
 from django.contrib.sitemaps import Sitemap
 from i.models import Monitors
-from datetime import datetime
 
 
 class MonitorsSitemap(Sitemap):
@@ -9,7 +8,11 @@ class MonitorsSitemap(Sitemap):
     limit = 10000  # Maximum number of URLs per sitemap file
 
     def items(self):
-        return Monitors.objects.all()
+        return (
+            Monitors.objects.filter(is_active=True)
+            .only("monitor_id", "updated_at")
+            .order_by("monitor_id")
+        )
 
     def lastmod(self, obj):
-        return datetime.now()
+        return obj.updated_at
@@ -4,10 +4,14 @@ from django.db.models import Avg
 
 from book_.models import Rating
 from i.models import Review
+from iii.memoize import memoize
+
+RATINGS_TIMEOUT = 60 * 10  # 10 minutes
 
 
 class RatingCalculator:
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Review])
     def calculate_average_rating(monitor):
         return (
             Review.objects.filter(product=monitor).aggregate(
@@ -17,10 +21,12 @@ class RatingCalculator:
         )
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Review])
     def count_users_who_rated(monitor):
         return Review.objects.filter(product=monitor).count()
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Review])
     def count_star_ratings(monitor, star_rating):
         return Review.objects.filter(product=monitor, rating=star_rating).count()
 
@@ -43,6 +49,7 @@ class Calculate_Ratings:
 
 class BookRatingCalculator:
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Rating])
     def calculate_average_rating(item):
         return (
             Rating.objects.filter(book_format=item).aggregate(
@@ -52,10 +59,12 @@ class BookRatingCalculator:
         )
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Rating])
     def count_users_who_rated(item):
         return Rating.objects.filter(book_format=item).count()
 
     @staticmethod
+    @memoize(timeout=RATINGS_TIMEOUT, tags=[Review])
     def count_star_ratings(item, star_rating):
         return Review.objects.filter(product=item, rating=star_rating).count()
 
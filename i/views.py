@@ -53,12 +53,16 @@ from i.forms import (
     ScreenFiltersForm,
     ScreenProtectorForm,
     ServersForm,
-    Special_Features,
     SpecialFeaturesForm,
     TabletsForm,
     TabletsReplacementPartsForm,
 )
-from i.models import ComputerSubCategory, Monitors, ProductCategory, Review
+from i.models import Monitors, Review
+from i.reference_tables import (
+    computer_sub_category,
+    product_category,
+    special_features_by_id,
+)
 from i.utils import Calculate_Ratings, RatingCalculator
 
 
@@ -410,12 +414,10 @@ class Create_Monitors_Product(SuccessMessageMixin, CreateView):
 
                 product_category_name = "COMPUTER"
                 sub_category_name = "MONITORS"
-                product_category = ProductCategory.objects.get(
-                    name=product_category_name
-                )
-                sub_category = ComputerSubCategory.objects.get(name=sub_category_name)
+                category = product_category(product_category_name)
+                sub_category = computer_sub_category(sub_category_name)
 
-                monitor.Product_Category = product_category
+                monitor.Product_Category = category
                 monitor.Computer_SubCategory = sub_category
                 monitor.user = self.request.user
 
@@ -430,9 +432,7 @@ class Create_Monitors_Product(SuccessMessageMixin, CreateView):
                 print(f"selected features ids------------: {selected_features_ids}")
 
                 # Fetch the Special_Features objects corresponding to the selected IDs
-                selected_features = Special_Features.objects.filter(
-                    id__in=selected_features_ids
-                )
+                selected_features = special_features_by_id(selected_features_ids)
 
                 # Assuming 'monitor' is your Monitors object
                 for feature in selected_features:
@@ -532,41 +532,31 @@ class Update_Monitor_Product(View):
 
                 product_category_name = "COMPUTER"
                 sub_category_name = "MONITORS"
-                product_category = ProductCategory.objects.get(
-                    name=product_category_name
-                )
-                sub_category = ComputerSubCategory.objects.get(name=sub_category_name)
+                category = product_category(product_category_name)
+                sub_category = computer_sub_category(sub_category_name)
 
-                monitor.Product_Category = product_category
+                monitor.Product_Category = category
                 monitor.Computer_SubCategory = sub_category
                 monitor.user = self.request.user
 
                 monitor.save()
 
-                for feature_name in selected_features_names:
-                    feature, created = Special_Features.objects.get_or_create(
-                        name=feature_name
-                    )
-                    monitor.special_features.add(feature)
+                # the form has looked the features up
+                monitor.special_features.add(*selected_features_names)
             else:
                 product_category_name = "COMPUTER"
                 sub_category_name = "MONITORS"
-                product_category = ProductCategory.objects.get(
-                    name=product_category_name
-                )
-                sub_category = ComputerSubCategory.objects.get(name=sub_category_name)
+                category = product_category(product_category_name)
+                sub_category = computer_sub_category(sub_category_name)
 
-                monitor.Product_Category = product_category
+                monitor.Product_Category = category
                 monitor.Computer_SubCategory = sub_category
                 monitor.user = self.request.user
 
                 monitor.save()
 
-                for feature_name in selected_features_names:
-                    feature, created = Special_Features.objects.get_or_create(
-                        name=feature_name
-                    )
-                    monitor.special_features.add(feature)
+                # the form has looked the features up
+                monitor.special_features.add(*selected_features_names)
             messages.success(request, "Monitor details updated successfully!")
             return render(
                 self.request,
@@ -609,7 +599,7 @@ def List_View(request, model, filter_form, template_name):
 
     paginated_items = paginate_items(request, item_list, 3)
 
-    content_id = ContentType.objects.get(app_label="i", model="monitors").id
+    content_id = ContentType.objects.get_for_model(Monitors).id
 
     context = {
         "item_list": paginated_items,
@@ -768,7 +758,7 @@ class Monitor_Detail_View_Add_Review_Form(View):
                 request,
                 "You have already submitted a review for this book format.",
             )
-            return redirect("i:monitor_detail_view", product_id=monitor.monitor_id)
+            return redirect("i:add_review", product_id=monitor.monitor_id)
 
         review_form = ReviewForm(request.POST)
         if review_form.is_valid():
@@ -800,7 +790,9 @@ class Monitor_Detail_View_Add_Review_Form(View):
                         messages.info(
                             self.request, "images did not uploaded properly, Try again!"
                         )
-                        return redirect("i:monitor_add_review")
+                        return redirect(
+                            "i:monitor_add_review", product_id=monitor.monitor_id
+                        )
 
                 new_review.user = request.user
                 new_review.product = monitor
@@ -812,14 +804,12 @@ class Monitor_Detail_View_Add_Review_Form(View):
                     self.request, "Please upload all images properly, Try again!"
                 )
                 return redirect(
-                    "i:monitor_detail_view_add_review_form",
+                    "i:monitor_add_review",
                     product_id=monitor.monitor_id,
                 )
         else:
             messages.error(request, "Form is not valid.")
-            return redirect(
-                "i:monitor_detail_view_add_review_form", product_id=monitor.monitor_id
-            )
+            return redirect("i:monitor_add_review", product_id=monitor.monitor_id)
 
     def get(self, request, **kwargs):
         context = {"form": ReviewForm()}
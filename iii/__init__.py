@@ -0,0 +1,4 @@
+# the Celery app is loaded with Django, so shared_task uses it
+from iii.celery import app as celery_app
+
+__all__ = ("celery_app",)
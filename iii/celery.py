@@ -0,0 +1,19 @@
+"""
+Celery app of the project.
+
+The worker and beat load the CELERY_* settings, among them
+CELERY_BEAT_SCHEDULE, and the tasks.py modules of the installed apps:
+
+    celery -A iii worker
+    celery -A iii beat
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "iii.settings")
+
+app = Celery("iii")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
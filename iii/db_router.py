@@ -0,0 +1,136 @@
+"""
+Read replicas with read-your-writes.
+
+The databases whose alias starts with "replica" hold copies of "default".
+Writes always go to "default". ReplicaRouter sends reads to a random
+replica only while a GET or HEAD request to one of the read-only views of
+settings.REPLICA_READ_VIEWS is served, ReplicaReadsMiddleware marks those
+requests. Everything else reads from "default".
+
+A replica lags behind "default". After a request of a logged in user
+writes (a review, the cart, a checkout), the user reads from "default" for
+settings.REPLICA_STICKY_SECONDS, tracked in the cache, so they see their
+own changes. A request also reads from "default" after its own first
+write. The cache has to be shared by the web processes for the window to
+hold across them. Without replicas every query goes to "default".
+
+Values cached beyond the request are computed inside primary_reads(), a
+replica behind "default" would get them cached under the new version.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_PREFIX = "replica"
+SAFE_METHODS = ("GET", "HEAD")
+STICKY_KEY = "db_router:sticky:{}"
+
+
+class Routing:
+    """Routing state of the current request"""
+
+    def __init__(self, replica_reads=False):
+        self.replica_reads = replica_reads
+        self.wrote = False
+
+
+_routing = ContextVar("routing", default=None)
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+@contextmanager
+def replica_reads():
+    """Read from the replicas inside the block, until its first write"""
+    token = _routing.set(Routing(replica_reads=True))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from "default" inside the block, in a replica read request too"""
+    routing = _routing.get()
+    replica_reads = routing is not None and routing.replica_reads
+    if replica_reads:
+        routing.replica_reads = False
+    try:
+        yield
+    finally:
+        if replica_reads:
+            routing.replica_reads = True
+
+
+def sticky_key(request):
+    """Cache key of the primary window of the user of `request`, if any"""
+    user_id = request.session.get("user_id")
+    if user_id is None:
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        user_id = user.pk
+    return STICKY_KEY.format(user_id)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None and routing.replica_reads and not routing.wrote:
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replicas are migrated by replication
+        return not db.startswith(REPLICA_PREFIX)
+
+
+class ReplicaReadsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routing = Routing()
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if routing.wrote:
+            # after the response, a login has put the user in the session
+            key = sticky_key(request)
+            if key is not None:
+                cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _routing.get()
+        if (
+            routing is not None
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_READ_VIEWS
+            and replica_aliases()
+        ):
+            key = sticky_key(request)
+            routing.replica_reads = key is None or not cache.get(key)
+        return None
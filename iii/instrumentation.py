@@ -0,0 +1,191 @@
+"""
+Per-view SQL and external HTTP instrumentation.
+
+InstrumentationMiddleware counts the queries of a request through
+connection.execute_wrapper() and times the HTTP calls made by urllib3,
+which requests (Stripe, CV API) and Cloudinary send through. The numbers
+are exported as Prometheus histograms labelled by URL name, and slow
+requests are logged with their most repeated queries.
+"""
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+from prometheus_client import Histogram
+from urllib3.connectionpool import HTTPConnectionPool
+
+from cv_api.api_client import get_base_url
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 30, 50, 100, 200, 500, float("inf"))
+# repeated queries listed in the slow request log
+SLOW_REQUEST_TOP_QUERIES = 5
+
+view_queries = Histogram(
+    "django_view_queries",
+    "SQL queries per request",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+view_query_seconds = Histogram(
+    "django_view_query_seconds",
+    "Time spent in SQL queries per request",
+    ["view"],
+)
+view_duplicate_queries = Histogram(
+    "django_view_duplicate_queries",
+    "SQL queries per request that repeat an earlier query of the request",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+view_external_seconds = Histogram(
+    "django_view_external_http_seconds",
+    "Time spent in external HTTP calls per request",
+    ["view", "service"],
+)
+
+_IN_CLAUSE = re.compile(r"\((?:%s, )+%s\)")
+
+_current_stats = ContextVar("request_stats", default=None)
+
+
+def fingerprint(sql) -> str:
+    """
+    The SQL of a query without its parameters, so the same query run for
+    every item of a list (an N+1) has one fingerprint
+    """
+    return _IN_CLAUSE.sub("(%s, ...)", sql)
+
+
+def external_service(host) -> str:
+    host = host or ""
+    if host == "stripe.com" or host.endswith(".stripe.com"):
+        return "stripe"
+    if host == "cloudinary.com" or host.endswith(".cloudinary.com"):
+        return "cloudinary"
+    if host == urlsplit(get_base_url()).hostname:
+        return "cv_api"
+    return "other"
+
+
+class RequestStats:
+    def __init__(self):
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.fingerprints = Counter()
+        self.external_seconds = Counter()
+        # urllib3 calls urlopen() again for retries and redirects
+        self.in_external_call = False
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - start
+            self.query_count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicate_count(self) -> int:
+        return self.query_count - len(self.fingerprints)
+
+    def duplicates(self, limit=SLOW_REQUEST_TOP_QUERIES):
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+
+def _timed_urlopen(urlopen):
+    def wrapper(pool, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None or stats.in_external_call:
+            return urlopen(pool, *args, **kwargs)
+
+        stats.in_external_call = True
+        start = time.perf_counter()
+        try:
+            return urlopen(pool, *args, **kwargs)
+        finally:
+            stats.in_external_call = False
+            service = external_service(pool.host)
+            stats.external_seconds[service] += time.perf_counter() - start
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument_external_http() -> None:
+    urlopen = HTTPConnectionPool.urlopen
+    if not getattr(urlopen, "instrumented", False):
+        HTTPConnectionPool.urlopen = _timed_urlopen(urlopen)
+
+
+def view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or "<unnamed>"
+
+
+class InstrumentationMiddleware:
+    """
+    Record the SQL and external HTTP work of every request per view.
+
+    Place it right after PrometheusBeforeMiddleware so the queries of the
+    other middlewares (session, user, request identity) are counted too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_external_http()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                return self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+            self.observe(request, stats, time.perf_counter() - start)
+
+    def observe(self, request, stats, duration) -> None:
+        view = view_label(request)
+        view_queries.labels(view).observe(stats.query_count)
+        view_query_seconds.labels(view).observe(stats.query_seconds)
+        view_duplicate_queries.labels(view).observe(stats.duplicate_count)
+        for service, seconds in stats.external_seconds.items():
+            view_external_seconds.labels(view, service).observe(seconds)
+
+        if (
+            duration >= settings.SLOW_REQUEST_THRESHOLD
+            and random.random() < settings.SLOW_REQUEST_LOG_SAMPLE_RATE
+        ):
+            logger.warning(
+                "Slow request %s %s (%s): %.3fs, %s queries in %.3fs, "
+                "%s duplicates, external HTTP %s, most repeated queries: %s",
+                request.method,
+                request.path,
+                view,
+                duration,
+                stats.query_count,
+                stats.query_seconds,
+                stats.duplicate_count,
+                {service: round(s, 3) for service, s in stats.external_seconds.items()},
+                stats.duplicates(),
+            )
@@ -0,0 +1,115 @@
+"""
+Memoized helpers.
+
+@memoize caches the result of a function in the tiered cache under its
+arguments, through get_or_recompute, so a missing or expiring result is
+computed by one caller while the others wait or keep the old one:
+
+    @memoize(timeout=60 * 10, tags=[Review])
+    def average_rating(monitor): ...
+
+A model instance argument is keyed by its pk, any other by its repr().
+The key also holds the `version` of the decorator, bump it when the
+result changes shape, and the version of each tag. A model tag is
+invalidated when a save or delete of the model commits, a string tag by
+invalidate(). Tag versions are read through the tiered cache too, an
+invalidation is seen at once by the process that makes it and by the
+others once their L1 copy expires, like the results themselves.
+QuerySet.update() and bulk_create() send no signal, invalidate() the
+model after them.
+"""
+
+import functools
+import hashlib
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from iii.tiered_cache import (
+    STALE_TIMEOUT,
+    TIERED_CACHE_ALIAS,
+    bump_versions,
+    cached_versions,
+    get_or_recompute,
+)
+
+MEMO_KEY = "memo:{name}:{version}:{tags}:{args}"
+
+
+def _tag_name(tag) -> str:
+    if isinstance(tag, type) and issubclass(tag, models.Model):
+        return tag._meta.label
+    return tag
+
+
+def _tag_version_key(name) -> str:
+    return f"memo_tag:{name}"
+
+
+def tag_versions(names) -> list:
+    """
+    Current version of each tag, read through the L1 like the results, so
+    a warm call costs no round trip to the shared cache
+    """
+    keys = [_tag_version_key(name) for name in names]
+    return cached_versions(keys, TIERED_CACHE_ALIAS)
+
+
+def invalidate(*tags) -> None:
+    """Drop every memoized result that depends on one of `tags`"""
+    keys = [_tag_version_key(_tag_name(tag)) for tag in tags]
+    bump_versions(*keys, alias=TIERED_CACHE_ALIAS)
+
+
+def _invalidate_model(sender, using, **kwargs) -> None:
+    # after the commit, a result computed in between would be kept from
+    # the old rows under the new version
+    transaction.on_commit(functools.partial(invalidate, sender), using=using)
+
+
+def _arg_key(arg) -> str:
+    if isinstance(arg, models.Model):
+        return f"{arg._meta.label}:{arg.pk}"
+    return repr(arg)
+
+
+def memo_key(name, version, tag_names, args, kwargs) -> str:
+    parts = [_arg_key(arg) for arg in args]
+    parts += [f"{key}={_arg_key(value)}" for key, value in sorted(kwargs.items())]
+    # any argument fits in a cache key
+    digest = hashlib.md5("|".join(parts).encode()).hexdigest()
+    tags = ".".join(str(version) for version in tag_versions(tag_names))
+    return MEMO_KEY.format(name=name, version=version, tags=tags, args=digest)
+
+
+def memoize(timeout, tags=(), version=1, early=1.0, stale_timeout=STALE_TIMEOUT):
+    """
+    Cache the results of the decorated function for `timeout` seconds.
+    `tags` are models or strings, see invalidate(). `early` is the
+    probabilistic early expiration of get_or_recompute, 0 turns it off.
+    """
+    tag_names = [_tag_name(tag) for tag in tags]
+    for tag in tags:
+        if isinstance(tag, type) and issubclass(tag, models.Model):
+            uid = f"memoize:{tag._meta.label}"
+            post_save.connect(_invalidate_model, sender=tag, dispatch_uid=uid)
+            post_delete.connect(_invalidate_model, sender=tag, dispatch_uid=uid)
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = memo_key(name, version, tag_names, args, kwargs)
+            return get_or_recompute(
+                key,
+                lambda: func(*args, **kwargs),
+                timeout,
+                stale_timeout=stale_timeout,
+                early=early,
+            )
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
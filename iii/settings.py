@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
-from decouple import config
+from decouple import Csv, config
 
 # Twilio API
 TEMPLATES_ID = config("template_id")
@@ -38,6 +38,11 @@ PUBLISHABLE_KEY = config("Publishable_key")
 STRIPE_SECRET_KEY = config("Secret_Key")
 ENDPOINT_SIGNING_SECRET = config("STRIPE_SIGNING_SECRET")
 
+# HMAC-SHA256 key of the CV API webhooks, every event is refused if empty
+CV_WEBHOOK_SECRET = config("CV_WEBHOOK_SECRET", default="")
+# accept unsigned events when no key is set, with DEBUG on only
+CV_WEBHOOK_ALLOW_UNSIGNED = config("CV_WEBHOOK_ALLOW_UNSIGNED", default=False, cast=bool)
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -102,6 +107,8 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    # per view SQL and external HTTP metrics
+    "iii.instrumentation.InstrumentationMiddleware",
     "csp.middleware.CSPMiddleware",  # CSP header
     "django.middleware.security.SecurityMiddleware",
     # "django.middleware.gzip.GZipMiddleware",  # Add GZipMiddleware here
@@ -112,6 +119,9 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "Homepage.request_identity.RequestIdentityMiddleware",
+    # reads of the read-only views go to the replicas, writes to default
+    "iii.db_router.ReplicaReadsMiddleware",
     # "iii.maintainance_middleware.MaintenanceModeMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",  # comment it if X-FRAME OPTION is None
@@ -119,6 +129,17 @@ MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusAfterMiddleware",
 ]
 
+# requests slower than this many seconds are logged by InstrumentationMiddleware
+SLOW_REQUEST_THRESHOLD = config("SLOW_REQUEST_THRESHOLD", default=1.0, cast=float)
+# fraction of the slow requests that are logged
+SLOW_REQUEST_LOG_SAMPLE_RATE = config(
+    "SLOW_REQUEST_LOG_SAMPLE_RATE", default=0.1, cast=float
+)
+
+# modules or packages of code run outside of requests, not scanned by the
+# index check (manage.py check --deploy --tag indexes)
+INDEX_CHECK_SKIPPED_MODULES = ["i.catalog_seeder"]
+
 ROOT_URLCONF = "iii.urls"
 
 
@@ -142,33 +163,91 @@ WSGI_APPLICATION = "iii.wsgi.application"
 
 
 # Database
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# "sqlite" for development, "postgres" in production
+DATABASE_PROFILE = config("DATABASE_PROFILE", default="sqlite")
+
+if DATABASE_PROFILE == "postgres":
+    # PgBouncer or another pooler in transaction mode hands every transaction
+    # its own server connection, server side cursors would not survive it
+    POSTGRES_POOLER = config("POSTGRES_POOLER", default=False, cast=bool)
+    POSTGRES = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": config("POSTGRES_DATABASE"),
+        "USER": config("POSTGRES_USER"),
+        "PASSWORD": config("POSTGRES_PASSWORD"),
+        "PORT": config("POSTGRES_PORT", default="5432"),
+        # keep the connection of a worker between requests, checked
+        # before reuse
+        "CONN_MAX_AGE": config("POSTGRES_CONN_MAX_AGE", default=600, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": POSTGRES_POOLER,
+        "OPTIONS": {
+            "sslmode": config("POSTGRES_SSLMODE", default="require"),
+            "connect_timeout": config("POSTGRES_CONNECT_TIMEOUT", default=5, cast=int),
+        },
+    }
+    DATABASES = {"default": {**POSTGRES, "HOST": config("POSTGRES_HOST")}}
+    # read replicas, see iii/db_router.py
+    for number, host in enumerate(
+        config("POSTGRES_REPLICA_HOSTS", default="", cast=Csv()), start=1
+    ):
+        DATABASES[f"replica_{number}"] = {
+            **POSTGRES,
+            "HOST": host,
+            "OPTIONS": dict(POSTGRES["OPTIONS"]),
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
     }
-}
 
-# DATABASES = {
-#     "default": {
-#         "ENGINE": "django.db.backends.postgresql",
-#         "NAME": config("POSTGRES_DATABASE"),
-#         "USER": config("POSTGRES_USER"),
-#         "PASSWORD": config("POSTGRES_PASSWORD"),
-#         "HOST": config("POSTGRES_HOST"),
-#         "PORT": "5432",
-#         "OPTIONS": {
-#             "sslmode": "require",
-#         },
-#     }
-# }
+DATABASE_ROUTERS = ["iii.db_router.ReplicaRouter"]
+# views whose GET requests read from the replicas
+REPLICA_READ_VIEWS = [
+    "i:MonitorListView",
+    "i:add_review",
+    "book_:book_list_filters",
+    "book_:book_detail_view",
+    "blog:post_list",
+    "blog:live_post",
+    "blog:search_results_view",
+    "django.contrib.sitemaps.views.sitemap",
+    "sitemap_segment",
+]
+# after a write, the user reads from default for this many seconds
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
 
 
-CACHES = {
-    "default": {
+# Redis is shared by the gunicorn workers, LocMemCache is per process
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {"socket_connect_timeout": 2, "socket_timeout": 2},
+    }
+else:
+    DEFAULT_CACHE = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         # "LOCATION": "unique-snowflake",
     }
+
+CACHES = {
+    "default": DEFAULT_CACHE,
+    # an in-process L1 in front of "default", see iii/tiered_cache.py
+    "tiered": {
+        "BACKEND": "iii.tiered_cache.TieredCache",
+        "LOCATION": "default",
+        "OPTIONS": {
+            "LOCAL_TIMEOUT": config("CACHE_LOCAL_TIMEOUT", default=5, cast=int),
+            "LOCAL_MAX_ENTRIES": 1000,
+        },
+    },
 }
 
 
@@ -215,6 +294,17 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # MEDIA_URLS = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# pre-rendered sitemaps, written by the build_sitemaps task. A storage shared
+# by every web server (e.g. a bucket) keeps them in sync across machines.
+SITEMAP_ROOT = config("SITEMAP_ROOT", default=os.path.join(BASE_DIR, "sitemaps"))
+SITEMAP_STORAGE = {
+    "BACKEND": config(
+        "SITEMAP_STORAGE_BACKEND",
+        default="django.core.files.storage.FileSystemStorage",
+    ),
+    "OPTIONS": {"location": SITEMAP_ROOT},
+}
+
 # ------------Django compressor------------------------------
 STATICFILES_FINDERS = (
     "django.contrib.staticfiles.finders.FileSystemFinder",
@@ -243,6 +333,27 @@ COMPRESS_JS_FILTERS = [
 
 MAINTENANCE_MODE = True
 
+# see iii/celery.py, the broker is Redis in production
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default=REDIS_URL or "memory://")
+
+CELERY_BEAT_SCHEDULE = {
+    # keep CV API access tokens fresh, so views never refresh them inline
+    "refresh-expiring-cv-api-tokens": {
+        "task": "cv_api.tasks.refresh_expiring_cv_api_tokens",
+        "schedule": 60 * 2,  # seconds, shorter than PROACTIVE_REFRESH_WINDOW
+    },
+    # apply CV webhook events whose processing task was lost
+    "process-pending-cv-webhook-events": {
+        "task": "cv_api.tasks.process_pending_cv_webhook_events",
+        "schedule": 60 * 5,
+    },
+    # rewrite the sitemap files whose content changed
+    "build-sitemaps": {
+        "task": "Homepage.tasks.build_sitemaps",
+        "schedule": 60 * 60,
+    },
+}
+
 if DEBUG:
     CELERY_TASK_ALWAYS_EAGER = True  # Runs tasks synchronously
     CELERY_TASK_EAGER_PROPAGATES = True  # Ensures exceptions are raised immediately
@@ -262,7 +373,12 @@ CKEDITOR_BASEPATH = "/static/ckeditor/ckeditor/"
 
 ################################Session and Cookie Settings#######################################33
 SESSION_COOKIE_AGE = 7200000
-SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+# "django.contrib.sessions.backends.cache" keeps the sessions in Redis
+SESSION_ENGINE = config(
+    "SESSION_ENGINE", default="django.contrib.sessions.backends.signed_cookies"
+)
+# never "tiered", a logout must be seen by every worker at once
+SESSION_CACHE_ALIAS = "default"
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_HTTPONLY = True
 
@@ -1,8 +1,117 @@
+"""
+Sitemaps of the site, pre-rendered to gzipped files by build_sitemaps().
+
+Every page of a section becomes sitemap-<section>-<page>.xml.gz and
+sitemap.xml.gz is the index of them, all in the SITEMAP_STORAGE, so every
+web server serves the files of the last build. A file is only rewritten
+when its content changed, so its modified time is the Last-Modified the
+sitemap views serve.
+"""
+
+import gzip
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.contrib.sites.models import Site
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
 from blog.sitemaps import BlogPostSitemap
+from book_.sitemaps import BookFormatSitemap
 from i.sitemaps import MonitorsSitemap
 
-
 sitemaps = {
     "blog": BlogPostSitemap(),
     "monitors": MonitorsSitemap(),
+    "books": BookFormatSitemap(),
 }
+
+SITEMAP_PROTOCOL = "https"
+INDEX_FILE_NAME = "sitemap.xml.gz"
+SEGMENT_FILE_NAME = re.compile(r"^sitemap-[-\w]+-\d+\.xml\.gz$")
+
+
+def segment_file_name(section, page) -> str:
+    return f"sitemap-{section}-{page}.xml.gz"
+
+
+@lru_cache(maxsize=None)
+def get_sitemap_storage() -> Storage:
+    """The storage of settings.SITEMAP_STORAGE, in the format of STORAGES"""
+    storage = settings.SITEMAP_STORAGE
+    return import_string(storage["BACKEND"])(**storage.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def reset_sitemap_storage(setting, **kwargs):
+    if setting == "SITEMAP_STORAGE":
+        get_sitemap_storage.cache_clear()
+
+
+def _write_if_changed(storage, file_name, xml) -> bool:
+    """Write the gzipped xml, False when the file already has it"""
+    # mtime=0 keeps the gzip header, and so the bytes, equal for equal xml
+    content = gzip.compress(xml.encode(), mtime=0)
+    if storage.exists(file_name):
+        with storage.open(file_name, "rb") as f:
+            if f.read() == content:
+                return False
+        # save() picks another name for an existing file
+        storage.delete(file_name)
+    storage.save(file_name, ContentFile(content))
+    return True
+
+
+def build_sitemaps() -> dict:
+    """
+    Render every sitemap segment and the index, remove the segments of
+    pages that no longer exist. Return the counts of written, unchanged
+    and removed files.
+    """
+    storage = get_sitemap_storage()
+    site = Site.objects.get_current()
+    written = unchanged = 0
+    segments, index = set(), []
+
+    for section, site_map in sitemaps.items():
+        for page in site_map.paginator.page_range:
+            urls = site_map.get_urls(page=page, site=site, protocol=SITEMAP_PROTOCOL)
+            file_name = segment_file_name(section, page)
+            xml = render_to_string("sitemap.xml", {"urlset": urls})
+            if _write_if_changed(storage, file_name, xml):
+                written += 1
+            else:
+                unchanged += 1
+            segments.add(file_name)
+
+            lastmods = [url["lastmod"] for url in urls if url["lastmod"]]
+            location = reverse(
+                "sitemap_segment", kwargs={"section": section, "page": page}
+            )
+            index.append(
+                SitemapIndexItem(
+                    f"{SITEMAP_PROTOCOL}://{site.domain}{location}",
+                    max(lastmods, default=None),
+                )
+            )
+
+    xml = render_to_string("sitemap_index.xml", {"sitemaps": index})
+    if _write_if_changed(storage, INDEX_FILE_NAME, xml):
+        written += 1
+    else:
+        unchanged += 1
+
+    removed = 0
+    for file_name in storage.listdir("")[1]:
+        if SEGMENT_FILE_NAME.match(file_name) and file_name not in segments:
+            storage.delete(file_name)
+            removed += 1
+
+    return {"written": written, "unchanged": unchanged, "removed": removed}
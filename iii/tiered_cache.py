@@ -0,0 +1,296 @@
+"""
+Tiered cache.
+
+The "default" cache is shared by every process: Redis in production. The
+"tiered" cache puts TieredCache in front of it, an in-process LRU (L1) that
+keeps every value it reads or writes for a few seconds, so hot keys cost no
+round trip. A change made by another process is seen once the L1 copy
+expires, keys that coordinate processes (locks, versions, sessions) belong
+in "default".
+
+get_or_recompute protects an expensive value from a stampede: when it is
+missing, one caller computes it while the others wait for the result, and
+when it is stale, one caller recomputes it while the others keep serving
+the stale value. With `early`, a caller may also treat a value as stale a
+little before it expires, the more likely the longer the value took to
+compute, so a hot value is usually refreshed before anyone waits for it.
+"""
+
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from iii.db_router import primary_reads
+
+TIERED_CACHE_ALIAS = "tiered"
+
+# seconds a recompute may take before another caller takes over
+RECOMPUTE_LOCK_TIMEOUT = 30
+RECOMPUTE_WAIT_TIMEOUT = 5
+# how long a value is served stale while it is recomputed
+STALE_TIMEOUT = 60
+
+_MISSING = object()
+
+# one L1 per process, shared by the threads like LocMemCache
+_local_caches = {}
+_local_caches_lock = threading.Lock()
+
+
+class LocalLRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            pickled, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        # pickled like LocMemCache, callers never share a mutable value
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (pickled, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache(BaseCache):
+    """
+    An L1 LRU in front of the cache named by LOCATION. OPTIONS:
+    LOCAL_TIMEOUT, the seconds a value stays in L1 (5), and
+    LOCAL_MAX_ENTRIES (1000).
+    """
+
+    def __init__(self, location, params):
+        options = params.get("OPTIONS", {})
+        super().__init__(params)
+        self.shared_alias = location or "default"
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        with _local_caches_lock:
+            self._local = _local_caches.setdefault(
+                self.shared_alias, LocalLRU(options.get("LOCAL_MAX_ENTRIES", 1000))
+            )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _keep(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_timeout = self._local_timeout(timeout)
+        if local_timeout > 0:
+            self._local.set(self.make_key(key, version), value, local_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self._local.get(self.make_key(key, version))
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._keep(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._local.get(self.make_key(key, version))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            for key, value in fetched.items():
+                self._keep(key, value, version=version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._keep(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._keep(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._keep(key, value, timeout, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local.get(self.make_key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local.delete(self.make_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def delete(self, key, version=None):
+        self._local.delete(self.make_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local.delete(self.make_key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        """Forget the L1 copies of this process only"""
+        self._local.clear()
+
+
+def _recompute_lock_key(key) -> str:
+    return f"recompute_lock_{key}"
+
+
+def _recompute(cache, key, compute, timeout, stale_timeout):
+    started = time.time()
+    # cached for every later request, not computed from a lagging replica
+    with primary_reads():
+        value = compute()
+    now = time.time()
+    entry = (value, now + timeout, now - started)
+    cache.set(key, entry, timeout + stale_timeout)
+    return value
+
+
+def _is_fresh(entry, early) -> bool:
+    _, fresh_until, compute_time = entry
+    now = time.time()
+    if early:
+        # expires early at random, see "Optimal Probabilistic Cache Stampede
+        # Prevention" (Vattani et al.), log() of (0, 1] is <= 0
+        now -= compute_time * early * math.log(1.0 - random.random())
+    return now < fresh_until
+
+
+def _wait_for_recompute(cache, locks, key):
+    """Another process is computing `key`, wait for it to store the value"""
+    deadline = time.monotonic() + RECOMPUTE_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if not locks.get(_recompute_lock_key(key)):
+            # it failed, the caller computes the value itself
+            return None
+    return None
+
+
+def get_or_recompute(
+    key, compute, timeout, stale_timeout=STALE_TIMEOUT, early=0, cache=None
+):
+    """
+    The value of `key`, computed by `compute()` when it is missing. A value
+    is fresh for `timeout` seconds, then served stale for `stale_timeout`
+    more while a single caller recomputes it. `early` > 0 (1 is typical)
+    ends the freshness at random ahead of time. Values set this way are
+    only read back through this function. Uses the "tiered" cache by
+    default.
+    """
+    cache = cache if cache is not None else caches[TIERED_CACHE_ALIAS]
+    # the locks live in the shared tier only, an L1 copy would outlive them
+    locks = getattr(cache, "shared", cache)
+    lock_key = _recompute_lock_key(key)
+
+    entry = cache.get(key)
+    if entry is not None:
+        value = entry[0]
+        if _is_fresh(entry, early):
+            return value
+        if not locks.add(lock_key, 1, timeout=RECOMPUTE_LOCK_TIMEOUT):
+            # recomputed by another caller
+            return value
+        try:
+            return _recompute(cache, key, compute, timeout, stale_timeout)
+        finally:
+            locks.delete(lock_key)
+
+    # no lock of this process is held while computing or waiting, its
+    # threads take turns through the shared lock like other processes
+    locked = locks.add(lock_key, 1, timeout=RECOMPUTE_LOCK_TIMEOUT)
+    if locked:
+        # computed by a caller that released the lock since the miss
+        entry = cache.get(key)
+    else:
+        entry = _wait_for_recompute(cache, locks, key)
+    if entry is not None:
+        if locked:
+            locks.delete(lock_key)
+        return entry[0]
+    try:
+        return _recompute(cache, key, compute, timeout, stale_timeout)
+    finally:
+        if locked:
+            locks.delete(lock_key)
+
+
+def cached_versions(keys, alias=DEFAULT_CACHE_ALIAS) -> list:
+    """
+    The versions kept under `keys` in the cache `alias`, for keys of cached
+    values that change together. A missing version starts from a
+    timestamp, so a version evicted from the cache never comes back with
+    an older value. Through the "tiered" cache, a bump made by another
+    process is seen once the L1 copy of the version expires.
+    """
+    cache = caches[alias]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def cached_version(key, alias=DEFAULT_CACHE_ALIAS):
+    return cached_versions([key], alias)[0]
+
+
+def bump_versions(*keys, alias=DEFAULT_CACHE_ALIAS) -> None:
+    """Move the versions of `keys` past every earlier one"""
+    now = time.time_ns()
+    caches[alias].set_many(dict.fromkeys(keys, now), timeout=None)
@@ -18,11 +18,9 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
 
-from iii.sitemap import sitemaps  # Adjust to your app's location
-from iii.views import maintenance
+from iii.views import maintenance, serve_sitemap
 
 urlpatterns = [
     path("blog/", include(("blog.urls", "blog"))),
@@ -36,10 +34,14 @@ urlpatterns = [
     path("grappelli/", include("grappelli.urls")),  # grappelli URLS
     path(
         "sitemap.xml",
-        sitemap,
-        {"sitemaps": sitemaps},
+        serve_sitemap,
         name="django.contrib.sitemaps.views.sitemap",
     ),
+    path(
+        "sitemap-<slug:section>-<int:page>.xml",
+        serve_sitemap,
+        name="sitemap_segment",
+    ),
     path("", include(("django_prometheus.urls", "django_prometheus"))),
     # Maintainance Mode
     path("maintenance/", maintenance, name="maintenance"),
@@ -1,5 +1,66 @@
+import gzip
+
+from django.contrib.sitemaps.views import sitemap
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from iii.sitemap import (
+    INDEX_FILE_NAME,
+    get_sitemap_storage,
+    segment_file_name,
+    sitemaps,
+)
 
 
 def maintenance(request):
     return render(request, "503.html", context=None, status=503)
+
+
+@require_safe
+def serve_sitemap(request, section=None, page=None):
+    """
+    Serve a pre-rendered sitemap file, gzipped when the client accepts it.
+    Until the first build the index is rendered live.
+    """
+    if section is None:
+        file_name = INDEX_FILE_NAME
+    elif section in sitemaps:
+        file_name = segment_file_name(section, page)
+    else:
+        raise Http404("No sitemap available for section: %r" % section)
+
+    storage = get_sitemap_storage()
+    if not storage.exists(file_name):
+        if section is None:
+            return sitemap(request, sitemaps=sitemaps)
+        raise Http404("No sitemap page %s for section: %r" % (page, section))
+
+    use_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    modified = storage.get_modified_time(file_name).timestamp()
+    # the gzipped and the plain file are different representations
+    etag = '"%x-%x%s"' % (
+        int(modified * 1_000_000),
+        storage.size(file_name),
+        "-gz" if use_gzip else "",
+    )
+    last_modified = int(modified)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        with storage.open(file_name, "rb") as f:
+            content = f.read()
+        if use_gzip:
+            response = HttpResponse(content, content_type="application/xml")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                gzip.decompress(content), content_type="application/xml"
+            )
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -7,6 +7,7 @@ class ModelChecksConfig(AppConfig):
 
     def ready(self):
         from model_checks.check_choices_lentgh import run_model_field_choices_checks
+        from model_checks.index_check import run_index_check
         from model_checks.nulls_blanks import run_model_field_checks
         from model_checks.verbose_name_check import run_verbose_name_check
 
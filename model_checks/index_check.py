@@ -0,0 +1,244 @@
+import ast
+import os
+from typing import Iterable, Iterator, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.db import models
+
+QUERY_METHODS = {"filter", "get", "order_by"}
+# lookups a B-tree index cannot serve
+UNINDEXABLE_LOOKUPS = {
+    "contains",
+    "icontains",
+    "iexact",
+    "regex",
+    "iregex",
+    "endswith",
+    "iendswith",
+    "istartswith",
+}
+SKIPPED_DIRS = {"migrations", "tests", "management", "__pycache__"}
+
+
+def get_project_app_configs() -> Iterator:
+    """Project apps, skipping third-party apps."""
+    for app_config in apps.get_app_configs():
+        if "site-packages" in app_config.path:
+            continue
+        yield app_config
+
+
+def module_name(app_config, path: str) -> str:
+    """Dotted name of the module at `path` of an app."""
+    parts = os.path.relpath(path, app_config.path)[: -len(".py")].split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join([app_config.name, *parts])
+
+
+def is_skipped(module: str) -> bool:
+    """Whether settings.INDEX_CHECK_SKIPPED_MODULES holds the module or its package."""
+    return any(
+        module == skipped or module.startswith(f"{skipped}.")
+        for skipped in getattr(settings, "INDEX_CHECK_SKIPPED_MODULES", ())
+    )
+
+
+def get_project_modules(app_config) -> Iterator[str]:
+    for root, dirs, files in os.walk(app_config.path):
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(".py") and not is_skipped(module_name(app_config, path)):
+                yield path
+
+
+def imported_models(tree: ast.Module) -> dict:
+    """Local name -> model of the models imported by a module."""
+    names = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom) or not node.module:
+            continue
+        app_config = apps.get_containing_app_config(node.module)
+        if app_config is None or not node.module.endswith("models"):
+            continue
+        for alias in node.names:
+            try:
+                model = app_config.get_model(alias.name)
+            except LookupError:
+                continue
+            names[alias.asname or alias.name] = model
+    return names
+
+
+def query_chain(node: ast.Call, models_by_name: dict):
+    """
+    The model and the calls of a `Model.objects.<method>(...)...` chain
+    ending at `node`, or None when `node` is not one.
+    """
+    calls = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        calls.append(node)
+        node = node.func.value
+    if (
+        isinstance(node, ast.Attribute)
+        and node.attr == "objects"
+        and isinstance(node.value, ast.Name)
+        and node.value.id in models_by_name
+    ):
+        return models_by_name[node.value.id], calls[::-1]
+    return None
+
+
+def lookup_field(model, lookup: str) -> Optional[models.Field]:
+    """The column of `model` a filter keyword or order_by name is on."""
+    parts = lookup.lstrip("-").split("__")
+    if parts[0] == "pk":
+        return model._meta.pk
+    try:
+        field = model._meta.get_field(parts[0])
+    except Exception:
+        return None
+    if not getattr(field, "concrete", False):
+        return None
+    rest = parts[1:]
+    if field.is_relation and rest and rest[0] in ("id", "pk"):
+        rest = rest[1:]
+    if rest and (field.is_relation or rest[0] in UNINDEXABLE_LOOKUPS):
+        # a join into the related table, or a lookup no index serves
+        return None
+    return field
+
+
+def chain_lookups(model, calls) -> tuple[set, list]:
+    """(filtered columns, (column, call) pairs to check) of a chain."""
+    filtered, checked = set(), []
+    for call in calls:
+        method = call.func.attr
+        if method not in QUERY_METHODS:
+            continue
+        if method == "order_by":
+            names = [
+                arg.value
+                for arg in call.args
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str)
+            ]
+        else:
+            names = [keyword.arg for keyword in call.keywords if keyword.arg]
+            # Q(...) passed straight to the call
+            for arg in call.args:
+                if isinstance(arg, ast.Call) and getattr(arg.func, "id", "") == "Q":
+                    names += [keyword.arg for keyword in arg.keywords if keyword.arg]
+        for name in names:
+            field = lookup_field(model, name)
+            if field is None:
+                continue
+            if method != "order_by":
+                filtered.add(field.column)
+            checked.append((field, call))
+    return filtered, checked
+
+
+def condition_fields(condition) -> Iterator[str]:
+    for child in getattr(condition, "children", ()):
+        if isinstance(child, tuple):
+            yield child[0].split("__")[0]
+        else:
+            yield from condition_fields(child)
+
+
+def index_columns(model) -> list[list[str]]:
+    """
+    The columns of every index and unique constraint of `model`, the
+    columns of the condition of a partial index first.
+    """
+    meta = model._meta
+    indexes = [
+        [meta.get_field(name).column for name in condition_fields(index.condition)]
+        + [meta.get_field(name.lstrip("-")).column for name in index.fields]
+        for index in meta.indexes
+        if index.fields
+    ]
+    indexes += [
+        [meta.get_field(name).column for name in constraint.fields]
+        for constraint in meta.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields
+    ]
+    indexes += [
+        [meta.get_field(name).column for name in fields]
+        for fields in meta.unique_together
+    ]
+    return indexes
+
+
+def is_indexed(field: models.Field, filtered: set) -> bool:
+    """
+    Whether an index serves `field`: one of its own, or a composite one
+    whose preceding columns are all filtered on in the same query.
+    """
+    if field.primary_key or field.unique or field.db_index:
+        return True
+    for columns in index_columns(field.model):
+        if field.column in columns:
+            preceding = columns[: columns.index(field.column)]
+            if set(preceding) <= filtered:
+                return True
+    return False
+
+
+def check_module(path: str) -> Iterator[Warning]:
+    with open(path, encoding="utf-8") as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return
+    models_by_name = imported_models(tree)
+    if not models_by_name:
+        return
+
+    # the outermost call of a chain holds all of its lookups
+    inner = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            inner.add(id(node.func.value))
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or id(node) in inner:
+            continue
+        chain = query_chain(node, models_by_name)
+        if chain is None:
+            continue
+        model, calls = chain
+        filtered, checked = chain_lookups(model, calls)
+        for field, call in checked:
+            if is_indexed(field, filtered):
+                continue
+            yield Warning(
+                f"'{model._meta.label}.{field.name}' is queried in "
+                f"{os.path.relpath(path)}:{call.lineno} without an index.",
+                hint=(
+                    "Set db_index=True on the field, or add a Meta.indexes "
+                    "entry the query can use."
+                ),
+                obj=model,
+                id="H005",
+            )
+
+
+@register("indexes", deploy=True)
+def run_index_check(*args, **kwargs) -> Iterable[Warning]:
+    """
+    Check that the fields the project filters and orders on are indexed.
+    The modules are parsed, not imported, so only the literal
+    `Model.objects...` chains are seen. Run it with
+    `manage.py check --deploy --tag indexes`.
+    """
+    warnings, seen = [], set()
+    for app_config in get_project_app_configs():
+        for path in get_project_modules(app_config):
+            for warning in check_module(path):
+                if warning.msg not in seen:
+                    seen.add(warning.msg)
+                    warnings.append(warning)
+    return warnings
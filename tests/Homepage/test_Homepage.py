@@ -50,7 +50,17 @@ from Homepage.models import (
     SellerProfile,
     UserProfile,
 )
-from Homepage.tasks import send_password_reset_email
+from Homepage.otp_store import (
+    OTP_MAX_ATTEMPTS,
+    OTP_RATE_LIMIT,
+    store_otp,
+    verify_otp,
+)
+from Homepage.tasks import (
+    revoke_google_token,
+    send_otp_sms,
+    send_password_reset_email,
+)
 from Homepage.views import (
     CustomerProfilePageView,
     CustomLoginView,
@@ -643,6 +653,24 @@ class TestCustomLogoutView:
         )
         assert "sessionid" not in response.wsgi_request.session
 
+    @patch("Homepage.views.revoke_google_token.delay")
+    def test_logout_queues_google_token_revocation(
+        self, mock_delay, client_logged_in_with_social_account
+    ):
+        client, user, social_account = client_logged_in_with_social_account
+
+        # the view looks up the social account by the session "user_id"
+        session = client.session
+        session["user_id"] = social_account.id
+        session.save()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        response = client.get(reverse("Homepage:logout"))
+
+        assert response.status_code == 302
+        assert response.url == reverse("Homepage:login")
+        mock_delay.assert_called_once_with("fake_token")
+
     def test_logout_anonymous_user(self, client):
         response = client.get(reverse("Homepage:logout"))
         messages = list(get_messages(response.wsgi_request))
@@ -759,8 +787,8 @@ class Test_GoogleLogin:
 @pytest.mark.django_db
 class Test_GoogleOAuthCallback:
 
-    @patch("requests.post")
-    @patch("requests.get")
+    @patch("Homepage.google_oauth.http_session.post")
+    @patch("Homepage.google_oauth.http_session.get")
     def test_google_callback_new_user(
         self, mock_get, mock_post, settings: SettingsWrapper, client: Client
     ):
@@ -805,8 +833,8 @@ class Test_GoogleOAuthCallback:
         assert len(messages) == 1
         assert str(messages[0]) == "Welcome! you are logged-in"
 
-    @patch("requests.post")
-    @patch("requests.get")
+    @patch("Homepage.google_oauth.http_session.post")
+    @patch("Homepage.google_oauth.http_session.get")
     def test_google_callback_existing_user(self, mock_get, mock_post, client, settings):
 
         user = CustomUserOnlyFactory.create(
@@ -868,6 +896,61 @@ class Test_GoogleOAuthCallback:
         assert str(messages[0]) == "Welcome! you are logged-in"
 
 
+class Test_RevokeGoogleToken:
+    @patch("Homepage.tasks.revoke_token")
+    def test_revoke_google_token(self, mock_revoke_token):
+        mock_revoke_token.return_value.status_code = 200
+
+        revoke_google_token.apply(args=["test-access-token"]).get()
+
+        mock_revoke_token.assert_called_once_with("test-access-token")
+
+
+class Test_SendOtpSms:
+    @patch("Homepage.helper_functions.twilio_session.post")
+    def test_send_otp_sms(self, mock_post, caplog):
+        mock_post.return_value.status_code = 201
+
+        with caplog.at_level(logging.INFO, logger="Homepage.tasks"):
+            send_otp_sms.apply(args=["user@example.com", "+923074649892"]).get()
+
+        assert "**********892" in caplog.text
+        assert "+923074649892" not in caplog.text
+
+        assert mock_post.call_count == 1
+        data = mock_post.call_args.kwargs["data"]
+        assert data["To"] == "+923074649892"
+        # the task generates the OTP and keeps only its hash
+        generated_otp = data["Body"].rsplit(" ", 1)[-1]
+        assert generated_otp not in str(cache.get("otp_user@example.com"))
+        assert verify_otp("user@example.com", generated_otp)
+
+    def test_otp_dropped_after_too_many_wrong_codes(self):
+        store_otp("user@example.com", "123456")
+
+        for _ in range(OTP_MAX_ATTEMPTS):
+            assert not verify_otp("user@example.com", "654321")
+
+        assert not verify_otp("user@example.com", "123456")
+
+    @patch("Homepage.helper_functions.twilio_session.post")
+    def test_send_otp_sms_retries_on_server_error(self, mock_post):
+        mock_post.return_value.status_code = 503
+
+        with pytest.raises(MaxRetriesExceededError):
+            send_otp_sms.apply(args=["user@example.com", "+923074649892"]).get()
+
+        assert mock_post.call_count == send_otp_sms.max_retries + 1
+
+    @patch("Homepage.helper_functions.twilio_session.post")
+    def test_send_otp_sms_does_not_retry_quota_error(self, mock_post):
+        mock_post.return_value.status_code = 403
+
+        send_otp_sms.apply(args=["user@example.com", "+923074649892"]).get()
+
+        assert mock_post.call_count == 1
+
+
 @pytest.mark.django_db
 class Test_PasswordReset:
 
@@ -2007,8 +2090,8 @@ class Test_ValidateUserView:
         assert "password_reset_email.html" in [t.name for t in response.templates]
         assert isinstance(response.context["form"], E_MailForm_For_Password_Reset)
 
-    @patch("Homepage.views.helper_function")
-    def test_post_request_valid_email_sends_otp(self, helper_function, custom_user):
+    @patch("Homepage.views.send_otp_sms.delay")
+    def test_post_request_valid_email_sends_otp(self, send_otp_sms, custom_user):
         # Make a client
         client = Client(
             HTTP_USER_AGENT="Mozilla/5.0",
@@ -2026,7 +2109,6 @@ class Test_ValidateUserView:
         user_profile.save()
 
         # Test POST request with a valid email and phone number
-        helper_function.return_value = True  # Mock Twilio API call as success
         response = client.post(reverse("Homepage:send_sms"), data={"email": email})
 
         # Check OTP message success in response and redirection
@@ -2037,17 +2119,20 @@ class Test_ValidateUserView:
         assert temporary_cookie["referer_url"] == reverse("Homepage:login")
         assert response.url == reverse("Homepage:validate_otp_view")
 
+        # The SMS is queued, the OTP is not in the task arguments
+        assert send_otp_sms.call_args.args == (email, "+923074649892")
+        assert "generated_otp" not in temporary_cookie
+
         # Tear Down Cookies and Cache
         cache.clear()
         response.delete_cookie("temporary_cookie")
         assert response.cookies.get("temporary_cookie")["max-age"] == 0
 
-    @patch("Homepage.views.helper_function")
+    @patch("Homepage.views.send_otp_sms.delay")
     def test_post_request_invalid_email_redirects_signup(
-        self, helper_function, client: Client
+        self, send_otp_sms, client: Client
     ):
         # Test with an invalid email (no associated user)
-        helper_function.return_value = True
         response = client.post(
             reverse("Homepage:send_sms"), data={"email": "nonexistent@example.com"}
         )
@@ -2068,9 +2153,9 @@ class Test_ValidateUserView:
         assert response.url == reverse("Homepage:password_reset")
         assert any("Your profile is not updated" in str(msg) for msg in messages)
 
-    @patch("Homepage.views.helper_function")
+    @patch("Homepage.views.send_otp_sms.delay")
     def test_post_request_otp_sending_failure(
-        self, helper_function, client: Client, custom_user
+        self, send_otp_sms, client: Client, custom_user
     ):
         user, user_profile = custom_user()
         email = user.email
@@ -2079,15 +2164,38 @@ class Test_ValidateUserView:
         user_profile.phone_number = "+923074649892"
         user_profile.save()
 
-        # Simulate OTP sending failure
-        helper_function.return_value = False
+        # Simulate the OTP task can not be queued
+        send_otp_sms.side_effect = Exception("broker unavailable")
 
         response = client.post(reverse("Homepage:send_sms"), data={"email": email})
 
         messages = list(get_messages(response.wsgi_request))
         assert response.status_code == 302
         assert response.url == reverse("Homepage:login")
-        assert any("Failed to send SMS" in str(msg) for msg in messages)
+        assert any(
+            "OTP service is currently unavailable" in str(msg) for msg in messages
+        )
+
+    @patch("Homepage.views.send_otp_sms.delay")
+    def test_post_request_otp_rate_limited(
+        self, send_otp_sms, client: Client, custom_user
+    ):
+        cache.clear()
+        user, user_profile = custom_user()
+
+        user_profile = UserProfile.objects.get(user__id=user.id)
+        user_profile.phone_number = "+923074649892"
+        user_profile.save()
+
+        for _ in range(OTP_RATE_LIMIT):
+            client.post(reverse("Homepage:send_sms"), data={"email": user.email})
+        response = client.post(reverse("Homepage:send_sms"), data={"email": user.email})
+
+        messages = list(get_messages(response.wsgi_request))
+        assert response.url == reverse("Homepage:login")
+        assert send_otp_sms.call_count == OTP_RATE_LIMIT
+        assert any("Too many OTP requests" in str(msg) for msg in messages)
+        cache.clear()
 
 
 @pytest.mark.django_db
@@ -2114,11 +2222,11 @@ class Test_ValidateOtpView:
 
         # Setup For POST request to "validate_otp_view"
         client = Client()
+        store_otp(email, "123456")
         client.cookies["temporary_cookie"] = json.dumps(
             {
                 "email": email,
                 "id": user.id,
-                "generated_otp": str(123456),
                 "referer_url": reverse("Homepage:login"),
             }
         )
@@ -2145,11 +2253,11 @@ class Test_ValidateOtpView:
 
         invalid_otp = "654321"
 
+        store_otp(email, "123456")
         client.cookies["temporary_cookie"] = json.dumps(
             {
                 "email": email,
                 "id": user.id,
-                "generated_otp": "123456",
                 "referer_url": reverse("Homepage:login"),
             }
         )
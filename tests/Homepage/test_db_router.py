@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from i.models import Monitors
+from iii.db_router import (
+    ReplicaReadsMiddleware,
+    ReplicaRouter,
+    primary_reads,
+    replica_reads,
+    sticky_key,
+)
+from iii.tiered_cache import get_or_recompute
+
+
+@pytest.fixture
+def replica():
+    cache.clear()
+    with mock.patch("iii.db_router.replica_aliases", return_value=["replica_1"]):
+        yield
+
+
+def serve(method, view_name, user_id=None, write=False):
+    """The databases of a read before and after the view's write, if any"""
+    request = getattr(RequestFactory(), method)("/")
+    request.resolver_match = SimpleNamespace(view_name=view_name)
+    request.session = {} if user_id is None else {"user_id": user_id}
+    request.user = AnonymousUser()
+    router = ReplicaRouter()
+    routed = []
+
+    def get_response(request):
+        middleware.process_view(request, None, (), {})
+        routed.append(router.db_for_read(Monitors))
+        if write:
+            router.db_for_write(Monitors)
+            routed.append(router.db_for_read(Monitors))
+        return HttpResponse()
+
+    middleware = ReplicaReadsMiddleware(get_response)
+    middleware(request)
+    return routed
+
+
+def test_reads_go_to_the_replicas_inside_replica_reads_only(replica):
+    router = ReplicaRouter()
+
+    assert router.db_for_read(Monitors) is None
+    with replica_reads():
+        assert router.db_for_read(Monitors) == "replica_1"
+        assert router.db_for_write(Monitors) == "default"
+        # read your own write
+        assert router.db_for_read(Monitors) is None
+    assert router.db_for_read(Monitors) is None
+
+
+def test_without_replicas_reads_stay_on_default():
+    with replica_reads():
+        assert ReplicaRouter().db_for_read(Monitors) is None
+
+
+def test_replicas_are_not_migrated():
+    router = ReplicaRouter()
+
+    assert router.allow_migrate("default", "i") is True
+    assert router.allow_migrate("replica_1", "i") is False
+
+
+@pytest.mark.parametrize(
+    "method, view_name, database",
+    [
+        ("get", "i:MonitorListView", "replica_1"),
+        ("head", "blog:post_list", "replica_1"),
+        ("post", "blog:live_post", None),
+        ("get", "cart:cart_view", None),
+    ],
+)
+def test_middleware_routes_the_read_only_views(replica, method, view_name, database):
+    assert serve(method, view_name) == [database]
+    # the request does not leak into the next one
+    assert ReplicaRouter().db_for_read(Monitors) is None
+
+
+def test_reads_stick_to_default_after_a_write(replica):
+    assert serve("get", "i:MonitorListView", user_id=7) == ["replica_1"]
+
+    # a review, the cart or a checkout
+    serve("post", "i:monitor_add_review", user_id=7, write=True)
+    assert serve("get", "i:MonitorListView", user_id=7) == [None]
+    assert serve("get", "i:MonitorListView", user_id=8) == ["replica_1"]
+
+    # the window is over
+    cache.delete(sticky_key(SimpleNamespace(session={"user_id": 7})))
+    assert serve("get", "i:MonitorListView", user_id=7) == ["replica_1"]
+
+
+def test_a_read_only_view_reads_its_own_write(replica):
+    assert serve("get", "i:MonitorListView", user_id=7, write=True) == [
+        "replica_1",
+        None,
+    ]
+
+
+def test_writes_of_anonymous_users_do_not_stick(replica):
+    serve("post", "i:monitor_add_review", write=True)
+
+    assert serve("get", "i:MonitorListView") == ["replica_1"]
+
+
+def test_cached_values_are_computed_from_default(replica):
+    router = ReplicaRouter()
+    routed = []
+
+    with replica_reads():
+        with primary_reads():
+            assert router.db_for_read(Monitors) is None
+        assert router.db_for_read(Monitors) == "replica_1"
+
+        get_or_recompute(
+            "routed", lambda: routed.append(router.db_for_read(Monitors)), 60
+        )
+        assert router.db_for_read(Monitors) == "replica_1"
+
+    assert routed == [None]
@@ -0,0 +1,140 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from prometheus_client import REGISTRY
+
+from Homepage.models import CustomUser
+from iii.instrumentation import (
+    InstrumentationMiddleware,
+    _timed_urlopen,
+    external_service,
+    fingerprint,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def instrumented_request(view, view_name):
+    request = RequestFactory().get("/instrumented/")
+
+    def get_response(request):
+        request.resolver_match = SimpleNamespace(view_name=view_name)
+        view()
+        return HttpResponse()
+
+    InstrumentationMiddleware(get_response)(request)
+
+
+def test_fingerprint_ignores_parameters_and_in_list_length():
+    assert fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)') == (
+        'SELECT * FROM "t" WHERE "id" IN (%s, ...)'
+    )
+    assert fingerprint('SELECT * FROM "t" WHERE "id" = %s') == (
+        'SELECT * FROM "t" WHERE "id" = %s'
+    )
+
+
+@pytest.mark.parametrize(
+    "host, service",
+    [
+        ("api.stripe.com", "stripe"),
+        ("api.cloudinary.com", "cloudinary"),
+        ("res.cloudinary.com", "cloudinary"),
+        ("osamaaslam.pythonanywhere.com", "cv_api"),
+        ("example.com", "other"),
+        (None, "other"),
+    ],
+)
+def test_external_service(host, service):
+    assert external_service(host) == service
+
+
+@pytest.mark.django_db
+def test_queries_and_duplicates_are_recorded_per_view():
+    def view():
+        for _ in range(3):
+            list(CustomUser.objects.filter(pk=1))
+        CustomUser.objects.count()
+
+    queries = sample("django_view_queries_sum", view="test:n_plus_one")
+    duplicates = sample("django_view_duplicate_queries_sum", view="test:n_plus_one")
+    requests = sample("django_view_queries_count", view="test:n_plus_one")
+
+    instrumented_request(view, "test:n_plus_one")
+
+    assert sample("django_view_queries_count", view="test:n_plus_one") == requests + 1
+    assert sample("django_view_queries_sum", view="test:n_plus_one") == queries + 4
+    assert (
+        sample("django_view_duplicate_queries_sum", view="test:n_plus_one")
+        == duplicates + 2
+    )
+    assert sample("django_view_query_seconds_count", view="test:n_plus_one") > 0
+
+
+@pytest.mark.django_db
+def test_external_http_time_is_recorded_once_per_call():
+    calls = []
+
+    def urlopen(pool, *args, **kwargs):
+        calls.append(pool.host)
+        if len(calls) == 1:
+            # a retry of urllib3 calls urlopen() again
+            return timed_urlopen(pool, *args, **kwargs)
+        return "response"
+
+    timed_urlopen = _timed_urlopen(urlopen)
+    stripe = SimpleNamespace(host="api.stripe.com")
+    labels = {"view": "test:checkout", "service": "stripe"}
+    count = sample("django_view_external_http_seconds_count", **labels)
+
+    instrumented_request(lambda: timed_urlopen(stripe), "test:checkout")
+
+    assert calls == ["api.stripe.com", "api.stripe.com"]
+    assert sample("django_view_external_http_seconds_count", **labels) == count + 1
+    # outside of a request nothing is recorded
+    assert timed_urlopen(stripe) == "response"
+    assert sample("django_view_external_http_seconds_count", **labels) == count + 1
+
+
+@pytest.mark.django_db
+def test_real_request_is_labelled_with_url_name(client):
+    label = {"view": "django.contrib.sitemaps.views.sitemap"}
+    count = sample("django_view_queries_count", **label)
+
+    client.get("/sitemap.xml")
+
+    assert sample("django_view_queries_count", **label) == count + 1
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_logged(caplog):
+    def view():
+        list(CustomUser.objects.all())
+        list(CustomUser.objects.all())
+
+    with override_settings(SLOW_REQUEST_THRESHOLD=0, SLOW_REQUEST_LOG_SAMPLE_RATE=1):
+        with caplog.at_level(logging.WARNING, logger="iii.instrumentation"):
+            instrumented_request(view, "test:slow")
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "Slow request GET /instrumented/ (test:slow)" in message
+    assert "2 queries" in message
+    assert "1 duplicates" in message
+
+
+@pytest.mark.django_db
+def test_fast_or_unsampled_requests_are_not_logged(caplog):
+    with override_settings(SLOW_REQUEST_THRESHOLD=60, SLOW_REQUEST_LOG_SAMPLE_RATE=1):
+        with caplog.at_level(logging.WARNING, logger="iii.instrumentation"):
+            instrumented_request(lambda: None, "test:fast")
+    with override_settings(SLOW_REQUEST_THRESHOLD=0, SLOW_REQUEST_LOG_SAMPLE_RATE=0):
+        with caplog.at_level(logging.WARNING, logger="iii.instrumentation"):
+            instrumented_request(lambda: None, "test:unsampled")
+
+    assert caplog.records == []
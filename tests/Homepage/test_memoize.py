@@ -0,0 +1,92 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import caches
+
+from i.models import ProductCategory
+from iii.memoize import invalidate, memoize
+
+
+def counted(**options):
+    calls = []
+
+    @memoize(timeout=60, **options)
+    def square(number):
+        calls.append(number)
+        return number * number
+
+    return square, calls
+
+
+def test_results_are_cached_per_arguments():
+    square, calls = counted()
+
+    assert [square(2), square(2), square(3), square(number=2)] == [4, 4, 9, 4]
+    assert calls == [2, 3, 2]
+
+
+def test_string_tags_are_invalidated_explicitly():
+    square, calls = counted(tags=["squares"])
+    square(2)
+
+    invalidate("squares")
+    square(2)
+
+    assert calls == [2, 2]
+
+
+def test_warm_calls_make_no_round_trip():
+    square, calls = counted(tags=["squares"])
+    square(2)
+
+    shared = caches["default"]
+    with mock.patch.object(shared, "get") as get, mock.patch.object(
+        shared, "get_many"
+    ) as get_many:
+        assert square(2) == 4
+    get.assert_not_called()
+    get_many.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_model_tags_are_invalidated_by_saves_and_deletes(
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    @memoize(timeout=60, tags=[ProductCategory])
+    def product_category(name):
+        return ProductCategory.objects.get(name=name)
+
+    books = ProductCategory.objects.create(name="BOOKS")
+    with django_assert_num_queries(1):
+        assert product_category("BOOKS") == books
+        assert product_category("BOOKS") == books
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        books.name = "BOOKS"
+        books.save()
+        # not before the commit, or a result of the old rows is cached
+        with django_assert_num_queries(0):
+            product_category("BOOKS")
+    for callback in callbacks:
+        callback()
+    with django_assert_num_queries(1):
+        product_category("BOOKS")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        books.delete()
+    with pytest.raises(ProductCategory.DoesNotExist):
+        product_category("BOOKS")
+
+
+def test_values_refresh_early_at_random():
+    square, calls = counted(early=1.0)
+    square(2)
+
+    # the unluckiest draw moves the expiry before now
+    with mock.patch("iii.tiered_cache.math.log", return_value=float("-inf")):
+        square(2)
+    # the luckiest one keeps it
+    with mock.patch("iii.tiered_cache.random.random", return_value=0.0):
+        square(2)
+
+    assert calls == [2, 2]
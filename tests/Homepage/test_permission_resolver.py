@@ -0,0 +1,119 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from Homepage.models import CustomUser
+from Homepage.permission_resolver import (
+    ADD_PRODUCT_PERMISSIONS,
+    COMMENT_PERMISSIONS,
+    PERMISSION_VERSION_KEY,
+    bump_permission_version,
+    display_user_type_permissions,
+    get_permission_version,
+    get_user_permissions,
+    user_has_perms,
+    user_has_role_permissions,
+)
+from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
+
+# Disable Faker DEBUG logging
+faker_logger = logging.getLogger("faker")
+faker_logger.setLevel(logging.WARNING)
+
+
+@pytest.mark.django_db
+def test_user_permissions_are_cached(django_assert_num_queries):
+    user = CustomUserOnlyFactory(user_type="SELLER")
+    permissions = get_user_permissions(CustomUser.objects.get(id=user.id))
+
+    assert "Homepage.seller_add_product" in permissions
+
+    # fresh instance, as loaded by AuthenticationMiddleware on the next request
+    fresh_user = CustomUser.objects.get(id=user.id)
+    with django_assert_num_queries(0):
+        assert get_user_permissions(fresh_user) == permissions
+        assert user_has_role_permissions(fresh_user, ADD_PRODUCT_PERMISSIONS)
+        assert user_has_role_permissions(fresh_user, COMMENT_PERMISSIONS)
+
+
+@pytest.mark.django_db
+def test_group_permission_change_bumps_version():
+    user = CustomUserOnlyFactory(user_type="SELLER")
+    assert user_has_role_permissions(
+        CustomUser.objects.get(id=user.id), ADD_PRODUCT_PERMISSIONS
+    )
+    version = get_permission_version()
+
+    group = Group.objects.get(name="SELLER")
+    group.permissions.remove(Permission.objects.get(codename="seller_add_product"))
+
+    assert get_permission_version() > version
+    assert not user_has_role_permissions(
+        CustomUser.objects.get(id=user.id), ADD_PRODUCT_PERMISSIONS
+    )
+
+
+@pytest.mark.django_db
+def test_user_group_change_invalidates_user_permissions():
+    user = CustomUserOnlyFactory(user_type="CUSTOMER")
+    assert "Homepage.customer_add_comment" in get_user_permissions(user)
+
+    user.groups.clear()
+
+    assert "Homepage.customer_add_comment" not in get_user_permissions(
+        CustomUser.objects.get(id=user.id)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "user_type, allowed",
+    [
+        ("SELLER", True),
+        ("MANAGER", True),
+        ("ADMINISTRATOR", True),
+        ("CUSTOMER", False),
+        ("CUSTOMER REPRESENTATIVE", False),
+    ],
+)
+def test_add_product_role_permissions(user_type, allowed):
+    user = CustomUserOnlyFactory(user_type=user_type)
+
+    assert user_has_role_permissions(user, ADD_PRODUCT_PERMISSIONS) is allowed
+
+
+@pytest.mark.django_db
+def test_superuser_has_all_perms():
+    user = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
+
+    assert user.is_superuser
+    assert user_has_perms(user, ["Homepage.update_blogpost"])
+
+
+@pytest.mark.django_db
+def test_display_user_type_permissions_for_social_user():
+    user = CustomUserOnlyFactory(user_type="CUSTOMER")
+    request = RequestFactory().get("/")
+    request.user = user
+    request.session = {"user_id": user.id}
+
+    clean_permissions = display_user_type_permissions(request)
+    assert "customer_add_comment" in clean_permissions
+    assert "Can add custom social account" not in clean_permissions
+
+    request.session["social_id"] = 1
+    clean_permissions = display_user_type_permissions(request)
+    assert "Can add custom social account" in clean_permissions
+
+
+def test_evicted_version_does_not_revive_older_entries():
+    version = get_permission_version()
+    bump_permission_version()
+    newer = get_permission_version()
+
+    cache.delete(PERMISSION_VERSION_KEY)
+
+    assert get_permission_version() not in (version, newer)
@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+
+from Homepage.models import CustomUser, SellerProfile, UserProfile
+from Homepage.profile_loader import load_profile, load_profile_for_update
+from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
+
+# Disable Faker DEBUG logging
+faker_logger = logging.getLogger("faker")
+faker_logger.setLevel(logging.WARNING)
+
+
+@pytest.fixture
+def seller():
+    user = CustomUser.objects.create(
+        email="seller@example.com", username="seller", user_type="SELLER"
+    )
+    user_profile = UserProfile.objects.create(user=user)
+    SellerProfile.objects.create(seller_profile=user_profile, customuser_type_2=user)
+    return user
+
+
+@pytest.mark.django_db
+def test_load_profile_single_query_then_cached(seller, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        custom_user, user_profile, seller_profile = load_profile(seller, "SELLER")
+
+    assert custom_user == seller
+    assert user_profile.user_id == seller.id
+    assert seller_profile.seller_profile_id == user_profile.id
+
+    with django_assert_num_queries(0):
+        assert load_profile(seller, "SELLER")[2] == seller_profile
+
+
+@pytest.mark.django_db
+def test_profile_save_invalidates_cache(seller):
+    _, _, seller_profile = load_profile(seller, "SELLER")
+
+    seller_profile.address = "Updated shipping address"
+    seller_profile.save()
+
+    assert load_profile(seller, "SELLER")[2].address == "Updated shipping address"
+
+
+@pytest.mark.django_db
+def test_missing_rows_are_not_created_on_read():
+    user = CustomUser.objects.create(
+        email="manager@example.com", username="manager", user_type="MANAGER"
+    )
+
+    _, user_profile, manager_profile = load_profile(user, "MANAGER")
+
+    assert user_profile.pk is None
+    assert manager_profile.pk is None
+    assert not UserProfile.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_missing_role_profile_created_on_write():
+    user = CustomUserOnlyFactory(user_type="SELLER")
+
+    _, user_profile, seller_profile = load_profile_for_update(user, "SELLER")
+    assert user_profile.pk is not None
+    assert seller_profile.pk is None
+
+    seller_profile.address = "Lahore, Punjab, Pakistan"
+    seller_profile.save()
+
+    assert (
+        SellerProfile.objects.get(seller_profile=user_profile).customuser_type_2 == user
+    )
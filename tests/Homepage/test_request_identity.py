@@ -0,0 +1,64 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from cart.models import Cart
+from checkout.models import Payment
+from Homepage.models import CustomUser
+from Homepage.request_identity import RequestIdentity, get_request_identity
+from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
+
+# Disable Faker DEBUG logging
+faker_logger = logging.getLogger("faker")
+faker_logger.setLevel(logging.WARNING)
+
+
+def make_request(user=None, session=None):
+    request = RequestFactory().get("/")
+    request.user = user or AnonymousUser()
+    request.session = session if session is not None else {}
+    return request
+
+
+@pytest.mark.django_db
+def test_identity_reuses_authenticated_user(django_assert_num_queries):
+    user = CustomUserOnlyFactory(user_type="CUSTOMER")
+    request = make_request(user, {"user_id": user.id})
+    identity = get_request_identity(request)
+
+    with django_assert_num_queries(0):
+        assert identity.is_logged_in
+        assert identity.user is user
+        assert identity.user_id == user.id
+
+
+@pytest.mark.django_db
+def test_identity_resolves_profile_and_cart_once(django_assert_num_queries):
+    user = CustomUserOnlyFactory(user_type="CUSTOMER")
+    paid_cart = Cart.objects.create(user=user)
+    Payment.objects.create(user=user, cart=paid_cart, stripe_charge_id="ch_1")
+    open_cart = Cart.objects.create(user=user)
+
+    # fresh instance, as loaded by AuthenticationMiddleware
+    user = CustomUser.objects.get(id=user.id)
+    identity = RequestIdentity(make_request(user, {"user_id": user.id}))
+
+    with django_assert_num_queries(2):
+        assert identity.user_profile.user_id == user.id
+        assert identity.cart_id == open_cart.id
+        # both are memoized for the rest of the request
+        assert identity.user_profile.user_id == user.id
+        assert identity.cart == open_cart
+
+
+@pytest.mark.django_db
+def test_identity_without_session_user():
+    user = CustomUserOnlyFactory(user_type="CUSTOMER")
+    identity = RequestIdentity(make_request(user))
+
+    assert not identity.is_logged_in
+    assert identity.user is None
+    assert identity.user_profile is None
+    assert identity.cart is None
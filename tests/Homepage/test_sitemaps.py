@@ -0,0 +1,167 @@
+import gzip
+import os
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.test import override_settings
+from django.urls import reverse
+
+from book_.models import BookFormat
+from Homepage.tasks import build_sitemaps
+from i.models import Monitors
+from iii.sitemap import INDEX_FILE_NAME, segment_file_name
+from tests.books.books_factory_classes import BookFormatFactory
+from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
+from tests.i.factory_classes import (ComputerSubCategoryFactory,
+                                     MonitorsFactory)
+
+
+@pytest.fixture(autouse=True)
+def sitemap_root(tmp_path):
+    storage = {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": str(tmp_path)},
+    }
+    with override_settings(SITEMAP_STORAGE=storage):
+        yield tmp_path
+
+
+@pytest.fixture
+def catalog(db):
+    user = CustomUserOnlyFactory()
+    # shared, the factories pick category names at random from unique choices
+    sub_category = ComputerSubCategoryFactory()
+    category = sub_category.product_category
+    monitor = {
+        "user": user,
+        "Product_Category": category,
+        "Computer_SubCategory": sub_category,
+    }
+    book = {"user": user, "product_category": category}
+    return {
+        "monitor": MonitorsFactory(**monitor, is_active=True),
+        "inactive_monitor": MonitorsFactory(**monitor, is_active=False),
+        "book": BookFormatFactory(**book),
+        "inactive_book": BookFormatFactory(**book, is_active=False),
+    }
+
+
+def read_gzipped(path):
+    with open(path, "rb") as f:
+        return gzip.decompress(f.read()).decode()
+
+
+def test_build_sitemaps_writes_segments_and_index(catalog, sitemap_root):
+    counts = build_sitemaps.apply().get()
+
+    assert counts == {"written": 4, "unchanged": 0, "removed": 0}
+    index = read_gzipped(sitemap_root / INDEX_FILE_NAME)
+    for section in ("blog", "monitors", "books"):
+        assert f"https://example.com/sitemap-{section}-1.xml" in index
+    assert "<lastmod>" in index
+
+    monitors = read_gzipped(sitemap_root / segment_file_name("monitors", 1))
+    assert catalog["monitor"].get_absolute_url() in monitors
+    assert catalog["inactive_monitor"].get_absolute_url() not in monitors
+
+    books = read_gzipped(sitemap_root / segment_file_name("books", 1))
+    book, inactive_book = catalog["book"], catalog["inactive_book"]
+    assert f"/{book.book_author_name_id}/{book.id}/" in books
+    assert f"/{inactive_book.book_author_name_id}/{inactive_book.id}/" not in books
+    assert f"<lastmod>{book.updated_at.date().isoformat()}</lastmod>" in books
+
+
+def test_build_sitemaps_skips_unchanged_and_removes_stale_files(catalog, sitemap_root):
+    stale = sitemap_root / segment_file_name("monitors", 2)
+    stale.write_bytes(b"")
+    build_sitemaps.apply().get()
+    mtime = os.stat(sitemap_root / INDEX_FILE_NAME).st_mtime_ns
+
+    counts = build_sitemaps.apply().get()
+
+    assert counts == {"written": 0, "unchanged": 4, "removed": 0}
+    assert not stale.exists()
+    assert os.stat(sitemap_root / INDEX_FILE_NAME).st_mtime_ns == mtime
+
+
+def test_serve_sitemap_gzipped_with_validators(client, catalog):
+    build_sitemaps.apply().get()
+    url = reverse("sitemap_segment", kwargs={"section": "monitors", "page": 1})
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/xml"
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert (
+        catalog["monitor"].get_absolute_url()
+        in gzip.decompress(response.content).decode()
+    )
+
+    not_modified = client.get(
+        url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    not_modified = client.get(
+        url,
+        HTTP_ACCEPT_ENCODING="gzip",
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert not_modified.status_code == 304
+
+
+def test_serve_sitemap_plain_for_clients_without_gzip(client, catalog):
+    build_sitemaps.apply().get()
+
+    response = client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="identity")
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response
+    assert b"<sitemapindex" in response.content
+
+
+@override_settings(
+    SITEMAP_STORAGE={"BACKEND": "django.core.files.storage.InMemoryStorage"}
+)
+def test_sitemaps_served_from_the_configured_storage(client, catalog, sitemap_root):
+    build_sitemaps.apply().get()
+
+    assert list(sitemap_root.iterdir()) == []
+    response = client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.status_code == 200
+    # pre-rendered, the index rendered live is not gzipped
+    assert response["Content-Encoding"] == "gzip"
+    assert b"<sitemapindex" in gzip.decompress(response.content)
+
+
+def test_serve_sitemap_missing_files(client, catalog):
+    # rendered live until the first build
+    response = client.get("/sitemap.xml")
+    assert response.status_code == 200
+    assert catalog["monitor"].get_absolute_url().encode() in response.content
+
+    response = client.get(
+        reverse("sitemap_segment", kwargs={"section": "monitors", "page": 9})
+    )
+    assert response.status_code == 404
+    response = client.get("/sitemap-unknown-1.xml")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "migration, model",
+    [
+        ("i.migrations.0004_backfill_monitors_updated_at", Monitors),
+        ("book_.migrations.0004_backfill_bookformat_updated_at", BookFormat),
+    ],
+)
+def test_updated_at_backfilled_for_existing_rows(catalog, migration, model):
+    model.objects.update(updated_at=None)
+
+    import_module(migration).backfill_updated_at(apps, None)
+
+    assert not model.objects.filter(updated_at__isnull=True).exists()
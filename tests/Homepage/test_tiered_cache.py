@@ -0,0 +1,100 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache, caches
+
+from iii.tiered_cache import get_or_recompute
+
+
+@pytest.fixture
+def tiered():
+    return caches["tiered"]
+
+
+def test_reads_are_kept_in_the_local_tier(tiered):
+    tiered.set("key", {"value": 1})
+
+    with mock.patch.object(cache, "get") as shared_get:
+        assert tiered.get("key") == {"value": 1}
+    shared_get.assert_not_called()
+    assert cache.get("key") == {"value": 1}
+
+
+def test_local_copies_expire(tiered):
+    tiered.set("key", 1)
+    # another process changes the value
+    cache.set("key", 2)
+    assert tiered.get("key") == 1
+
+    with mock.patch(
+        "iii.tiered_cache.time.monotonic", return_value=time.monotonic() + 60
+    ):
+        assert tiered.get("key") == 2
+
+
+def test_delete_clears_both_tiers(tiered):
+    tiered.set_many({"a": 1, "b": 2})
+    tiered.delete("a")
+
+    assert tiered.get("a") is None
+    assert cache.get("a") is None
+    assert tiered.get_many(["a", "b"]) == {"b": 2}
+
+
+def test_values_are_not_shared_by_reference(tiered):
+    value = [1]
+    tiered.set("key", value)
+    value.append(2)
+    tiered.get("key").append(3)
+
+    assert tiered.get("key") == [1]
+
+
+def test_a_missing_value_is_computed_once(tiered):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "page"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(get_or_recompute("page", compute, 60))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["page"] * 8
+    assert len(calls) == 1
+
+
+def test_nested_recomputes_do_not_block_each_other(tiered):
+    # more nested keys than a striped set of locks would have
+    def compute(depth):
+        if depth == 40:
+            return depth
+        return get_or_recompute(f"key{depth + 1}", lambda: compute(depth + 1), 60)
+
+    assert get_or_recompute("key0", lambda: compute(0), 60) == 40
+
+
+def test_a_stale_value_is_served_while_it_is_recomputed(tiered):
+    get_or_recompute("page", lambda: "old", 60)
+    later = time.time() + 120
+
+    with mock.patch("iii.tiered_cache.time.time", return_value=later):
+        # another caller is recomputing it
+        cache.add("recompute_lock_page", 1)
+        assert get_or_recompute("page", lambda: "new", 60) == "old"
+        cache.delete("recompute_lock_page")
+
+        assert get_or_recompute("page", lambda: "new", 60) == "new"
+    assert get_or_recompute("page", lambda: "newer", 60) == "new"
@@ -1,8 +1,12 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection
 from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext
 
 from blog.models import Comment, Post
+from blog.post_stats import author_post_stats
 from tests.blog.test_blog_factory import CommentFactory, PostFactory
 from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
 
@@ -129,3 +133,124 @@ class Test_CommentModel:
 
         # Assertions
         assert not Comment.objects.filter(post=post).exists()
+
+
+@pytest.mark.django_db
+class Test_PostSlug:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def create_post(self, admin, title, slug=""):
+        return PostFactory(post_admin=admin, title=title, slug=slug)
+
+    def test_slug_from_title(self, create_admin_user):
+        post = self.create_post(create_admin_user, "Hello World")
+        assert post.slug == "hello-world"
+        assert Post.objects.get(slug="hello-world") == post
+
+    def test_numbered_slugs_for_same_base(self, create_admin_user):
+        slugs = [
+            self.create_post(create_admin_user, title).slug
+            for title in ("Hello World", "Hello, World!", "hello world?")
+        ]
+        assert slugs == ["hello-world", "hello-world-2", "hello-world-3"]
+
+    def test_slug_allocated_without_scanning_slugs(self, create_admin_user):
+        self.create_post(create_admin_user, "Hello World")
+        post = PostFactory.build(
+            post_admin=create_admin_user, title="Hello World!", slug=""
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+
+        assert post.slug == "hello-world-2"
+        statements = [q["sql"].split()[0] for q in queries]
+        assert statements.count("INSERT") == 1
+        assert "SELECT" not in statements
+
+    def test_counter_seeded_from_existing_slugs(self, create_admin_user):
+        self.create_post(create_admin_user, "Hello World")
+        self.create_post(create_admin_user, "Hello World 2", slug="hello-world-2")
+        cache.clear()
+
+        post = self.create_post(create_admin_user, "Hello World!")
+
+        assert post.slug == "hello-world-3"
+
+    def test_taken_slug_is_skipped(self, create_admin_user):
+        self.create_post(create_admin_user, "Hello World")
+        self.create_post(create_admin_user, "Other", slug="hello-world-2")
+
+        post = self.create_post(create_admin_user, "Hello World!")
+
+        assert post.slug == "hello-world-3"
+        assert Post.objects.get(slug="hello-world-2").title == "Other"
+
+    def test_other_integrity_errors_are_raised(self, create_admin_user):
+        self.create_post(create_admin_user, "Hello World")
+
+        with pytest.raises(IntegrityError):
+            self.create_post(create_admin_user, "Hello World")
+
+
+@pytest.mark.django_db
+class Test_AuthorPostStats:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_stats_in_one_query(self, create_admin_user, django_assert_num_queries):
+        PostFactory.create_batch(3, post_admin=create_admin_user, status=1)
+        PostFactory.create_batch(2, post_admin=create_admin_user, status=0)
+
+        with django_assert_num_queries(1):
+            stats = author_post_stats(create_admin_user.id)
+
+        assert stats == {"publish": 3, "draft": 2, "total": 5}
+
+    def test_stats_are_cached(self, create_admin_user, django_assert_num_queries):
+        PostFactory(post_admin=create_admin_user, status=1)
+        author_post_stats(create_admin_user.id)
+
+        with django_assert_num_queries(0):
+            assert author_post_stats(create_admin_user.id)["total"] == 1
+
+    def test_stats_invalidated_by_post_changes(
+        self, create_admin_user, django_capture_on_commit_callbacks
+    ):
+        post = PostFactory(post_admin=create_admin_user, status=0)
+        assert author_post_stats(create_admin_user.id)["draft"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.status = 1
+            post.save()
+        assert author_post_stats(create_admin_user.id) == {
+            "publish": 1,
+            "draft": 0,
+            "total": 1,
+        }
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert author_post_stats(create_admin_user.id)["total"] == 0
+
+    def test_stats_of_the_previous_author_invalidated(
+        self, create_admin_user, django_capture_on_commit_callbacks
+    ):
+        other_author = CustomUser.objects.create(username="other-author")
+        post = PostFactory(post_admin=create_admin_user, status=1)
+        assert author_post_stats(create_admin_user.id)["total"] == 1
+        assert author_post_stats(other_author.id)["total"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.post_admin = other_author
+            post.save()
+
+        assert author_post_stats(create_admin_user.id)["total"] == 0
+        assert author_post_stats(other_author.id)["total"] == 1
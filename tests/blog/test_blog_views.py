@@ -3,8 +3,10 @@ from unittest.mock import patch
 
 import pytest
 from django.contrib import messages
+from django.db import connection
 from django.template.exceptions import TemplateDoesNotExist
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.text import slugify
 from django_mock_queries.query import MockModel, MockSet
@@ -13,6 +15,7 @@ from pytest_mock import mocker
 
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.render_cache import POSTS_PER_PAGE
 from tests.blog.test_blog_factory import CommentFactory, PostFactory
 from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
 
@@ -34,18 +37,14 @@ def admin_user():
 
 
 @pytest.mark.django_db
-def test_post_list_view(mocker, client):
+def test_post_list_view(client):
     user = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
 
     client.force_login(user)
 
-    # Create a mock queryset
-    mock_post1 = MockModel(id=1, title="Post 1", status=1)
-    mock_post2 = MockModel(id=2, title="Post 2", status=1)
-    mock_qs = MockSet(mock_post1, mock_post2, model=Post)
-
-    # Patch the Post.objects.filter() to return our mock queryset
-    mocker.patch("blog.models.Post.objects.filter", return_value=mock_qs)
+    PostFactory(title="Post 2", post_admin=user, status=1)
+    PostFactory(title="Post 1", post_admin=user, status=1)
+    PostFactory(title="Draft", post_admin=user, status=0)
 
     response = client.get(reverse("blog:post_list"))
 
@@ -58,23 +57,54 @@ def test_post_list_view(mocker, client):
 
 
 @pytest.mark.django_db
-def test_my_posts_list_view_admin(mocker, client):
+def test_post_list_view_is_paginated(client, django_assert_num_queries):
+    user = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
+    PostFactory.create_batch(POSTS_PER_PAGE + 1, post_admin=user, status=1)
+
+    response = client.get(reverse("blog:post_list"))
+    assert len(response.context["blog_posts"]) == POSTS_PER_PAGE
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+    # the first page is served from the cache
+    with django_assert_num_queries(0):
+        response = client.get(reverse("blog:post_list"))
+    assert len(response.context["blog_posts"]) == POSTS_PER_PAGE
+    assert response.context["page_obj"].has_next()
+
+    response = client.get(reverse("blog:post_list"), {"page": 2})
+    assert len(response.context["blog_posts"]) == 1
+
+
+@pytest.mark.django_db
+def test_post_list_first_page_invalidated_on_save(
+    client, django_capture_on_commit_callbacks
+):
+    user = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
+    PostFactory(title="Post 1", post_admin=user, status=1)
+    client.get(reverse("blog:post_list"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PostFactory(title="Post 2", post_admin=user, status=1)
+    response = client.get(reverse("blog:post_list"))
+
+    assert [post.title for post in response.context["blog_posts"]] == [
+        "Post 2",
+        "Post 1",
+    ]
+
+
+@pytest.mark.django_db
+def test_my_posts_list_view_admin(client, django_assert_num_queries):
 
     admin_user = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
 
     client.force_login(admin_user)
 
-    # Create a mock queryset
-    mock_post1 = MockModel(
-        id=1, title="Post 1", status=1, post_admin=admin_user, created_on="2023-06-01"
-    )
-    mock_post2 = MockModel(
-        id=2, title="Post 2", status=1, post_admin=admin_user, created_on="2023-06-02"
-    )
-    mock_qs = MockSet(mock_post1, mock_post2, model=Post)
-
-    # Patch the Post.objects.filter() to return our mock queryset
-    mocker.patch("blog.models.Post.objects.filter", return_value=mock_qs)
+    post1 = PostFactory(title="Post 1", status=1, post_admin=admin_user)
+    post2 = PostFactory(title="Post 2", status=1, post_admin=admin_user)
+    PostFactory(title="Draft", status=0, post_admin=admin_user)
+    CommentFactory.create_batch(2, post=post1, comments_user=admin_user)
+    CommentFactory(post=post1, comments_user=admin_user, active=False)
 
     response = client.get(
         reverse("blog:my_posts_list")
@@ -82,11 +112,17 @@ def test_my_posts_list_view_admin(mocker, client):
 
     assert response.status_code == 200
     assert "posts" in response.context
-    assert len(response.context["posts"]) == 2
-    assert response.context["posts"][1].title == "Post 1"
-    assert response.context["posts"][0].title == "Post 2"
+    posts = response.context["posts"]
+    assert len(posts) == 2
+    assert posts[1].title == "Post 1"
+    assert posts[0].title == "Post 2"
+    assert [post.comment_count for post in posts] == [0, 2]
     assert "myposts.html" in [t.name for t in response.templates]
 
+    # posts, authors and comment counts come from a single query
+    with django_assert_num_queries(1):
+        list(response.context["posts"].all())
+
 
 @pytest.mark.parametrize(
     "user_type", ["SELLER", "CUSTOMER", "MANAGER", "CUSTOMER REPRESENTATIVE"]
@@ -623,40 +659,74 @@ def test_search_results_for_admin_my_post_view_context_data(
     assert response.context["search"] == get_post.title
     assert response.context["draft"] == draft
     assert response.context["publish"] == publish
+    assert response.context["total"] == publish + draft
 
 
 @pytest.mark.django_db
-def test_live_post_view_get_request(mocker, admin_user, client):
+def test_live_post_view_get_request(admin_user, client):
     client.force_login(admin_user)
 
-    # Create a mock post
-    mock_post = MockModel(id=1, slug="test-post", status=1)
-
-    # Create a mock set of comments
-    mock_comments = MockSet(
-        MockModel(id=1, post=mock_post, active=True),
-        MockModel(id=2, post=mock_post, active=True),
-    )
-
-    # Patch the get_object_or_404 and Comment.objects.filter methods
-    mocker.patch("blog.views.get_object_or_404", return_value=mock_post)
-    mocker.patch("blog.views.Comment.objects.filter", return_value=mock_comments)
+    post = PostFactory(post_admin=admin_user, status=1)
+    CommentFactory.create_batch(2, post=post, comments_user=admin_user)
+    CommentFactory(post=post, comments_user=admin_user, active=False)
 
     # Simulate a GET request to the live_post view
-    response = client.get(reverse("blog:live_post", kwargs={"slug": mock_post.slug}))
+    response = client.get(reverse("blog:live_post", kwargs={"slug": post.slug}))
 
     # Verify the response context
     assert response.status_code == 200
     assert "blog_post" in response.context
     assert "comments" in response.context
     assert "comment_form" in response.context
-    assert response.context["blog_post"] == mock_post
-    assert response.context["comments"].count() == len(mock_comments)
+    assert response.context["blog_post"] == post
+    assert response.context["comments"].count() == 2
 
     # Verify the correct template is used
     assert "live_post.html" in [template.name for template in response.templates]
 
 
+@pytest.mark.django_db
+def test_live_post_view_warm_cache(admin_user, client):
+    post = PostFactory(post_admin=admin_user, status=1)
+    comment = CommentFactory(post=post, comments_user=admin_user)
+    url = reverse("blog:live_post", kwargs={"slug": post.slug})
+    client.force_login(admin_user)
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert comment.body in response.content.decode()
+    assert not [
+        query["sql"]
+        for query in queries
+        if "blog_post" in query["sql"] or "blog_comment" in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_live_post_view_cache_invalidated_by_saves(
+    admin_user, client, django_capture_on_commit_callbacks
+):
+    post = PostFactory(post_admin=admin_user, status=1, content="Old content")
+    comment = CommentFactory(post=post, comments_user=admin_user, body="Old comment")
+    url = reverse("blog:live_post", kwargs={"slug": post.slug})
+    client.force_login(admin_user)
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.content = "New content"
+        post.save()
+        comment.body = "New comment"
+        comment.save()
+    response = client.get(url)
+
+    content = response.content.decode()
+    assert "New content" in content and "Old content" not in content
+    assert "New comment" in content and "Old comment" not in content
+
+
 @pytest.mark.django_db
 def test_live_post_view_post_request_valid_data(
     admin_user: CustomUserOnlyFactory, client: Client
@@ -27,7 +27,7 @@ def test_register_user(create_user):
     # Setup for test
     user = create_user()
 
-    with patch("requests.post") as mock_post:
+    with patch("cv_api.api_client.http_session.request") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 201
         mock_response.json.return_value = {
@@ -51,7 +51,7 @@ def test_register_user(create_user):
 def test_get_user(create_user):
     user = create_user()
 
-    with patch("requests.post") as mock_post:
+    with patch("cv_api.api_client.http_session.request") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"id": user.id}
@@ -67,7 +67,7 @@ def test_get_user(create_user):
 def test_get_tokens_for_user(create_user):
     user = create_user()
 
-    with patch("requests.post") as mock_post:
+    with patch("cv_api.api_client.http_session.request") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
@@ -84,7 +84,7 @@ def test_get_tokens_for_user(create_user):
 
 def test_get_new_access_token_for_user():
     refresh_token = "dummy_refresh_token"
-    with patch("requests.post") as mock_post:
+    with patch("cv_api.api_client.http_session.request") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"access": "new_access_token"}
@@ -98,7 +98,7 @@ def test_get_new_access_token_for_user():
 
 def test_verify_access_token_for_user():
     access_token = "dummy_access_token"
-    with patch("requests.post") as mock_post:
+    with patch("cv_api.api_client.http_session.request") as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_post.return_value = mock_response
@@ -0,0 +1,96 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from cv_api import api_client
+from cv_api.api_client import CVApiUnavailable, circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    circuit_breaker.reset()
+    with patch("cv_api.api_client.time.sleep"):
+        yield
+    circuit_breaker.reset()
+
+
+def make_response(status_code):
+    response = Mock()
+    response.status_code = status_code
+    return response
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_get_sends_token_and_timeout(mock_request):
+    mock_request.return_value = make_response(200)
+
+    response = api_client.get("resume/api/1/", "retrieve_cv", access_token="token")
+
+    assert response.status_code == 200
+    args, kwargs = mock_request.call_args
+    assert args == ("GET", api_client.cv_api_url("resume/api/1/"))
+    assert kwargs["headers"]["Authorization"] == "Bearer token"
+    assert kwargs["timeout"] == api_client.CV_API_TIMEOUT
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_get_retries_server_errors(mock_request):
+    mock_request.side_effect = [make_response(502), make_response(200)]
+
+    response = api_client.get("resume/api/1/", "retrieve_cv")
+
+    assert response.status_code == 200
+    assert mock_request.call_count == 2
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_post_is_not_retried_by_default(mock_request):
+    mock_request.return_value = make_response(503)
+
+    response = api_client.post("api/auth/crud-user/", "register_user", json={})
+
+    assert response.status_code == 503
+    assert mock_request.call_count == 1
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_connection_error_raised_after_retries(mock_request):
+    mock_request.side_effect = requests.exceptions.ConnectionError
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        api_client.get("resume/api/1/", "retrieve_cv")
+
+    assert mock_request.call_count == api_client.CV_API_MAX_RETRIES + 1
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_circuit_breaker_opens_after_failures(mock_request):
+    mock_request.return_value = make_response(500)
+
+    for _ in range(circuit_breaker.failure_threshold):
+        api_client.post("api/auth/crud-user/", "register_user", json={})
+
+    with pytest.raises(CVApiUnavailable):
+        api_client.get("resume/api/1/", "retrieve_cv")
+    assert mock_request.call_count == circuit_breaker.failure_threshold
+
+    # a trial call is let through after the reset timeout
+    circuit_breaker.opened_at -= circuit_breaker.reset_timeout
+    mock_request.return_value = make_response(200)
+    assert api_client.get("resume/api/1/", "retrieve_cv").status_code == 200
+    assert circuit_breaker.failures == 0
+
+
+def test_half_open_circuit_lets_a_single_trial_through():
+    for _ in range(circuit_breaker.failure_threshold):
+        circuit_breaker.record_failure()
+    circuit_breaker.opened_at -= circuit_breaker.reset_timeout
+
+    assert circuit_breaker.allow_request()
+    # concurrent callers wait for the trial
+    assert not circuit_breaker.allow_request()
+
+    # the trial failed, the circuit is open for another reset timeout
+    circuit_breaker.record_failure()
+    assert not circuit_breaker.allow_request()
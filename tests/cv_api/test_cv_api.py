@@ -1,13 +1,20 @@
+import hashlib
+import hmac
 import json
 import logging
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 import pytest
 from django.conf import settings
 from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
 from django.http.response import JsonResponse
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django_mock_queries.mocks import mocked_relations
 from django_mock_queries.query import MockSet
 from requests_mock import mock
@@ -23,7 +30,12 @@ from cv_api.forms import (
     PublicationForm,
     SkillAndSkillLevelForm,
 )
-from cv_api.models import PersonalInfo, TokensForUser
+from cv_api.models import CVWebhookEvent, PersonalInfo, TokensForUser
+from cv_api.tasks import (
+    process_cv_webhook_events,
+    process_pending_cv_webhook_events,
+)
+from cv_api.webhooks import COALESCE_DELAY
 from Homepage.models import UserProfile
 from tests.cv_api.cv_api_factory import (
     CustomUserOnlyFactory,
@@ -44,6 +56,14 @@ faker_logger = logging.getLogger("faker")
 faker_logger.setLevel(logging.WARNING)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # CV API tokens are cached per user id
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def client():
     return Client()
@@ -392,16 +412,13 @@ class Test_CVAPIPostrequest:
     @patch("cv_api.views.TokenUtils.register_user")
     @patch("cv_api.views.TokenUtils.get_tokens_for_user")
     @patch("cv_api.views.TokenUtils.verify_access_token_for_user")
-    @patch("cv_api.views.TokenUtils.get_new_access_token_for_user")
     def test_get_method(
         self,
-        mock_get_new_access_token_for_user,
         mock_verify_access_token_for_user,
         mock_get_tokens_for_user,
         mock_register_user,
         mock_get_user,
         client_logged_in,
-        token_instance,
     ):
         client, user = client_logged_in
         # Mock the external utility functions
@@ -411,20 +428,25 @@ class Test_CVAPIPostrequest:
             "access": "new_access_token",
             "refresh": "new_refresh_token",
         }
-        mock_verify_access_token_for_user.return_value = True
-        mock_get_new_access_token_for_user.return_value = "new_access_token"
 
         # Call the get method
         response = client.get(reverse("cv_api:cv_view"))
 
         # Assertions
         assert response.status_code == 200
-        token_instance.refresh_from_db()
+        token_instance = TokensForUser.objects.get(user=user)
         assert token_instance.access_token == "new_access_token"
         assert token_instance.refresh_token == "new_refresh_token"
 
         assert "cv.html" in [t.name for t in response.templates]
 
+        # the stored token is used on the next visit, without verifying it
+        response = client.get(reverse("cv_api:cv_view"))
+
+        assert response.status_code == 200
+        mock_get_tokens_for_user.assert_called_once()
+        mock_verify_access_token_for_user.assert_not_called()
+
 
 class Test_CVApiSubmitForm:
     @pytest.mark.django_db
@@ -485,7 +507,6 @@ class Test_CVApiSubmitForm:
                     mock_instance.assert_called_once_with(
                         user_id_for_personal_info=user,
                         api_user_id_for_cv=mock_user_data["id"],
-                        api_id_of_cv="9999999",
                     )
                     mock_get_user.assert_called_once_with(user)
 
@@ -505,7 +526,7 @@ class Test_ListOfCVForUser:
         )
         mock_personal_info_set = MockSet(mock_personal_info)
 
-        cv_data_response = {"cv": "data"}
+        cv_data_response = [{"id": 1, "name": "data"}]
 
         with patch(
             "cv_api.models.TokensForUser.objects.filter", return_value=mock_token_set
@@ -514,10 +535,11 @@ class Test_ListOfCVForUser:
                 "cv_api.models.PersonalInfo.objects.filter",
                 return_value=mock_personal_info_set,
             ):
-                with patch("requests.get") as mock_get:
+                with patch("cv_api.api_client.http_session.request") as mock_get:
                     mock_response = Mock()
                     mock_response.status_code = 200
-                    mock_get.json.return_value = cv_data_response
+                    mock_response.json.return_value = cv_data_response
+                    mock_get.return_value = mock_response
 
                     response = client.get(reverse("cv_api:list_of_cv_for_user"))
 
@@ -564,7 +586,7 @@ class Test_ListOfCVForUser:
             assert "cv_data" in response.context
             assert response.context["cv_data"] is None
 
-    @patch("requests.get")
+    @patch("cv_api.api_client.http_session.request")
     @patch("cv_api.models.PersonalInfo.objects.filter")
     @patch("cv_api.models.TokensForUser.objects.filter")
     @pytest.mark.django_db
@@ -628,7 +650,9 @@ class Test_DeleteCVForUser:
             return_value=mock_token_instance_set,
         ) as mock_tokens_for_user_filter:
 
-            with patch("requests.delete") as mock_requests_delete:
+            with patch(
+                "cv_api.api_client.http_session.request"
+            ) as mock_requests_delete:
                 mock_response = Mock()
                 mock_response.status_code = 204
                 mock_response.json.return_value = mock_response_json_data
@@ -698,7 +722,7 @@ class Test_DeleteCVForUser:
                     "Token not found for user." in str(message) for message in messages
                 )
 
-    @patch("cv_api.views.requests.delete")
+    @patch("cv_api.api_client.http_session.request")
     @pytest.mark.django_db
     def test_delete_cv_for_user_with_invalid_id(
         self, mock_delete_request, client, client_logged_in
@@ -749,165 +773,206 @@ class Test_DeleteCVForUser:
 @pytest.mark.django_db
 class Test_WebHookEvent:
 
-    @patch("json.loads")
-    def test_cv_created(self, mock_json_loads, client, mock_relations_personal_info):
-
-        # Create PersonalInfo instance for user
-        personal_info = PersonalInfoFactory.create()
-
-        # Mock the json data in webhook event
-        data = {
-            "event": "cv_created",
-            "id": personal_info.api_id_of_cv,
-            "user_id": personal_info.api_user_id_for_cv,
-            "status": "CREATED",
-        }
-        mock_json_loads.return_value = data
+    @pytest.fixture(autouse=True)
+    def webhook_secret(self, settings):
+        settings.CV_WEBHOOK_SECRET = "webhook-secret"
 
-        response = client.post(
+    def post_event(self, client, data, **extra):
+        body = json.dumps(data).encode()
+        extra.setdefault(
+            "HTTP_X_CV_SIGNATURE",
+            hmac.new(b"webhook-secret", body, hashlib.sha256).hexdigest(),
+        )
+        return client.post(
             reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
+            data=body,
             content_type="application/json",
+            **extra,
         )
 
-        assert response.status_code == 200
-        assert personal_info.api_id_of_cv == data["id"]
-        assert personal_info.status == "CREATED"
-        mock_json_loads.assert_called_once()
-
-    @patch("json.loads")
-    def test_cv_updated(self, mock_json_loads, client, mock_relations_personal_info):
-
-        # Create PersonalInfo instance for user
+    @patch("cv_api.views.process_cv_webhook_events.apply_async")
+    def test_event_is_recorded_and_processing_scheduled(
+        self, mock_apply_async, client, django_capture_on_commit_callbacks
+    ):
         personal_info = PersonalInfoFactory.create()
-
-        # Mock the json data in webhook event
         data = {
             "event": "cv_updated",
             "id": personal_info.api_id_of_cv,
             "user_id": personal_info.api_user_id_for_cv,
             "status": "UPDATED",
         }
-        mock_json_loads.return_value = data
 
-        response = client.post(
-            reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
-            content_type="application/json",
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.post_event(client, data)
 
         assert response.status_code == 200
-        assert personal_info.api_id_of_cv == data["id"]
-        assert personal_info.status == "UPDATED"
-        mock_json_loads.assert_called_once()
+        event = CVWebhookEvent.objects.get()
+        assert event.event == "cv_updated"
+        assert event.payload == data
+        assert event.processed_at is None
+        mock_apply_async.assert_called_once_with(
+            args=[personal_info.api_id_of_cv], countdown=COALESCE_DELAY
+        )
+        # processing is left to the task
+        personal_info.refresh_from_db()
+        assert personal_info.status == "Active"
 
-    @patch("json.loads")
-    def test_cv_deleted(
-        self,
-        mock_json_loads,
-        mock_personalinfo_delete,
-        client_logged_in,
+    @patch("cv_api.views.process_cv_webhook_events.apply_async")
+    def test_burst_of_events_schedules_one_task(
+        self, mock_apply_async, client, django_capture_on_commit_callbacks
     ):
-        client, user = client_logged_in
-
-        personal_info = PersonalInfoFactory(user_id_for_personal_info=user)
-
-        # # Mock the json data in webhook event
+        personal_info = PersonalInfoFactory.create()
         data = {
-            "event": "cv_deleted",
+            "event": "cv_updated",
             "id": personal_info.api_id_of_cv,
             "user_id": personal_info.api_user_id_for_cv,
-            "status": "DELETED",
+            "status": "UPDATED",
         }
 
-        mock_json_loads.return_value = data
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(3):
+                assert self.post_event(client, data).status_code == 200
 
-        response = client.post(
-            reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
-            content_type="application/json",
-        )
-
-        assert response.status_code == 200
-        mock_json_loads.assert_called_once()
-        mock_personalinfo_delete.assert_called_once()
+        assert CVWebhookEvent.objects.count() == 3
+        mock_apply_async.assert_called_once()
 
-    @patch("json.loads")
-    def test_cv_deletion_failed(
-        self, mock_json_loads, client, mock_relations_personal_info
-    ):
-        # Create PersonalInfo instance for user
+    @patch("cv_api.views.process_cv_webhook_events.apply_async")
+    def test_invalid_event_type(self, mock_apply_async, client):
         personal_info = PersonalInfoFactory.create()
-
-        # Mock the json data in webhook event
         data = {
-            "event": "cv_deletion_failed",
+            "event": "invalid_event",
             "id": personal_info.api_id_of_cv,
             "user_id": personal_info.api_user_id_for_cv,
             "status": "FAILED",
         }
-        mock_json_loads.return_value = data
 
-        response = client.post(
-            reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
-            content_type="application/json",
-        )
+        response = self.post_event(client, data)
+
+        assert response.status_code == 400
+        assert isinstance(response, JsonResponse)
+        assert not CVWebhookEvent.objects.exists()
+        mock_apply_async.assert_not_called()
+
+    def test_malformed_event(self, client):
+        response = self.post_event(client, {"event": "cv_updated"})
+
+        assert response.status_code == 400
+        assert not CVWebhookEvent.objects.exists()
+
+    @patch("cv_api.views.process_cv_webhook_events.apply_async")
+    def test_signature_is_verified(self, mock_apply_async, client):
+        data = {"event": "cv_updated", "id": 1, "user_id": 2, "status": "UPDATED"}
 
+        response = self.post_event(client, data, HTTP_X_CV_SIGNATURE="invalid")
+        assert response.status_code == 403
+        assert not CVWebhookEvent.objects.exists()
+
+        response = self.post_event(client, data)
         assert response.status_code == 200
-        mock_json_loads.assert_called_once()
-        assert personal_info.status == "FAILED"
+        assert CVWebhookEvent.objects.exists()
 
-    @patch("json.loads")
-    def test_cv_update_failed(
-        self, mock_json_loads, client, mock_relations_personal_info
+    @patch("cv_api.views.process_cv_webhook_events.apply_async")
+    def test_unsigned_events_refused_without_a_secret(
+        self, mock_apply_async, client, settings
     ):
-        # Create PersonalInfo instance for user
+        data = {"event": "cv_updated", "id": 1, "user_id": 2, "status": "UPDATED"}
+
+        settings.CV_WEBHOOK_SECRET = ""
+        settings.CV_WEBHOOK_ALLOW_UNSIGNED = True
+        # DEBUG is off
+        assert self.post_event(client, data).status_code == 403
+        assert not CVWebhookEvent.objects.exists()
+
+        settings.DEBUG = True
+        assert self.post_event(client, data).status_code == 200
+        assert CVWebhookEvent.objects.exists()
+
+
+@pytest.mark.django_db
+class Test_ProcessCVWebhookEvents:
+
+    def record(self, personal_info, event, status=""):
+        return CVWebhookEvent.objects.create(
+            api_id_of_cv=personal_info.api_id_of_cv,
+            api_user_id_for_cv=personal_info.api_user_id_for_cv,
+            event=event,
+            status=status,
+            payload={},
+        )
+
+    @pytest.mark.parametrize(
+        "event, status",
+        [
+            ("cv_updated", "UPDATED"),
+            ("cv_update_failed", "FAILED"),
+            ("cv_deletion_failed", "FAILED"),
+        ],
+    )
+    def test_status_is_updated(self, event, status):
         personal_info = PersonalInfoFactory.create()
+        self.record(personal_info, event, status)
 
-        # Mock the json data in webhook event
-        data = {
-            "event": "cv_update_failed",
-            "id": personal_info.api_id_of_cv,
-            "user_id": personal_info.api_user_id_for_cv,
-            "status": "FAILED",
-        }
-        mock_json_loads.return_value = data
+        assert (
+            process_cv_webhook_events.apply(args=[personal_info.api_id_of_cv]).get()
+            == 1
+        )
 
-        response = client.post(
-            reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
-            content_type="application/json",
+        personal_info.refresh_from_db()
+        assert personal_info.status == status
+        assert not CVWebhookEvent.objects.filter(processed_at__isnull=True).exists()
+
+    def test_cv_created_links_the_unlinked_cv(self):
+        personal_info = PersonalInfoFactory.create(api_id_of_cv=None)
+        event = CVWebhookEvent.objects.create(
+            api_id_of_cv=4321,
+            api_user_id_for_cv=personal_info.api_user_id_for_cv,
+            event="cv_created",
+            status="CREATED",
+            payload={},
         )
 
-        assert response.status_code == 200
-        mock_json_loads.assert_called_once()
-        assert personal_info.status == "FAILED"
+        process_cv_webhook_events.apply(args=[event.api_id_of_cv]).get()
+
+        personal_info.refresh_from_db()
+        assert personal_info.api_id_of_cv == 4321
+        assert personal_info.status == "CREATED"
 
-    @patch("json.loads")
-    def test_invalid_event_type(self, mock_json_loads, client):
-        # Create PersonalInfo instance for user
+    def test_cv_deleted(self):
         personal_info = PersonalInfoFactory.create()
+        self.record(personal_info, "cv_deleted", "DELETED")
 
-        # Mock the json data in webhook event
-        data = {
-            "event": "invalid_event",
-            "id": personal_info.api_id_of_cv,
-            "user_id": personal_info.api_user_id_for_cv,
-            "status": "FAILED",
-        }
-        mock_json_loads.return_value = data
+        process_cv_webhook_events.apply(args=[personal_info.api_id_of_cv]).get()
 
-        response = client.post(
-            reverse("cv_api:cv-webhook"),
-            data=json.dumps(data),
-            content_type="application/json",
+        assert not PersonalInfo.objects.filter(pk=personal_info.pk).exists()
+
+    def test_events_are_coalesced(self):
+        personal_info = PersonalInfoFactory.create()
+        self.record(personal_info, "cv_updated", "UPDATED")
+        self.record(personal_info, "cv_update_failed", "FAILED")
+        self.record(personal_info, "cv_updated", "UPDATED")
+
+        with CaptureQueriesContext(connection) as queries:
+            applied = process_cv_webhook_events.apply(
+                args=[personal_info.api_id_of_cv]
+            ).get()
+
+        assert applied == 3
+        personal_info.refresh_from_db()
+        assert personal_info.status == "UPDATED"
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 2  # PersonalInfo and the events
+
+    def test_pending_events_are_swept(self):
+        personal_info = PersonalInfoFactory.create()
+        event = self.record(personal_info, "cv_updated", "UPDATED")
+        CVWebhookEvent.objects.filter(pk=event.pk).update(
+            received_at=timezone.now() - timedelta(minutes=5)
         )
 
-        assert response.status_code == 400
-        mock_json_loads.assert_called_once()
-        # Check if the response is an instance of JsonResponse
-        assert isinstance(response, JsonResponse)
+        assert process_pending_cv_webhook_events.apply().get() == 1
+
+        personal_info.refresh_from_db()
+        assert personal_info.status == "UPDATED"
 
 
 @pytest.mark.django_db
@@ -954,7 +1019,7 @@ class Test_RetrieveCVDataToUpdate:
             "cv_api.views.RetrieveCVDataToUpdate.get_token_from_database",
             return_value="test_access_token",
         ):
-            with patch("requests.get") as mock_get:
+            with patch("cv_api.api_client.http_session.request") as mock_get:
                 mock_get.return_value.status_code = 404
 
                 response = client.get(
@@ -987,7 +1052,7 @@ class Test_RetrieveCVDataToUpdate:
             return_value="test_access_token",
         ) as mock_tokens:
 
-            with patch("requests.get") as mock_get:
+            with patch("cv_api.api_client.http_session.request") as mock_get:
                 mock_get.return_value.status_code = 200
                 mock_get.return_value.json.return_value = data
 
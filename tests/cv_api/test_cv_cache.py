@@ -0,0 +1,126 @@
+import hashlib
+import hmac
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from django.urls import reverse
+
+from cv_api.cv_cache import (
+    document_version,
+    get_cv_document,
+    get_cv_list,
+    invalidate_cv,
+    set_cv_document,
+    set_cv_list,
+)
+from cv_api.views import ListOfCVForUser, RetrieveCVDataToUpdate
+from tests.cv_api.cv_api_factory import CustomUserOnlyFactory, PersonalInfoFactory
+
+
+def make_response(status_code, data):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = data
+    return response
+
+
+@patch("cv_api.api_client.http_session.request")
+def test_cv_list_fetched_once(mock_request):
+    cv_list = [{"id": 1, "name": "Resume"}]
+    mock_request.return_value = make_response(200, cv_list)
+
+    view = ListOfCVForUser()
+    assert view.fetch_cv_list("12345", "access_token") == cv_list
+    assert view.fetch_cv_list("12345", "access_token") == cv_list
+
+    mock_request.assert_called_once()
+    assert get_cv_list("12345") == cv_list
+
+
+@pytest.mark.django_db
+@patch("cv_api.api_client.http_session.request")
+def test_cv_document_fetched_once(mock_request):
+    personal_info = PersonalInfoFactory.create()
+    owner = personal_info.user_id_for_personal_info
+    document = {"id": personal_info.api_id_of_cv, "name": "Resume"}
+    mock_request.return_value = make_response(200, document)
+
+    view = RetrieveCVDataToUpdate()
+    for _ in range(2):
+        assert (
+            view.fetch_cv_document(owner, personal_info.api_id_of_cv, "access_token")
+            == document
+        )
+
+    mock_request.assert_called_once()
+    assert get_cv_document(personal_info.api_id_of_cv) == document
+
+
+@pytest.mark.django_db
+@patch("cv_api.api_client.http_session.request")
+def test_cached_cv_document_not_served_to_other_users(mock_request):
+    personal_info = PersonalInfoFactory.create()
+    set_cv_document(personal_info.api_id_of_cv, {"id": personal_info.api_id_of_cv})
+    other_user = CustomUserOnlyFactory.create()
+    # the CV API refuses the token of another user
+    mock_request.return_value = make_response(403, {})
+
+    assert (
+        RetrieveCVDataToUpdate().fetch_cv_document(
+            other_user, personal_info.api_id_of_cv, "access_token"
+        )
+        is None
+    )
+    mock_request.assert_called_once()
+
+
+def test_document_fetched_before_an_invalidation_is_not_served():
+    version = document_version(7)
+    # the webhook of an update arrives while the old document is fetched
+    invalidate_cv(7, 12345)
+    set_cv_document(7, {"id": 7, "name": "Old"}, version)
+
+    assert get_cv_document(7) is None
+    set_cv_document(7, {"id": 7, "name": "New"})
+    assert get_cv_document(7) == {"id": 7, "name": "New"}
+
+
+@pytest.mark.django_db
+@patch("cv_api.api_client.http_session.request")
+def test_missing_cv_document_not_cached(mock_request):
+    mock_request.return_value = make_response(404, {})
+    personal_info = PersonalInfoFactory.create()
+    owner = personal_info.user_id_for_personal_info
+
+    assert RetrieveCVDataToUpdate().fetch_cv_document(owner, 7, "access_token") is None
+    assert get_cv_document(7) is None
+
+
+@pytest.mark.django_db
+def test_webhook_invalidates_cached_cv(client, settings):
+    settings.CV_WEBHOOK_SECRET = "webhook-secret"
+    personal_info = PersonalInfoFactory.create()
+    set_cv_document(personal_info.api_id_of_cv, {"id": personal_info.api_id_of_cv})
+    set_cv_list(personal_info.api_user_id_for_cv, [{"id": personal_info.api_id_of_cv}])
+    body = json.dumps(
+        {
+            "event": "cv_updated",
+            "id": personal_info.api_id_of_cv,
+            "user_id": personal_info.api_user_id_for_cv,
+            "status": "UPDATED",
+        }
+    ).encode()
+
+    response = client.post(
+        reverse("cv_api:cv-webhook"),
+        data=body,
+        content_type="application/json",
+        HTTP_X_CV_SIGNATURE=hmac.new(
+            b"webhook-secret", body, hashlib.sha256
+        ).hexdigest(),
+    )
+
+    assert response.status_code == 200
+    assert get_cv_document(personal_info.api_id_of_cv) is None
+    assert get_cv_list(personal_info.api_user_id_for_cv) is None
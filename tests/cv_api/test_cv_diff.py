@@ -0,0 +1,74 @@
+from cv_api.cv_diff import merge_patch
+
+DOCUMENT = {
+    "id": 7,
+    "status": "CREATED",
+    "name": "John",
+    "overview": {"id": 3, "overview": "Python developer"},
+    "job": {
+        "id": 4,
+        "company_name": "ACME",
+        "accomplishment": {"id": 5, "job_accomplishment": "Shipped"},
+    },
+    "skill": [
+        {"id": 8, "skill_name": "Python", "level": "Advanced"},
+        {"id": 9, "skill_name": "Django", "level": "Advanced"},
+    ],
+}
+
+SUBMITTED = {
+    "name": "John",
+    "overview": {"overview": "Python developer"},
+    "job": {
+        "company_name": "ACME",
+        "accomplishment": {"job_accomplishment": "Shipped"},
+    },
+    "skill": [
+        {"skill_name": "Python", "level": "Advanced"},
+        {"skill_name": "Django", "level": "Advanced"},
+    ],
+}
+
+
+def submitted(**changes):
+    return {**SUBMITTED, **changes}
+
+
+def test_unchanged_document_gives_empty_patch():
+    assert merge_patch(DOCUMENT, SUBMITTED) == {}
+
+
+def test_changed_field():
+    assert merge_patch(DOCUMENT, submitted(name="Jane")) == {"name": "Jane"}
+
+
+def test_changed_nested_field():
+    job = {
+        "company_name": "ACME",
+        "accomplishment": {"job_accomplishment": "Shipped twice"},
+    }
+
+    patch = merge_patch(DOCUMENT, submitted(job=job))
+
+    assert patch == {"job": {"accomplishment": {"job_accomplishment": "Shipped twice"}}}
+
+
+def test_changed_list_item_sends_whole_list():
+    skill = [
+        {"skill_name": "Python", "level": "Expert"},
+        {"skill_name": "Django", "level": "Advanced"},
+    ]
+
+    assert merge_patch(DOCUMENT, submitted(skill=skill)) == {"skill": skill}
+
+
+def test_removed_list_item_sends_whole_list():
+    skill = [{"skill_name": "Python", "level": "Advanced"}]
+
+    assert merge_patch(DOCUMENT, submitted(skill=skill)) == {"skill": skill}
+
+
+def test_new_field_is_sent():
+    assert merge_patch(DOCUMENT, submitted(email="john@example.com")) == {
+        "email": "john@example.com"
+    }
@@ -0,0 +1,138 @@
+import json
+from itertools import count
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connections
+
+from cv_api.cv_transfer import bounded_map, cv_export_queryset, serialize_cv
+from cv_api.models import PersonalInfo
+from tests.cv_api.cv_api_factory import (EducationFactory,
+                                         JobAccomplishmentFactory,
+                                         OverviewFactory, PersonalInfoFactory,
+                                         ProjectsFactory,
+                                         SkillAndSkillLevelFactory)
+
+
+@pytest.fixture
+def cvs():
+    personal_infos = PersonalInfoFactory.create_batch(2)
+    for personal_info in personal_infos:
+        OverviewFactory.create(personal_info=personal_info)
+        EducationFactory.create_batch(2, personal_info=personal_info)
+        JobAccomplishmentFactory.create(job__personal_info_job=personal_info)
+        SkillAndSkillLevelFactory.create(personal_info=personal_info)
+        ProjectsFactory.create(personal_info=personal_info, long_description="")
+    return personal_infos
+
+
+def export_to(tmp_path, *args):
+    path = tmp_path / "cvs.ndjson"
+    call_command("export_cvs", "--output", str(path), *args)
+    return path
+
+
+@pytest.mark.django_db
+def test_export_writes_one_line_per_cv(tmp_path, cvs):
+    path = export_to(tmp_path)
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+
+    assert [document["first_name"] for document in documents] == [
+        personal_info.first_name for personal_info in cvs
+    ]
+    assert len(documents[0]["education"]) == 2
+    assert documents[0]["job"]["accomplishment"]["job_accomplishment"]
+    assert documents[0]["user"] == cvs[0].user_id_for_personal_info_id
+
+
+@pytest.mark.django_db
+def test_import_recreates_exported_cvs(tmp_path, cvs):
+    path = export_to(tmp_path)
+    exported = path.read_text().splitlines()
+
+    call_command("import_cvs", str(path), "--chunk-size", "1")
+
+    assert PersonalInfo.objects.count() == 4
+    imported = cv_export_queryset().order_by("id")[2:]
+    assert [
+        json.loads(json.dumps(serialize_cv(cv), default=str)) for cv in imported
+    ] == [json.loads(line) for line in exported]
+
+
+@pytest.mark.django_db
+def test_import_fills_long_description_of_projects(tmp_path, cvs):
+    path = export_to(tmp_path)
+
+    call_command("import_cvs", str(path))
+
+    project = PersonalInfo.objects.order_by("id").last().projects.get()
+    assert project.long_description == project.short_description
+
+
+@pytest.mark.django_db
+def test_import_rejects_invalid_json(tmp_path):
+    path = tmp_path / "cvs.ndjson"
+    path.write_text('{"first_name": "John"}\nnot json\n')
+
+    with pytest.raises(CommandError, match="line 2"):
+        call_command("import_cvs", str(path))
+
+
+@pytest.mark.django_db
+@patch("cv_api.cv_transfer.get_access_token", return_value="access_token")
+@patch("cv_api.api_client.http_session.request")
+def test_import_sync_updates_remote_cvs(mock_request, mock_token, tmp_path, cvs):
+    mock_request.return_value = Mock(status_code=200)
+    path = export_to(tmp_path)
+
+    call_command("import_cvs", str(path), "--sync")
+
+    assert mock_request.call_count == 2
+    method, url = mock_request.call_args.args
+    assert method == "PATCH"
+    assert f"id={cvs[1].api_id_of_cv}" in url
+    assert "user" not in json.loads(mock_request.call_args.kwargs["data"])
+
+
+@pytest.mark.django_db
+@patch("cv_api.cv_transfer.get_access_token", return_value="access_token")
+@patch("cv_api.api_client.http_session.request")
+def test_export_remote_uses_cv_api_documents(mock_request, mock_token, tmp_path, cvs):
+    mock_request.return_value = Mock(status_code=200)
+    mock_request.return_value.json.return_value = {"first_name": "Remote"}
+
+    path = export_to(tmp_path, "--remote")
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [document["first_name"] for document in documents] == ["Remote", "Remote"]
+    assert documents[0]["user"] == cvs[0].user_id_for_personal_info_id
+
+
+def test_bounded_map_keeps_order_and_bounds_pending_items():
+    consumed = count()
+
+    def items():
+        for item in range(20):
+            next(consumed)
+            yield item
+
+    results = bounded_map(lambda item: item * 2, items(), max_workers=2)
+
+    assert next(results) == 0
+    # the first result is yielded once 2 * max_workers items are pending
+    assert next(consumed) == 4
+    assert list(results) == [item * 2 for item in range(1, 20)]
+
+
+@pytest.mark.django_db
+def test_bounded_map_closes_one_connection_per_thread():
+    def query(item):
+        return PersonalInfo.objects.filter(pk=item).exists()
+
+    with patch.object(type(connections["default"]), "close", autospec=True) as close:
+        assert list(bounded_map(query, range(20), max_workers=2)) == [False] * 20
+
+    # once per pool thread, not once per item
+    assert 1 <= close.call_count <= 2
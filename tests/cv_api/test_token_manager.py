@@ -0,0 +1,130 @@
+import base64
+import json
+import logging
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from cv_api.models import TokensForUser
+from cv_api.tasks import refresh_expiring_cv_api_tokens
+from cv_api.token_manager import (
+    get_access_token,
+    get_token_expiry,
+    refresh_access_token,
+)
+from tests.cv_api.cv_api_factory import CustomUserOnlyFactory
+
+# Disable Faker DEBUG logging
+faker_logger = logging.getLogger("faker")
+faker_logger.setLevel(logging.WARNING)
+
+
+def make_jwt(expires_in):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    payload = {"exp": int(time.time()) + expires_in, "jti": time.perf_counter()}
+    return f"{encode({'alg': 'HS256'})}.{encode(payload)}.signature"
+
+
+@pytest.fixture
+def user_with_tokens():
+    def _user_with_tokens(access_token):
+        user = CustomUserOnlyFactory(last_login=timezone.now())
+        TokensForUser.objects.create(
+            user=user, access_token=access_token, refresh_token="refresh_token"
+        )
+        return user
+
+    return _user_with_tokens
+
+
+def test_get_token_expiry():
+    token = make_jwt(600)
+    exp = json.loads(base64.urlsafe_b64decode(token.split(".")[1] + "=="))["exp"]
+
+    assert get_token_expiry(token) == exp
+    assert get_token_expiry("opaque_token") is None
+
+
+@pytest.mark.django_db
+def test_valid_token_served_from_cache(user_with_tokens, django_assert_num_queries):
+    access_token = make_jwt(600)
+    user = user_with_tokens(access_token)
+
+    assert get_access_token(user.id) == access_token
+    with django_assert_num_queries(0):
+        assert get_access_token(user.id) == access_token
+
+
+@pytest.mark.django_db
+@patch("cv_api.token_manager.TokenUtils.get_new_access_token_for_user")
+def test_expiring_token_refreshed(mock_refresh, user_with_tokens):
+    new_access_token = make_jwt(600)
+    mock_refresh.return_value = new_access_token
+    user = user_with_tokens(make_jwt(10))
+
+    assert get_access_token(user.id) == new_access_token
+    mock_refresh.assert_called_once_with("refresh_token")
+    assert TokensForUser.objects.get(user=user).access_token == new_access_token
+
+
+@pytest.mark.django_db
+@patch("cv_api.token_manager.TokenUtils.get_new_access_token_for_user")
+def test_refresh_single_flight_across_processes(mock_refresh, user_with_tokens):
+    access_token = make_jwt(10)
+    user = user_with_tokens(access_token)
+
+    # another process holds the refresh lock and does not finish in time
+    cache.add(f"cv_api_token_refresh_{user.id}", 1)
+    with patch("cv_api.token_manager.REFRESH_WAIT_TIMEOUT", 0.2):
+        assert refresh_access_token(user.id) == access_token
+
+    mock_refresh.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("cv_api.token_manager.TokenUtils.get_new_access_token_for_user")
+def test_refresh_not_held_up_by_other_users(mock_refresh, user_with_tokens):
+    new_access_token = make_jwt(600)
+    mock_refresh.return_value = new_access_token
+    user = user_with_tokens(make_jwt(10))
+    other_user = user_with_tokens(make_jwt(10))
+
+    # the refresh of the other user is waiting on a slow CV API
+    cache.add(f"cv_api_token_refresh_{other_user.id}", 1)
+
+    assert refresh_access_token(user.id) == new_access_token
+    mock_refresh.assert_called_once()
+
+
+@pytest.mark.django_db
+@patch("cv_api.token_manager.TokenUtils.get_tokens_for_user")
+@patch("cv_api.token_manager.TokenUtils.get_new_access_token_for_user")
+def test_beat_task_refreshes_expiring_tokens(
+    mock_refresh, mock_get_tokens, user_with_tokens
+):
+    fresh_token = make_jwt(3600)
+    user_with_tokens(fresh_token)
+    expiring_user = user_with_tokens(make_jwt(120))
+    # left to the refresh on the request path
+    user_with_tokens(make_jwt(-60))
+    dormant_user = user_with_tokens(make_jwt(120))
+    dormant_user.last_login = timezone.now() - timedelta(days=30)
+    dormant_user.save()
+
+    # refresh token expired, a new pair of tokens is obtained
+    mock_refresh.return_value = {"json_response": {}, "status": 401}
+    new_tokens = {"access": make_jwt(3600), "refresh": "new_refresh_token"}
+    mock_get_tokens.return_value = new_tokens
+
+    assert refresh_expiring_cv_api_tokens.apply().get() == 1
+
+    mock_get_tokens.assert_called_once_with(expiring_user.id)
+    token_instance = TokensForUser.objects.get(user=expiring_user)
+    assert token_instance.access_token == new_tokens["access"]
+    assert token_instance.refresh_token == "new_refresh_token"
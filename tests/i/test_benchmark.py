@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from i.benchmark import (
+    STEPS,
+    BenchmarkResults,
+    external_stubs,
+    format_summary,
+    percentile,
+    run_benchmark,
+    seed_benchmark_data,
+    write_summary,
+)
+from i.models import Monitors, Review
+
+
+def test_percentile_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) is None
+
+
+def test_summary_and_report(tmp_path):
+    results = BenchmarkResults()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        results.record("browse", seconds, ok=True)
+    results.record("checkout", 0.5, ok=False)
+    results.elapsed = 2.0
+
+    summary = results.summary()
+
+    assert list(summary["steps"]) == list(STEPS)
+    assert summary["steps"]["browse"] == {
+        "requests": 4,
+        "errors": 0,
+        "rps": 2.0,
+        "p50": 0.2,
+        "p95": 0.4,
+        "p99": 0.4,
+    }
+    assert summary["steps"]["checkout"]["errors"] == 1
+    assert summary["steps"]["filter"]["p50"] is None
+
+    report = format_summary(summary)
+    assert "browse" in report and "200.0" in report
+
+    path = tmp_path / "results.json"
+    write_summary(path, summary, journeys=4)
+    assert json.loads(path.read_text())["config"] == {"journeys": 4}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_journeys_run_against_seeded_data():
+    data = seed_benchmark_data(monitors=5, users=1)
+    assert Monitors.objects.count() == 5
+    assert len(data["monitor_ids"]) == 5
+
+    with external_stubs():
+        results = run_benchmark(data, journeys=2, concurrency=1, seed=1)
+
+    summary = results.summary()
+    for step in STEPS:
+        assert summary["steps"][step]["requests"] == 2
+        assert summary["steps"][step]["errors"] == 0
+    assert Review.objects.exists()
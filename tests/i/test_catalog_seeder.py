@@ -0,0 +1,93 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.models import Comment, Post
+from book_.models import BookAuthorName, BookFormat, Rating
+from book_.models import Review as BookReview
+from cart.models import Cart, CartItem
+from Homepage.models import CustomUser, UserProfile
+from i.catalog_seeder import seed_catalog
+from i.models import Monitors
+from i.models import Review as MonitorReview
+
+COUNTS = {
+    "users": 60,
+    "monitors": 25,
+    "books": 10,
+    "reviews": 40,
+    "ratings": 20,
+    "carts": 8,
+    "posts": 6,
+}
+
+
+@pytest.fixture
+def debug(settings):
+    settings.DEBUG = True
+
+
+@pytest.mark.django_db
+def test_seed_catalog_in_chunks(debug):
+    seeded = seed_catalog(COUNTS, chunk_size=7, seed=1)
+
+    assert seeded == COUNTS
+    assert CustomUser.objects.count() == 60
+    assert UserProfile.objects.count() == 60
+    assert Monitors.objects.count() == 25
+    assert Monitors.special_features.through.objects.exists()
+    assert BookAuthorName.objects.count() == 10
+    assert BookFormat.objects.count() >= 10
+    assert MonitorReview.objects.count() + BookReview.objects.count() == 40
+    assert Rating.objects.count() == 20
+    assert Cart.objects.count() == 8
+    assert CartItem.objects.filter(cart__in=Cart.objects.all()).count() >= 8
+    assert Post.objects.filter(status=1).count() == 6
+    assert Comment.objects.filter(post__in=Post.objects.all()).count() <= 30
+    assert CustomUser.objects.filter(user_type="SELLER").exists()
+
+
+@pytest.mark.django_db
+def test_seeding_again_continues_the_numbering(debug):
+    seed_catalog({"users": 3, "posts": 2}, seed=1)
+    seed_catalog({"users": 3, "posts": 2}, seed=1)
+
+    assert CustomUser.objects.filter(username="seed-user-5").exists()
+    assert Post.objects.filter(slug="seed-post-3").exists()
+
+
+@pytest.mark.django_db
+def test_seeding_products_needs_sellers():
+    with pytest.raises(CommandError, match="no sellers"):
+        call_command("seed_catalog", monitors=5)
+
+
+@pytest.mark.django_db
+def test_a_user_reviews_and_rates_a_product_once(debug):
+    counts = {"users": 12, "monitors": 2, "books": 2}
+    seed_catalog(counts, seed=1)
+    book_formats = BookFormat.objects.count()
+    # every pair but one, in small chunks, then again past the last pair
+    seed_catalog({"ratings": 12 * book_formats - 1}, chunk_size=3, seed=1)
+    seed_catalog({"ratings": 2}, seed=2)
+    seed_catalog({"reviews": 12 * (2 + book_formats)}, chunk_size=3, seed=1)
+
+    ratings = list(Rating.objects.values_list("user_id", "book_format_id"))
+    assert len(ratings) == len(set(ratings)) == 12 * book_formats
+    monitor_reviews = list(MonitorReview.objects.values_list("user_id", "product_id"))
+    assert len(monitor_reviews) == len(set(monitor_reviews)) == 12 * 2
+    book_reviews = list(BookReview.objects.values_list("user_id", "book_format_id"))
+    assert len(book_reviews) == len(set(book_reviews)) == 12 * book_formats
+
+    with pytest.raises(ValueError, match="user and product pairs"):
+        seed_catalog({"ratings": 12 * book_formats + 1})
+
+
+@pytest.mark.django_db
+def test_seeding_users_needs_debug_or_allow_production(settings):
+    settings.DEBUG = False
+    with pytest.raises(CommandError, match="known password"):
+        call_command("seed_catalog", users=2)
+    assert not CustomUser.objects.exists()
+
+    call_command("seed_catalog", users=2, allow_production=True)
+    assert CustomUser.objects.count() == 2
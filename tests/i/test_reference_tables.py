@@ -0,0 +1,74 @@
+import pytest
+
+from i import reference_tables
+from i.filters import MonitorsFilter
+from i.models import ComputerSubCategory, ProductCategory, Special_Features
+from i.reference_tables import (
+    computer_sub_category,
+    product_category,
+    special_features_by_id,
+)
+
+
+@pytest.fixture
+def tables(db):
+    computer = ProductCategory.objects.create(name="COMPUTER")
+    monitors = ComputerSubCategory.objects.create(
+        name="MONITORS", product_category=computer
+    )
+    curved = Special_Features.objects.get_or_create(name="curved")[0]
+    frameless = Special_Features.objects.get_or_create(name="frameless")[0]
+    return {
+        "computer": computer,
+        "monitors": monitors,
+        "curved": curved,
+        "frameless": frameless,
+    }
+
+
+def test_lookups_are_loaded_once(tables, django_assert_num_queries):
+    # a table is loaded at its first lookup
+    with django_assert_num_queries(1):
+        assert product_category("COMPUTER") == tables["computer"]
+    with django_assert_num_queries(2):
+        assert computer_sub_category("MONITORS") == tables["monitors"]
+        reference_tables.special_features()
+    with django_assert_num_queries(0):
+        assert product_category("COMPUTER") == tables["computer"]
+        assert computer_sub_category("MONITORS") == tables["monitors"]
+        assert special_features_by_id(
+            [str(tables["frameless"].pk), tables["curved"].pk]
+        ) == sorted([tables["curved"], tables["frameless"]], key=lambda f: f.pk)
+
+
+def test_saves_reload_the_tables(tables, django_capture_on_commit_callbacks):
+    product_category("COMPUTER")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        books = ProductCategory.objects.create(name="BOOKS")
+    assert product_category("BOOKS") == books
+
+    with django_capture_on_commit_callbacks(execute=True):
+        books.delete()
+    with pytest.raises(ProductCategory.DoesNotExist):
+        product_category("BOOKS")
+
+
+def test_rows_written_without_a_signal_are_found(tables):
+    product_category("COMPUTER")
+    ProductCategory.objects.bulk_create([ProductCategory(name="BOOKS")])
+    (feature,) = Special_Features.objects.bulk_create(
+        [Special_Features(name="bulk_created")]
+    )
+
+    assert product_category("BOOKS").name == "BOOKS"
+    assert special_features_by_id([feature.pk]) == [feature]
+
+
+def test_filter_choices_come_from_the_tables(tables, django_assert_num_queries):
+    reference_tables.get_tables(Special_Features)
+
+    with django_assert_num_queries(0):
+        form = MonitorsFilter({"special_features": [tables["curved"].pk]}).form
+        assert form.is_valid()
+    assert form.cleaned_data["special_features"] == [str(tables["curved"].pk)]
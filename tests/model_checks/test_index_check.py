@@ -0,0 +1,107 @@
+import os
+import textwrap
+
+from django.apps import apps
+
+from model_checks.index_check import (
+    check_module,
+    get_project_modules,
+    module_name,
+    run_index_check,
+)
+
+HOT_MODELS = (
+    "i.Monitors",
+    "i.Review",
+    "book_.BookFormat",
+    "book_.Rating",
+    "book_.Review",
+    "blog.Post",
+    "blog.Comment",
+    "cart.CartItem",
+    "checkout.Payment",
+    "cv_api.PersonalInfo",
+    "cv_api.CVWebhookEvent",
+)
+
+
+def messages(tmp_path, source):
+    path = tmp_path / "views.py"
+    path.write_text(textwrap.dedent(source))
+    return [warning.msg for warning in check_module(str(path))]
+
+
+def test_unindexed_filter_and_order_are_flagged(tmp_path):
+    found = messages(
+        tmp_path,
+        """
+        from i.models import Monitors
+
+        def view(request):
+            return Monitors.objects.filter(color="Black").order_by("item_weight")
+        """,
+    )
+
+    assert len(found) == 2
+    assert "'i.Monitors.color' is queried in" in found[0]
+    assert "'i.Monitors.item_weight' is queried in" in found[1]
+
+
+def test_indexes_serving_the_query_are_not_flagged(tmp_path):
+    found = messages(
+        tmp_path,
+        """
+        from blog.models import Comment, Post
+        from book_.models import Review as BookReview
+        from i.models import Monitors, Review
+
+        def view(request):
+            Monitors.objects.filter(brand="LG", user=request.user).order_by("price")
+            Monitors.objects.filter(is_active=True).order_by("monitor_id")
+            Monitors.objects.filter(name__icontains="dell")
+            Review.objects.filter(product_id=1, rating=4)
+            BookReview.objects.filter(book_format__book_name="x")
+            Post.objects.filter(status=1).order_by("-created_on")
+            Comment.objects.filter(post="slug", active=True)
+        """,
+    )
+
+    assert found == []
+
+
+def test_composite_index_needs_its_leading_columns(tmp_path):
+    found = messages(
+        tmp_path,
+        """
+        from i.models import Review
+
+        def view(request):
+            return Review.objects.filter(rating=4)
+        """,
+    )
+
+    assert len(found) == 1
+    assert "'i.Review.rating'" in found[0]
+
+
+def test_hot_lookups_of_the_project_are_indexed():
+    flagged = [
+        warning.msg
+        for warning in run_index_check()
+        if warning.obj._meta.label in HOT_MODELS
+    ]
+
+    assert flagged == []
+
+
+def test_skipped_modules_come_from_the_settings(settings):
+    app_config = apps.get_app_config("i")
+    seeder = os.path.join(app_config.path, "catalog_seeder.py")
+    assert module_name(app_config, seeder) == "i.catalog_seeder"
+    assert seeder not in get_project_modules(app_config)
+
+    settings.INDEX_CHECK_SKIPPED_MODULES = ["i"]
+    assert list(get_project_modules(app_config)) == []
+
+    settings.INDEX_CHECK_SKIPPED_MODULES = []
+    assert seeder in get_project_modules(app_config)
@@ -0,0 +1,75 @@
+"""
+A catalog of realistic size built with the factories of the other tests,
+for the query budgets of test_query_budgets.py. The budgets are recorded
+against these sizes, changing them means recording the budgets again.
+"""
+
+import itertools
+
+from Homepage.models import CustomUser
+from tests.blog.test_blog_factory import CommentFactory, PostFactory
+from tests.books.books_factory_classes import BookFormatFactory, RatingFactory
+from tests.books.books_factory_classes import ReviewFactory as BookReviewFactory
+from tests.Homepage.Homepage_factory import CustomUserOnlyFactory
+from tests.i.factory_classes import ComputerSubCategoryFactory, MonitorsFactory
+from tests.i.factory_classes import ReviewFactory as MonitorReviewFactory
+
+MONITORS = 60
+BOOK_FORMATS = 30
+REVIEWS_PER_PRODUCT = 5
+POSTS = 30
+COMMENTS_PER_POST = 5
+REVIEWERS = 10
+
+
+def seed_catalog() -> dict:
+    # the profile of CustomUserOnlyFactory has a fixed phone number, the
+    # other users are created without a profile, the pages do not need one
+    admin = CustomUserOnlyFactory(user_type="ADMINISTRATOR")
+    seller, *reviewers = CustomUser.objects.bulk_create(
+        CustomUser(
+            username=f"catalog-user-{n}",
+            email=f"catalog-user-{n}@example.com",
+            user_type="SELLER" if n == 0 else "CUSTOMER",
+        )
+        for n in range(REVIEWERS + 1)
+    )
+
+    # the factories pick category names at random from unique choices
+    sub_category = ComputerSubCategoryFactory()
+    category = sub_category.product_category
+
+    monitors = MonitorsFactory.create_batch(
+        MONITORS,
+        user=seller,
+        Product_Category=category,
+        Computer_SubCategory=sub_category,
+    )
+    book_formats = BookFormatFactory.create_batch(
+        BOOK_FORMATS, user=seller, product_category=category
+    )
+
+    reviewer = itertools.cycle(reviewers)
+    for monitor in monitors:
+        for _ in range(REVIEWS_PER_PRODUCT):
+            MonitorReviewFactory(product=monitor, user=next(reviewer))
+    for book_format in book_formats:
+        for _ in range(REVIEWS_PER_PRODUCT):
+            user = next(reviewer)
+            BookReviewFactory(book_format=book_format, user=user)
+            RatingFactory(book_format=book_format, user=user)
+
+    posts = PostFactory.create_batch(POSTS, post_admin=admin, status=1)
+    for post in posts:
+        CommentFactory.create_batch(
+            COMMENTS_PER_POST, post=post, comments_user=admin, active=True
+        )
+
+    return {
+        "admin": admin,
+        "seller": seller,
+        "customer": reviewers[0],
+        "monitors": monitors,
+        "book_formats": book_formats,
+        "posts": posts,
+    }
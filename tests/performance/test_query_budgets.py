@@ -0,0 +1,155 @@
+"""
+Query budgets and wall-time ceilings of the busiest pages.
+
+Each page is requested once with a cold cache against the catalog of
+catalog.py. The request fails when it runs more queries than its budget in
+budgets.json or takes longer than its ceiling. After an intended change in
+the query count, record the new counts with
+
+    UPDATE_QUERY_BUDGETS=1 pytest tests/performance
+
+and commit budgets.json, its diff shows the cost of the change.
+"""
+
+import json
+import os
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from iii.instrumentation import fingerprint
+from tests.performance.catalog import seed_catalog
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+UPDATE_BUDGETS = os.environ.get("UPDATE_QUERY_BUDGETS") == "1"
+# repeated queries shown when a budget is exceeded
+REPORTED_QUERIES = 5
+# the captured SQL has the parameters in it
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def load_budgets() -> dict:
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def save_budgets(budgets) -> None:
+    with open(BUDGETS_PATH, "w") as f:
+        json.dump(budgets, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def repeated_queries(queries) -> str:
+    counts = Counter(fingerprint(LITERAL.sub("%s", query["sql"])) for query in queries)
+    return "\n".join(
+        f"  {count} x {sql}"
+        for sql, count in counts.most_common(REPORTED_QUERIES)
+        if count > 1
+    )
+
+
+def log_in(client, user, cart_items=None):
+    client.force_login(user)
+    session = client.session
+    session["user_id"] = user.pk
+    if cart_items is not None:
+        session["cart_items"] = cart_items
+    session.save()
+    # signed cookie sessions live in the cookie only
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+
+def monitor_list(client, catalog):
+    return reverse("i:MonitorListView")
+
+
+def monitor_detail(client, catalog):
+    monitor = catalog["monitors"][0]
+    return reverse("i:add_review", kwargs={"product_id": monitor.monitor_id})
+
+
+def book_list(client, catalog):
+    return reverse("book_:book_list_filters")
+
+
+def book_detail(client, catalog):
+    book_format = catalog["book_formats"][0]
+    return reverse(
+        "book_:book_detail_view",
+        kwargs={"pk": book_format.book_author_name_id, "format_id": book_format.id},
+    )
+
+
+def cart(client, catalog):
+    monitor_type = ContentType.objects.get(app_label="i", model="monitors").id
+    book_type = ContentType.objects.get(app_label="book_", model="bookformat").id
+    cart_items = [
+        [monitor_type, monitor.monitor_id] for monitor in catalog["monitors"][:3]
+    ] + [[book_type, book_format.id] for book_format in catalog["book_formats"][:2]]
+    log_in(client, catalog["customer"], cart_items)
+    return reverse("cart:cart_view")
+
+
+def blog_home(client, catalog):
+    return reverse("blog:post_list")
+
+
+def blog_post(client, catalog):
+    log_in(client, catalog["admin"])
+    return reverse("blog:live_post", kwargs={"slug": catalog["posts"][0].slug})
+
+
+PAGES = {
+    "i:MonitorListView": monitor_list,
+    "i:add_review": monitor_detail,
+    "book_:book_list_filters": book_list,
+    "book_:book_detail_view": book_detail,
+    "cart:cart_view": cart,
+    "blog:post_list": blog_home,
+    "blog:live_post": blog_post,
+}
+
+
+@pytest.fixture
+def catalog(db):
+    return seed_catalog()
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_query_budget(page, catalog, client):
+    url = PAGES[page](client, catalog)
+
+    with CaptureQueriesContext(connection) as context:
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    queries = len(context.captured_queries)
+    budgets = load_budgets()
+
+    if UPDATE_BUDGETS:
+        budgets.setdefault(page, {"seconds": 2.0})["queries"] = queries
+        save_budgets(budgets)
+        return
+
+    budget = budgets[page]
+    assert queries <= budget["queries"], (
+        f"{page} ran {queries} queries, its budget is {budget['queries']}\n"
+        f"most repeated queries:\n{repeated_queries(context.captured_queries)}"
+    )
+    assert (
+        elapsed <= budget["seconds"]
+    ), f"{page} took {elapsed:.2f}s, its ceiling is {budget['seconds']}s"
+
+
+def test_every_page_has_a_budget():
+    assert sorted(load_budgets()) == sorted(PAGES)